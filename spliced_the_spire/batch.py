@@ -0,0 +1,178 @@
+"""
+Headless Monte Carlo combats, spread over a pool of worker processes.
+
+Example:
+    result = run_batch(100_000, LeftToRightAI,
+                       deck=[RedStrike] * 5 + [RedDefend] * 4 + [Bash],
+                       enemies=[JawWorm], relics=[BurningBlood], ascension=0, seed=1)
+    print(result.win_rate, result.mean_hp_lost())
+
+Every combat plays with its own RandomStreams, seeded from (seed, combat index), so a batch
+gives the same results no matter how many workers (or threads) it is spread over.
+"""
+from __future__ import annotations
+
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional, Sequence
+
+from spliced_the_spire.main.cards import AbstractCard
+from spliced_the_spire.main.abstractions import AbstractActor, AbstractEnemy, AbstractRelic, Room
+from spliced_the_spire.main.classes import Ironclad, STSClass
+from spliced_the_spire.main.enumerations import LogLevel
+from spliced_the_spire.lutil import RandomStreams
+from spliced_the_spire.events import EventLog
+
+
+class CombatResult(NamedTuple):
+    """The outcome of a single combat."""
+    won: bool
+    hp_lost: int
+    turns: int
+
+
+class BatchResult:
+    """Aggregated outcomes of a batch of combats."""
+
+    def __init__(self, results: Sequence[CombatResult]):
+        self.combats: int = len(results)
+        self.wins: int = sum(result.won for result in results)
+        # How many combats ended with each amount of hp lost / number of turns taken
+        self.hp_lost: Counter[int] = Counter(result.hp_lost for result in results)
+        self.turns: Counter[int] = Counter(result.turns for result in results)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.combats if self.combats else 0.0
+
+    def mean_hp_lost(self) -> float:
+        return sum(hp * count for hp, count in self.hp_lost.items()) / self.combats if self.combats else 0.0
+
+    def mean_turns(self) -> float:
+        return sum(turns * count for turns, count in self.turns.items()) / self.combats if self.combats else 0.0
+
+    def __repr__(self):
+        return (f'BatchResult(combats={self.combats}, win_rate={self.win_rate:.4f}, '
+                f'mean_hp_lost={self.mean_hp_lost():.2f}, mean_turns={self.mean_turns():.2f})')
+
+
+def combat_seed(seed: int, index: int) -> str:
+    """The seed of combat number index in a batch seeded with seed."""
+    return f'{seed}:{index}'
+
+
+def run_combat(actor: type[AbstractActor],
+               deck: Sequence[type[AbstractCard] | AbstractCard],
+               enemies: Sequence[type[AbstractEnemy]],
+               relics: Sequence[type[AbstractRelic]] = (),
+               ascension: int = 0,
+               seed: int | str = 0,
+               hero: type[STSClass] = Ironclad,
+               max_turns: int = 100,
+               log_level: LogLevel = LogLevel.OFF,
+               events: Optional[EventLog] = None) -> CombatResult:
+    """
+    Runs a single headless combat from a fresh set of objects.
+
+    Parameters
+    ----------
+    :param actor:
+        The actor class making decisions, E.g. LeftToRightAI
+
+    :param deck:
+        The cards in the deck, either as card classes or as cards to copy.
+
+    :param enemies:
+        The enemy classes to fight.
+
+    :param relics:
+        The relic classes the actor starts with.
+
+    :param seed:
+        Seeds the random streams the combat is played with.
+
+    :param hero:
+        The character class of the actor, which sets its health.
+
+    :param log_level:
+        How much the actor and enemies log, nothing by default since only the outcome is returned.
+
+    :param events:
+        An EventLog to write the combat's events to.
+    """
+    rng = RandomStreams(seed)
+    player = actor(hero, cards=[card.make() if isinstance(card, type) else card.copy() for card in deck], rng=rng)
+    for relic in relics:
+        player.add_relic(relic())
+    room = Room(player, [enemy(ascension=ascension, rng=rng) for enemy in enemies], rng=rng, log_level=log_level,
+                events=events)
+
+    starting_health = player.health
+    turns = room.run_combat(max_turns=max_turns)
+    return CombatResult(won=not player.is_dead() and room.enemies_dead(),
+                        hp_lost=starting_health - player.health,
+                        turns=turns)
+
+
+def shard_events_path(events_dir: str, start: int) -> str:
+    """The file the shard of a batch starting at combat start writes its events to."""
+    return os.path.join(events_dir, f'{start:010d}.events')
+
+
+def _run_shard(start: int, stop: int, seed: int, settings: dict,
+               events_dir: Optional[str] = None) -> list[CombatResult]:
+    # Worker entry point, runs combats start to stop - 1 of the batch
+    if events_dir is None:
+        return [run_combat(seed=combat_seed(seed, index), **settings) for index in range(start, stop)]
+    results = []
+    with EventLog(shard_events_path(events_dir, start)) as events:
+        for index in range(start, stop):
+            events.next_combat(index)
+            results.append(run_combat(seed=combat_seed(seed, index), events=events, **settings))
+    return results
+
+
+def run_batch(n: int,
+              actor: type[AbstractActor],
+              deck: Sequence[type[AbstractCard] | AbstractCard],
+              enemies: Sequence[type[AbstractEnemy]],
+              relics: Sequence[type[AbstractRelic]] = (),
+              ascension: int = 0,
+              seed: int = 0,
+              hero: type[STSClass] = Ironclad,
+              workers: Optional[int] = None,
+              shard_size: int = 500,
+              max_turns: int = 100,
+              events_dir: Optional[str] = None) -> BatchResult:
+    """
+    Runs n headless combats and aggregates the outcomes. See run_combat for the combat settings.
+
+    Parameters
+    ----------
+    :param workers:
+        Number of worker processes. None uses one per CPU, 1 runs everything in this process.
+
+    :param shard_size:
+        How many combats each task sent to a worker runs.
+
+    :param events_dir:
+        A directory to write the events of every combat to, one file per shard (see shard_events_path)
+        with combats numbered by their index in the batch.
+    """
+    settings = dict(actor=actor, deck=list(deck), enemies=list(enemies), relics=list(relics),
+                    ascension=ascension, hero=hero, max_turns=max_turns)
+    shards = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+
+    results = []
+    if workers == 1:
+        for start, stop in shards:
+            results.extend(_run_shard(start, stop, seed, settings, events_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_shard, start, stop, seed, settings, events_dir) for start, stop in shards]
+            # Collected in shard order, so the results don't depend on which worker finished first
+            for future in futures:
+                results.extend(future.result())
+
+    return BatchResult(results)
@@ -0,0 +1,132 @@
+"""
+Rough throughput numbers for the parts of the engine that bots lean on.
+Run with: python -m spliced_the_spire.benchmark
+"""
+import time
+
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.effects import Strength, Vulnerable
+from spliced_the_spire.main.abstractions import Room
+from spliced_the_spire.main.actors import DummyActor, LeftToRightAI
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.enemies import Cultist, JawWorm
+from spliced_the_spire.batch import run_batch
+from spliced_the_spire.lutil import RandomStreams
+
+
+def _rate(function, seconds: float = 1.0) -> float:
+    """Calls function repeatedly for roughly the given number of seconds and returns calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _ in range(100):
+            function()
+        calls += 100
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def bench_room_clone(seconds: float = 1.0) -> float:
+    """Snapshot/restore pairs per second for a mid-combat starter deck fight against two enemies."""
+    deck = [RedStrike() for _ in range(5)] + [RedDefend() for _ in range(4)] + [Bash()]
+    actor = DummyActor(Ironclad, cards=deck[5:], hand=deck[:5], energy=3)
+    room = Room(actor, [Cultist(), JawWorm()])
+    actor.increase_effect(Strength, 2)
+    room.enemies[0].increase_effect(Vulnerable, 1)
+
+    state = room.snapshot()
+
+    def clone():
+        room.snapshot()
+        room.restore(state)
+
+    return _rate(clone, seconds)
+
+
+def bench_card_copies(seconds: float = 1.0) -> float:
+    """Cards per second copied out of a starter deck, the way decks are built for every combat."""
+    deck = [RedStrike() for _ in range(5)] + [RedDefend() for _ in range(4)] + [Bash()]
+    return len(deck) * _rate(lambda: [card.copy() for card in deck], seconds)
+
+
+def bench_actors(seconds: float = 1.0) -> float:
+    """Ironclad actors per second, each built with its own starting deck and random streams."""
+    return _rate(lambda: LeftToRightAI(Ironclad, rng=RandomStreams(1)), seconds)
+
+
+def bench_decks(seconds: float = 1.0) -> float:
+    """Decks per second built from a batch of compact specs."""
+    from spliced_the_spire.decks import build_decks
+    specs = [f'{strikes}xStrike_R 4xDefend_R Bash+ Inflame' for strikes in range(1, 11)]
+    return len(specs) * _rate(lambda: build_decks(specs), seconds)
+
+
+def bench_maps(seconds: float = 1.0) -> float:
+    """Act maps generated per second, each from its own seed."""
+    from spliced_the_spire.main.map import generate_map
+    seeds = iter(range(10 ** 9))
+    return _rate(lambda: generate_map(next(seeds)), seconds)
+
+
+def bench_map_analysis(maps: int = 10000) -> float:
+    """Maps per second scored for their best route with NumPy, over a batch of generated maps."""
+    from spliced_the_spire.main.enumerations import RoomType
+    from spliced_the_spire.main.map import generate_map
+    from spliced_the_spire.map_analysis import best_scores
+    batch = [generate_map(seed) for seed in range(maps)]
+    start = time.perf_counter()
+    best_scores(batch, {RoomType.ELITE: 1, RoomType.REST: 0.5})
+    return maps / (time.perf_counter() - start)
+
+
+def bench_map_cache(maps: int = 100000) -> float:
+    """Maps per second loaded back from a map cache file, as GameMaps."""
+    import os
+    import tempfile
+    from spliced_the_spire.map_cache import MapCache, build_cache
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.maps')
+        build_cache(path, stop=maps)
+        start = time.perf_counter()
+        with MapCache(path) as cache:
+            cache.maps()
+        return maps / (time.perf_counter() - start)
+
+
+def bench_encode(seconds: float = 1.0) -> float:
+    """Observations per second written in place for a mid-combat starter deck fight against two enemies."""
+    from spliced_the_spire.observation import ObservationEncoder
+    deck = [RedStrike() for _ in range(5)] + [RedDefend() for _ in range(4)] + [Bash()]
+    actor = DummyActor(Ironclad, cards=deck[5:], hand=deck[:5], energy=3)
+    room = Room(actor, [Cultist(), JawWorm()])
+    room.start_combat()
+
+    encoder = ObservationEncoder()
+    buffer = encoder.new_buffer()
+    return _rate(lambda: encoder.encode(room, buffer), seconds)
+
+
+def bench_combats(lockstep: bool, combats: int = 2000) -> float:
+    """Starter deck combats against a Jaw Worm per second, in this process, on either engine."""
+    deck = [RedStrike] * 5 + [RedDefend] * 4 + [Bash]
+    start = time.perf_counter()
+    if lockstep:
+        from spliced_the_spire.lockstep import run_lockstep
+        run_lockstep(combats, LeftToRightAI, deck, [JawWorm], seed=1)
+    else:
+        run_batch(combats, LeftToRightAI, deck, [JawWorm], seed=1, workers=1)
+    return combats / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    print(f'Room snapshot/restore: {bench_room_clone():,.0f} clones/second')
+    print(f'Card copies: {bench_card_copies():,.0f} cards/second')
+    print(f'Actors: {bench_actors():,.0f} actors/second')
+    print(f'Deck specs: {bench_decks():,.0f} decks/second')
+    print(f'Map generation: {bench_maps():,.0f} maps/second')
+    print(f'Map route scoring: {bench_map_analysis():,.0f} maps/second')
+    print(f'Map cache loading: {bench_map_cache():,.0f} maps/second')
+    print(f'Observation encoder: {bench_encode():,.0f} observations/second')
+    print(f'Object engine: {bench_combats(lockstep=False):,.0f} combats/second')
+    print(f'Lockstep engine: {bench_combats(lockstep=True, combats=20000):,.0f} combats/second')
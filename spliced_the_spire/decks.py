@@ -0,0 +1,105 @@
+"""
+Compact deck specs, for building, logging and caching large numbers of candidate decks.
+
+A spec is a whitespace separated list of cards, each an optional count, the card's key in
+cards.card_classes (its Slay the Spire id where it has one) and a + if it is upgraded:
+
+    5xStrike_R 4xDefend_R Bash+ Inflame
+
+Example:
+    entries = parse_deck('5xStrike_R 4xDefend_R Bash+ Inflame')
+    deck = build_deck(entries)                 # A fresh list of cards
+    format_deck(entries)                       # '5xStrike_R 4xDefend_R Bash+ Inflame'
+    decks = build_decks(specs)                 # Each distinct spec is parsed once
+    counts = deck_vectors(specs)               # (len(specs), 2 * len(AbstractCard.registry)) counts
+
+Specs are resolved to AbstractCard.card_id once, through a cached table, so parsing the same spec
+again is a dictionary lookup.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence
+
+from spliced_the_spire.main.cards import AbstractCard, card_classes
+from spliced_the_spire.main.classes import DeckEntry, build_deck
+
+_TOKEN = re.compile(r'(?:(\d+)x)?(\w+?)(\+)?')
+
+
+@lru_cache(maxsize=None)
+def _card_ids() -> dict[str, int]:
+    # Every name a spec can use, card_classes keys first and then class names, to card_id
+    ids = {card_cls.__name__: card_cls.card_id for card_cls in AbstractCard.registry}
+    ids.update((name, card_cls.card_id) for name, card_cls in card_classes.items())
+    return ids
+
+
+@lru_cache(maxsize=None)
+def _card_names() -> dict[int, str]:
+    # The name each card_id is written with, its card_classes key if it has one
+    names = {card_cls.card_id: card_cls.__name__ for card_cls in AbstractCard.registry}
+    names.update((card_cls.card_id, name) for name, card_cls in card_classes.items())
+    return names
+
+
+@lru_cache(maxsize=4096)
+def parse_deck(spec: str) -> tuple[DeckEntry, ...]:
+    """
+    Parses a deck spec into DeckEntry tuples, in the order they are written.
+    Raises ValueError for malformed entries or unknown cards.
+    """
+    card_ids = _card_ids()
+    entries = []
+    for token in spec.split():
+        match = _TOKEN.fullmatch(token)
+        if match is None:
+            raise ValueError(f'Malformed deck entry {token!r} in {spec!r}, expected E.g. 5xStrike_R or Bash+')
+        count, name, upgraded = match.groups()
+        if name not in card_ids:
+            raise ValueError(f'Unknown card {name!r} in {spec!r}')
+        entries.append(DeckEntry(card_ids[name], int(count) if count else 1, upgraded is not None))
+    return tuple(entries)
+
+
+def format_deck(entries: Iterable[DeckEntry], sort: bool = False) -> str:
+    """
+    Writes entries as a deck spec, the inverse of parse_deck. With sort=True the entries are
+    ordered by card_id, unupgraded first, so equal decks give equal strings (E.g. for cache keys).
+    """
+    if sort:
+        entries = sorted(entries, key=lambda entry: (entry.card_id, entry.upgraded))
+    names = _card_names()
+    return ' '.join(f'{f"{count}x" if count != 1 else ""}{names[card_id]}{"+" if upgraded else ""}'
+                    for card_id, count, upgraded in entries)
+
+
+def deck_entries(cards: Iterable[AbstractCard]) -> tuple[DeckEntry, ...]:
+    """Counts cards into DeckEntry tuples, in the order each card first appears. E.g. for logging a deck."""
+    counts = Counter((card.card_id, card.upgraded) for card in cards)
+    return tuple(DeckEntry(card_id, count, upgraded) for (card_id, upgraded), count in counts.items())
+
+
+def build_decks(specs: Iterable[str]) -> list[list[AbstractCard]]:
+    """Builds a fresh deck for every spec."""
+    return [build_deck(parse_deck(spec)) for spec in specs]
+
+
+def deck_vectors(specs: Sequence[str], out: Optional['numpy.ndarray'] = None) -> 'numpy.ndarray':
+    """
+    Counts the cards of every spec into a row of an int32 array of shape (len(specs), 2 * cards),
+    where cards is len(AbstractCard.registry). Column card_id counts the unupgraded copies of a card
+    and column cards + card_id the upgraded ones. Written into out if it is given.
+    """
+    import numpy as np
+    cards = len(AbstractCard.registry)
+    if out is None:
+        out = np.zeros((len(specs), 2 * cards), dtype=np.int32)
+    else:
+        out.fill(0)
+    for row, spec in zip(out, specs):
+        for card_id, count, upgraded in parse_deck(spec):
+            row[card_id + cards * upgraded] += count
+    return out
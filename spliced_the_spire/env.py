@@ -0,0 +1,310 @@
+"""
+Gym-style environments over single combats, for training agents.
+
+CombatEnv follows the Gymnasium API without depending on it: reset(seed) returns (observation, info)
+and step(action) returns (observation, reward, terminated, truncated, info). VectorCombatEnv steps
+n combats at once and returns NumPy arrays, and SubprocessVectorCombatEnv spreads those combats over
+worker processes.
+
+Example:
+    env = VectorCombatEnv(64, deck=[RedStrike] * 5 + [RedDefend] * 4 + [Bash], enemies=[JawWorm])
+    observations, infos = env.reset(seed=1)
+    while training:
+        actions = agent.act(observations, env.action_masks())
+        observations, rewards, terminated, truncated, infos = env.step(actions)
+
+Actions are integers: slot * MAX_ENEMIES + target plays the card in that hand slot at that enemy,
+and END_TURN ends the turn, after which the enemies move and the next turn is drawn. Observations
+are written by observation.ObservationEncoder, see ENCODER.fields for the layout.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import random
+from typing import Optional, Sequence
+
+import numpy as np
+
+from spliced_the_spire.main.cards import AbstractCard
+from spliced_the_spire.main.abstractions import AbstractEnemy, AbstractRelic, Room
+from spliced_the_spire.main.actors import ExternalActor
+from spliced_the_spire.main.classes import Ironclad, STSClass
+from spliced_the_spire.main.enumerations import LogLevel
+from spliced_the_spire.lutil import RandomStreams
+from spliced_the_spire.observation import ObservationEncoder
+
+# Hand slots and enemies an action can refer to, anything past these can't be played or targeted
+MAX_HAND = 10
+MAX_ENEMIES = 5
+END_TURN = MAX_HAND * MAX_ENEMIES
+ACTIONS = END_TURN + 1
+
+ENCODER = ObservationEncoder(max_hand=MAX_HAND, max_enemies=MAX_ENEMIES)
+OBSERVATION_SIZE = ENCODER.size
+
+
+class CombatEnv:
+    """
+    One combat at a time, played by an ExternalActor through AbstractActor.use_card and end_turn,
+    with the enemies answering through AbstractEnemy.take_turn.
+
+    The reward is 0 until the combat ends. Winning is worth 1 minus the fraction of max health lost,
+    dying is worth -1. Combats still going after max_turns are truncated.
+    """
+
+    def __init__(self,
+                 deck: Sequence[type[AbstractCard] | AbstractCard],
+                 enemies: Sequence[type[AbstractEnemy]],
+                 relics: Sequence[type[AbstractRelic]] = (),
+                 ascension: int = 0,
+                 hero: type[STSClass] = Ironclad,
+                 max_turns: int = 100):
+        """
+        Parameters
+        ----------
+        :param deck:
+            The cards in the deck, either as card classes or as cards to copy.
+
+        :param enemies:
+            The enemy classes to fight, at most MAX_ENEMIES of them.
+
+        :param relics:
+            The relic classes the actor starts with.
+
+        :param hero:
+            The character class of the actor, which sets its health.
+        """
+        if len(enemies) > MAX_ENEMIES:
+            raise ValueError(f'A combat can have at most {MAX_ENEMIES} enemies, got {len(enemies)}')
+        self.deck = list(deck)
+        self.enemy_types = list(enemies)
+        self.relics = list(relics)
+        self.ascension = ascension
+        self.hero = hero
+        self.max_turns = max_turns
+
+        self.room: Optional[Room] = None
+        self.actor: Optional[ExternalActor] = None
+        self.turns: int = 0
+        self.done: bool = True
+
+    def reset(self, seed: int | str | None = None) -> tuple[np.ndarray, dict]:
+        """Starts a new combat, seeded with seed, and draws the first hand."""
+        self._start(seed)
+        return self.observation(), {}
+
+    def _start(self, seed: int | str | None):
+        rng = RandomStreams(seed)
+        self.actor = ExternalActor(self.hero, cards=[card.make() if isinstance(card, type) else card.copy()
+                                                     for card in self.deck], rng=rng)
+        for relic in self.relics:
+            self.actor.add_relic(relic())
+        self.room = Room(self.actor, [enemy(ascension=self.ascension, rng=rng) for enemy in self.enemy_types],
+                         rng=rng, log_level=LogLevel.OFF)
+
+        self.room.start_combat()
+        self.actor.start_turn()
+        self.turns = 1
+        self.done = False
+
+    def action_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns a boolean array over every action, True for the ones step() will accept, written into out if given."""
+        mask = out if out is not None else np.zeros(ACTIONS, dtype=bool)
+        mask.fill(False)
+        if self.done:
+            return mask
+        mask[END_TURN] = True
+
+        living = [i for i, enemy in enumerate(self.room.enemies) if not enemy.is_dead()]
+        playable = self.actor.get_playable_cards()
+        for slot, card in enumerate(self.actor.hand_pile[:MAX_HAND]):
+            if any(card is option for option in playable):
+                mask[[slot * MAX_ENEMIES + target for target in living]] = True
+        return mask
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """Takes action and returns (observation, reward, terminated, truncated, info)."""
+        reward, terminated, truncated, info = self._step(action)
+        return self.observation(), reward, terminated, truncated, info
+
+    def _step(self, action: int) -> tuple[float, bool, bool, dict]:
+        if self.done:
+            raise RuntimeError('The combat is over, call reset() to start another.')
+        actor, room = self.actor, self.room
+        truncated = False
+
+        if action == END_TURN:
+            actor.end_turn()
+            room.take_enemy_turns()
+            if not actor.is_dead():
+                if self.turns >= self.max_turns:
+                    truncated = True
+                else:
+                    self.turns += 1
+                    actor.start_turn()
+        else:
+            if not 0 <= action < END_TURN or not self.action_mask()[action]:
+                raise RuntimeError(f'Action {action} can not be taken right now, see action_mask().')
+            slot, target = divmod(action, MAX_ENEMIES)
+            actor.use_card(room.enemies[target], actor.hand_pile[slot])
+
+        terminated = actor.is_dead() or room.enemies_dead()
+        reward = 0.0
+        info = {}
+        if terminated or truncated:
+            room.end_combat()
+            self.done = True
+            won = room.is_won()
+            if terminated:
+                reward = 1.0 - (actor.max_health - actor.health) / actor.max_health if won else -1.0
+            info = {'won': won, 'turns': self.turns, 'hp_lost': actor.max_health - actor.health}
+        return reward, terminated, truncated, info
+
+    def observation(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encodes the combat as a float32 array of OBSERVATION_SIZE, into out if it is given."""
+        return ENCODER.encode(self.room, out)
+
+
+class _EnvShard:
+    """
+    Some of the combats of a vector env, with global indices, resetting each one as it finishes.
+    Results are written into the same arrays every step.
+    """
+
+    def __init__(self, settings: dict, indices: Sequence[int]):
+        self.envs = [CombatEnv(**settings) for _ in indices]
+        self.indices = list(indices)
+        self.episodes = [0] * len(self.envs)
+        self.seed: int | str = 0
+
+        self.observations = ENCODER.new_buffer(len(self.envs))
+        self.rewards = np.zeros(len(self.envs), dtype=np.float32)
+        self.terminated = np.zeros(len(self.envs), dtype=bool)
+        self.truncated = np.zeros(len(self.envs), dtype=bool)
+        self.masks = np.zeros((len(self.envs), ACTIONS), dtype=bool)
+
+    def _reset(self, i: int):
+        # Seeded by env and episode, so results don't depend on how envs are spread over processes
+        seed = f'{self.seed}:{self.indices[i]}:{self.episodes[i]}'
+        self.episodes[i] += 1
+        self.envs[i]._start(seed)
+
+    def reset(self, seed: int | str) -> np.ndarray:
+        self.seed = seed
+        self.episodes = [0] * len(self.envs)
+        for i in range(len(self.envs)):
+            self._reset(i)
+        return ENCODER.encode_batch([env.room for env in self.envs], self.observations)
+
+    def step(self, actions: np.ndarray) -> tuple:
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            self.rewards[i], self.terminated[i], self.truncated[i], info = env._step(int(action))
+            if env.done:
+                self._reset(i)
+            infos.append(info)
+        ENCODER.encode_batch([env.room for env in self.envs], self.observations)
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def action_masks(self) -> np.ndarray:
+        for env, mask in zip(self.envs, self.masks):
+            env.action_mask(mask)
+        return self.masks
+
+
+class VectorCombatEnv:
+    """
+    n CombatEnvs stepped together in this process. Combats that finish are reset straight away,
+    so the observation returned for them is the first one of the next combat; the info of the
+    finished combat is still returned. Takes the CombatEnv settings as keyword arguments.
+
+    With copy=False the arrays returned are written over by the next call instead of being
+    allocated every step.
+    """
+
+    def __init__(self, n: int, copy: bool = True, **settings):
+        self.n = n
+        self.copy = copy
+        self._shard = _EnvShard(settings, range(n))
+
+    def reset(self, seed: int | str | None = None) -> tuple[np.ndarray, list[dict]]:
+        """Starts n new combats, returning an (n, OBSERVATION_SIZE) array. Combat i is seeded from (seed, i)."""
+        seed = seed if seed is not None else random.getrandbits(64)
+        observations = self._shard.reset(seed)
+        return observations.copy() if self.copy else observations, [{} for _ in range(self.n)]
+
+    def step(self, actions: Sequence[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        """Takes an action in every combat, returning arrays of observations, rewards, terminated and truncated."""
+        *arrays, infos = self._shard.step(np.asarray(actions))
+        if self.copy:
+            arrays = [array.copy() for array in arrays]
+        return (*arrays, infos)
+
+    def action_masks(self) -> np.ndarray:
+        """Returns an (n, ACTIONS) boolean array of the actions each combat will accept."""
+        masks = self._shard.action_masks()
+        return masks.copy() if self.copy else masks
+
+    def close(self):
+        pass
+
+
+def _shard_worker(connection, settings: dict, indices: Sequence[int]):
+    # Worker process entry point, runs a shard until told to close
+    shard = _EnvShard(settings, indices)
+    while True:
+        command, arguments = connection.recv()
+        if command == 'close':
+            connection.close()
+            break
+        connection.send(getattr(shard, command)(*arguments))
+
+
+class SubprocessVectorCombatEnv(VectorCombatEnv):
+    """
+    A VectorCombatEnv with its combats split over worker processes, which step their share in parallel.
+    Gives the same results as VectorCombatEnv for the same seed.
+    """
+
+    def __init__(self, n: int, workers: Optional[int] = None, **settings):
+        self.n = n
+        workers = min(workers or multiprocessing.cpu_count(), n)
+        bounds = [n * worker // workers for worker in range(workers + 1)]
+        self._bounds = list(zip(bounds, bounds[1:]))
+        self._connections = []
+        self._processes = []
+        for start, stop in self._bounds:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, args=(child, settings, range(start, stop)),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _call(self, command: str, arguments: list[tuple]) -> list:
+        for connection, argument in zip(self._connections, arguments):
+            connection.send((command, argument))
+        return [connection.recv() for connection in self._connections]
+
+    def reset(self, seed: int | str | None = None) -> tuple[np.ndarray, list[dict]]:
+        seed = seed if seed is not None else random.getrandbits(64)
+        observations = self._call('reset', [(seed,)] * len(self._connections))
+        return np.concatenate(observations), [{} for _ in range(self.n)]
+
+    def step(self, actions: Sequence[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, list[dict]]:
+        actions = np.asarray(actions)
+        results = self._call('step', [(actions[start:stop],) for start, stop in self._bounds])
+        observations, rewards, terminated, truncated, infos = zip(*results)
+        return (np.concatenate(observations), np.concatenate(rewards), np.concatenate(terminated),
+                np.concatenate(truncated), [info for shard in infos for info in shard])
+
+    def action_masks(self) -> np.ndarray:
+        return np.concatenate(self._call('action_masks', [()] * len(self._connections)))
+
+    def close(self):
+        for connection, process in zip(self._connections, self._processes):
+            connection.send(('close', ()))
+            process.join()
+        self._connections = []
+        self._processes = []
@@ -0,0 +1,187 @@
+"""
+Structured combat event logs, streamed to disk as integers rather than kept as Python objects.
+
+Example:
+    with EventLog('combats.events') as events:
+        for combat in range(1000):
+            room = Room(actor, enemies, rng=RandomStreams(combat), events=events)
+            room.run_combat()                    # Written as combat 0, 1, 2, ...
+    for event in read_events('combats.events'):
+        if event.type is EventType.CARD_PLAYED:
+            ...
+
+Every event is six integers, see Event. Creatures are recorded by slot: 0 is the actor and
+1, 2, ... the enemies in the order of room.enemies, -1 nobody. Cards, effects and enemies are
+recorded by AbstractCard.card_id, AbstractEffect.effect_id and AbstractEnemy.enemy_id, enemy moves
+by AbstractEnemy.move_ids.
+
+Events are buffered in an array and written batch_size at a time, either as raw little-endian
+int32 records (the default) or, for paths ending in .jsonl, as one JSON array per line.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+from spliced_the_spire.main.cards import AbstractCard
+from spliced_the_spire.main.abstractions import AbstractActor, AbstractEnemy, Room
+from spliced_the_spire.main.effects import Block
+from spliced_the_spire.main.enumerations import EventType
+
+# The number of int32 fields in an event
+EVENT_FIELDS = 6
+
+
+class Event(NamedTuple):
+    """
+    One thing that happened in a combat, on the actor's turn turn (0 before the first). source,
+    subject and value depend on the type:
+
+    COMBAT_STARTED  once per creature, source its slot, subject its enemy_id (-1 for the actor), value its health
+    CARD_PLAYED     source 0, subject the card_id, value the target's slot
+    DAMAGE_DEALT    source the attacker's slot, subject the victim's slot, value the health lost
+    BLOCK_GAINED    source the slot gaining block, subject Block.effect_id, value the block gained
+    EFFECT_CHANGED  source the slot, subject the effect_id, value the new stacks
+    ENEMY_MOVE      source the enemy's slot, subject the move id, value the enemy_id
+    SHUFFLE         source 0, subject 0, value the size of the shuffled draw pile
+    COMBAT_ENDED    source 0, subject 1 if the actor won else 0, value the actor's health
+    """
+    combat: int
+    turn: int
+    type: EventType
+    source: int
+    subject: int
+    value: int
+
+
+def _slot(room: Room, creature: AbstractActor | AbstractEnemy | None) -> int:
+    if creature is None or creature is NotImplemented:
+        return -1
+    if creature is room.actor:
+        return 0
+    for slot, enemy in enumerate(room.enemies, start=1):
+        if enemy is creature:
+            return slot
+    return -1
+
+
+class EventLog:
+    """
+    Writes the events of combats to path, appending to it. Hand it to a Room (Room(..., events=log))
+    to log the room's combat. Combats are numbered in the order they start, from 0 unless next_combat
+    says otherwise. Written events aren't taken back by Room.restore, so leave rooms that are forked
+    for search without one.
+
+    Parameters
+    ----------
+    :param path:
+        The file the events are appended to. Paths ending in .jsonl are written as JSON lines.
+
+    :param batch_size:
+        How many events are buffered before they are written.
+    """
+
+    def __init__(self, path: str, batch_size: int = 8192):
+        self.path = path
+        self.jsonl = path.endswith('.jsonl')
+        self.batch_size = batch_size
+        self.combat = -1
+        self._next_combat: Optional[int] = None
+        self.events_written = 0
+        self._buffer = array('i')
+        self._file = open(path, 'a' if self.jsonl else 'ab')
+
+    def next_combat(self, combat: int):
+        """Numbers the next combat to start combat, E.g. its index in a batch, rather than the one after the last."""
+        self._next_combat = combat
+
+    def write(self, event_type: EventType, turn: int, source: int, subject: int, value: int):
+        buffer = self._buffer
+        buffer.extend((self.combat, turn, event_type, source, subject, value))
+        if len(buffer) >= self.batch_size * EVENT_FIELDS:
+            self.flush()
+
+    def flush(self):
+        """Writes out the buffered events."""
+        buffer = self._buffer
+        if not buffer:
+            return
+        if self.jsonl:
+            self._file.write(''.join(f'{json.dumps(buffer[i:i + EVENT_FIELDS].tolist())}\n'
+                                     for i in range(0, len(buffer), EVENT_FIELDS)))
+        else:
+            if sys.byteorder == 'big':
+                buffer.byteswap()
+            buffer.tofile(self._file)
+        self.events_written += len(buffer) // EVENT_FIELDS
+        self._file.flush()
+        del buffer[:]
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> EventLog:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Called by the combat as things happen, turning the objects involved into ids
+
+    def combat_started(self, room: Room):
+        self.combat = self.combat + 1 if self._next_combat is None else self._next_combat
+        self._next_combat = None
+        turn = room.actor.turns_started
+        self.write(EventType.COMBAT_STARTED, turn, 0, -1, room.actor.health)
+        for slot, enemy in enumerate(room.enemies, start=1):
+            self.write(EventType.COMBAT_STARTED, turn, slot, enemy.enemy_id, enemy.health)
+
+    def card_played(self, room: Room, card: AbstractCard, target: Optional[AbstractEnemy]):
+        self.write(EventType.CARD_PLAYED, room.actor.turns_started, 0, card.card_id, _slot(room, target))
+
+    def damage_dealt(self, room: Room, attacker, victim, damage: int):
+        self.write(EventType.DAMAGE_DEALT, room.actor.turns_started, _slot(room, attacker), _slot(room, victim),
+                   damage)
+
+    def effect_changed(self, room: Room, owner, effect, old: int, new: int):
+        if effect is Block and new > old:
+            self.write(EventType.BLOCK_GAINED, room.actor.turns_started, _slot(room, owner), effect.effect_id,
+                       new - old)
+        elif new != old:
+            self.write(EventType.EFFECT_CHANGED, room.actor.turns_started, _slot(room, owner), effect.effect_id, new)
+
+    def enemy_move(self, room: Room, enemy: AbstractEnemy, move: str):
+        self.write(EventType.ENEMY_MOVE, room.actor.turns_started, _slot(room, enemy), enemy.move_ids.get(move, -1),
+                   enemy.enemy_id)
+
+    def shuffled(self, room: Room, draw_pile: Sequence[AbstractCard]):
+        self.write(EventType.SHUFFLE, room.actor.turns_started, 0, 0, len(draw_pile))
+
+    def combat_ended(self, room: Room):
+        self.write(EventType.COMBAT_ENDED, room.actor.turns_started, 0, int(room.is_won()), room.actor.health)
+
+
+def read_events(path: str, chunk_size: int = 65536) -> Iterator[Event]:
+    """The events in a file written by EventLog, read chunk_size events at a time."""
+    if path.endswith('.jsonl'):
+        with open(path) as file:
+            for line in file:
+                combat, turn, event_type, source, subject, value = json.loads(line)
+                yield Event(combat, turn, EventType(event_type), source, subject, value)
+        return
+
+    with open(path, 'rb') as file:
+        while True:
+            chunk = array('i')
+            data = file.read(chunk_size * EVENT_FIELDS * chunk.itemsize)
+            if not data:
+                return
+            chunk.frombytes(data)
+            if sys.byteorder == 'big':
+                chunk.byteswap()
+            for i in range(0, len(chunk), EVENT_FIELDS):
+                combat, turn, event_type, source, subject, value = chunk[i:i + EVENT_FIELDS]
+                yield Event(combat, turn, EventType(event_type), source, subject, value)
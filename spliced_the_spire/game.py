@@ -1,46 +1,63 @@
-from main.cards import *
-from main.enemies import Cultist, JawWorm
-from main.actors import LeftToRightAI
-from main.abstractions import AbstractActor, AbstractEnemy
-from main.classes import Ironclad
-from lutil import C
+from spliced_the_spire.main.cards import *
+from spliced_the_spire.main.enemies import Cultist, JawWorm
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.abstractions import AbstractActor, Room
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.enumerations import LogLevel
+from spliced_the_spire.lutil import C
 
 
 class Simulation:
-    def __init__(self, actor: type[AbstractActor], enemies, hero, relics, deck, ascension):
-        self.environment = {'enemies': []}
-        self.actor = actor(hero, self.environment, cards=deck)
+    """
+    Plays a combat out, printing as much of it as log_level asks for: every turn at LogLevel.FULL,
+    who fought and who won at LogLevel.SUMMARY, nothing at LogLevel.OFF.
+    """
 
-        # Instantiate the enemies from the provided classes
-        for enemy_class in enemies:
-            enemy = enemy_class(self.environment)
-            enemy.set_actor(self.actor)
+    def __init__(self, actor: type[AbstractActor], enemies, hero, relics, deck, ascension,
+                 log_level: LogLevel = LogLevel.FULL):
+        self.log_level = log_level
+        self.actor = actor(hero, cards=deck)
+        for relic in relics:
+            self.actor.add_relic(relic())
 
-        self.enemies = self.environment['enemies']
+        # Instantiate the enemies from the provided classes
+        self.room = Room(self.actor, [enemy_class(ascension=ascension) for enemy_class in enemies],
+                         log_level=log_level)
+        self.enemies = self.room.enemies
 
     def run(self):
-        print("Starting Simulation:")
-        print(f'Fighting {self.get_names()} with {self.get_healths()} health')
-        print(f'Starting draw order: {self.actor.draw_pile}')
+        verbose = self.log_level is LogLevel.FULL
+        if self.log_level:
+            print("Starting Simulation:")
+            print(f'Fighting {self.get_names()} with {self.get_healths()} health')
+        self.room.start_combat()
+        if verbose:
+            print(f'Starting draw order: {self.actor.draw_pile}')
         while self.actor.health > 0:
 
-            self.actor.turn_impl(verbose=True)
+            self.actor.turn_impl(verbose=verbose)
 
             if self.enemies_dead():
                 break
 
-            print(f'{C.RED}Enemy turn!')
+            if verbose:
+                print(f'{C.RED}Enemy turn!')
             for enemy in self.enemies:
-                print(f'{enemy.name}\'s turn. \n{enemy.name} has {enemy.health} health'
-                      f' and the following effects: {enemy.get_effects_dict()}')
+                if enemy.is_dead():
+                    continue
+                if verbose:
+                    print(f'{enemy.name}\'s turn. \n{enemy.name} has {enemy.health} health'
+                          f' and the following effects: {enemy.get_effects_dict()}')
 
-                log = enemy.take_turn()
-                print(f'{log[-1]}')
+                enemy.take_turn()
+                if verbose:
+                    print(f'{enemy.message}')
 
-        if self.actor.health <= 0:
-            print("Actor LOST")
-        else:
-            print("Actor WON")
+        if self.log_level:
+            if self.actor.health <= 0:
+                print("Actor LOST")
+            else:
+                print("Actor WON")
 
     def enemies_dead(self):
         for enemy in self.enemies:
@@ -61,11 +78,12 @@ class Simulation:
         return healths
 
 
-sim = Simulation(actor=LeftToRightAI,
-                 enemies=[JawWorm],
-                 hero=Ironclad,
-                 relics=[],
-                 deck=[RedDefend(), RedDefend(), RedStrike(), RedDefend()
-                       ],
-                 ascension=0)
-sim.run()
\ No newline at end of file
+if __name__ == '__main__':
+    sim = Simulation(actor=LeftToRightAI,
+                     enemies=[JawWorm],
+                     hero=Ironclad,
+                     relics=[],
+                     deck=[RedDefend(), RedDefend(), RedStrike(), RedDefend()
+                           ],
+                     ascension=0)
+    sim.run()
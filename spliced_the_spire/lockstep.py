@@ -0,0 +1,387 @@
+"""
+A lockstep combat engine that plays many copies of a simple combat at once with NumPy.
+
+Combat state is held as a struct of arrays, one row per combat, and every combat takes the same
+step together, so playing a card or an enemy move is a handful of array operations instead of a walk
+through effect hooks. It only knows the starter-card subset in CARD_ROWS, against the enemies in
+ENEMY_MOVES, played by LeftToRightAI. run_lockstep falls back to the object engine (batch.run_batch)
+for anything else.
+
+Example:
+    result = run_lockstep(100_000, LeftToRightAI,
+                          deck=[RedStrike] * 5 + [RedDefend] * 4 + [Bash],
+                          enemies=[JawWorm], relics=[BurningBlood], ascension=0, seed=1)
+
+Every combat draws from its own RandomStreams, in exactly the order the object engine does, so combat i
+of run_lockstep and batch.run_combat with combat_seed(seed, i) play out the same. run_lockstep(..., cross_check=True) replays every combat on the object engine and raises if
+any result differs.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from spliced_the_spire.main.cards import (AbstractCard, RedStrike, RedDefend, Bash, IronWave, TwinStrike,
+                                          Clothesline, Cleave)
+from spliced_the_spire.main.effects import Block, CurlUp, Ritual, Strength, Vulnerable, Weak
+from spliced_the_spire.main.abstractions import AbstractActor, AbstractEnemy, AbstractRelic
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.classes import Ironclad, STSClass
+from spliced_the_spire.main.enemies import Cultist, JawWorm, GreenLouse, RedLouse
+from spliced_the_spire.main.relics import BurningBlood
+from spliced_the_spire.batch import BatchResult, CombatResult, combat_seed, run_batch, run_combat
+from spliced_the_spire.lutil import RandomStreams
+
+# Cards drawn at the start of every turn, which is also the most cards a hand can hold here
+HAND_SIZE = 5
+# Ritual.on_end_turn gives 3 strength whatever its stacks
+RITUAL_STRENGTH = 3
+# Health BurningBlood heals at the end of a won combat
+BURNING_BLOOD_HEAL = 6
+# The most moves any enemy in ENEMY_MOVES has
+MOST_MOVES = 3
+
+
+class CardRow(NamedTuple):
+    """What a card does, in the order it is resolved: its hits, then block, then debuffs on the target."""
+    cost: int
+    damage: int = 0
+    hits: int = 0
+    all_enemies: bool = False
+    block: int = 0
+    vulnerable: int = 0
+    weak: int = 0
+
+
+class MoveRow(NamedTuple):
+    """What an enemy move does: its attack, then what it gains, then the weak it puts on the actor."""
+    damage: int = 0
+    block: int = 0
+    strength: int = 0
+    ritual: int = 0
+    weak: int = 0
+
+
+# How to read each supported card class into a CardRow, from a (possibly upgraded) card
+CARD_ROWS = {
+    RedStrike: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=1),
+    RedDefend: lambda card: CardRow(card.energy_cost, block=card.block),
+    Bash: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=1, vulnerable=card.vulnerable),
+    IronWave: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=1, block=card.block),
+    TwinStrike: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=2),
+    Clothesline: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=1, weak=card.qty_weak),
+    Cleave: lambda card: CardRow(card.energy_cost, damage=card.damage, hits=1, all_enemies=True),
+}
+
+# The moves of each supported enemy class, keyed by method name. They are read from a created
+# enemy since some values depend on ascension or are rolled
+ENEMY_MOVES = {
+    Cultist: lambda enemy: {'incantation': MoveRow(ritual=enemy.ritual_gain),
+                            'dark_strike': MoveRow(damage=6)},
+    JawWorm: lambda enemy: {'chomp': MoveRow(damage=enemy.chomp_damage),
+                            'thrash': MoveRow(damage=7, block=5),
+                            'bellow': MoveRow(strength=enemy.bellow_strength, block=enemy.bellow_block)},
+    GreenLouse: lambda enemy: {'bite': MoveRow(damage=enemy.base_damage + enemy.bite_bonus),
+                               'spit_web': MoveRow(weak=2)},
+    RedLouse: lambda enemy: {'bite': MoveRow(damage=enemy.base_damage + enemy.bite_bonus),
+                             'grow': MoveRow(strength=enemy.grow_strength)},
+}
+
+
+def card_row(card: type[AbstractCard] | AbstractCard) -> Optional[CardRow]:
+    """Returns the CardRow for a card class or card, or None if the lockstep engine can't play it."""
+    card = card() if isinstance(card, type) else card
+    read = CARD_ROWS.get(type(card))
+    if (read is None or type(card.energy_cost) is not int or card.ex_energy_cost != -1
+            or card.innate or card.ethereal or card.exhaust or card.unplayable):
+        return None
+    return read(card)
+
+
+def supports(actor: type[AbstractActor],
+             deck: Sequence[type[AbstractCard] | AbstractCard],
+             enemies: Sequence[type[AbstractEnemy]],
+             relics: Sequence[type[AbstractRelic]] = ()) -> bool:
+    """True if the lockstep engine can play this combat, otherwise it has to be run on the object engine."""
+    return (actor is LeftToRightAI
+            and len(enemies) > 0
+            and all(enemy in ENEMY_MOVES for enemy in enemies)
+            and all(relic is BurningBlood for relic in relics)
+            and all(card_row(card) is not None for card in deck))
+
+
+class LockstepCombats:
+    """
+    n copies of the same combat, one per seed, stepped together. Actor values are arrays of shape (n,),
+    enemy values (n, enemies) and card piles (n, pile size) arrays of card ids with a count per combat,
+    where the top of the draw pile is the last card.
+    """
+
+    def __init__(self,
+                 deck: Sequence[type[AbstractCard] | AbstractCard],
+                 enemies: Sequence[type[AbstractEnemy]],
+                 seeds: Sequence[int | str],
+                 relics: Sequence[type[AbstractRelic]] = (),
+                 ascension: int = 0,
+                 hero: type[STSClass] = Ironclad):
+        # Each distinct card gets an id, indexing the card tables
+        rows = [card_row(card) for card in deck]
+        distinct = list(dict.fromkeys(rows))
+        deck_ids = [distinct.index(row) for row in rows]
+        table = np.array(distinct, dtype=np.int64).reshape(len(distinct), len(CardRow._fields))
+        (self.card_cost, self.card_damage, self.card_hits, self.card_all_enemies,
+         self.card_block, self.card_vulnerable, self.card_weak) = table.T
+        self.card_all_enemies = self.card_all_enemies.astype(bool)
+
+        n, e, size = len(seeds), len(enemies), len(deck)
+        self.heal: int = BURNING_BLOOD_HEAL * len(relics)
+        self.max_health: int = hero.health
+        self.max_energy: int = 3
+
+        self.health = np.full(n, hero.health, dtype=np.int64)
+        self.energy = np.zeros(n, dtype=np.int64)
+        self.block = np.zeros(n, dtype=np.int64)
+        self.weak = np.zeros(n, dtype=np.int64)
+
+        self.draw_pile = np.zeros((n, size), dtype=np.int64)
+        self.draw_count = np.zeros(n, dtype=np.int64)
+        self.hand = np.zeros((n, HAND_SIZE), dtype=np.int64)
+        self.hand_count = np.zeros(n, dtype=np.int64)
+        self.discard_pile = np.zeros((n, size), dtype=np.int64)
+        self.discard_count = np.zeros(n, dtype=np.int64)
+
+        self.enemy_health = np.zeros((n, e), dtype=np.int64)
+        self.enemy_block = np.zeros((n, e), dtype=np.int64)
+        self.enemy_strength = np.zeros((n, e), dtype=np.int64)
+        self.enemy_vulnerable = np.zeros((n, e), dtype=np.int64)
+        self.enemy_weak = np.zeros((n, e), dtype=np.int64)
+        self.enemy_ritual = np.zeros((n, e), dtype=np.int64)
+        self.enemy_curl_up = np.zeros((n, e), dtype=np.int64)
+
+        # Every enemy class has a fixed set of moves, numbered in ENEMY_MOVES order, and the
+        # MoveRow of each move per combat as some of them are rolled
+        self.move_codes: list[dict[str, int]] = []
+        self.move_table = np.zeros((n, e, MOST_MOVES, len(MoveRow._fields)), dtype=np.int64)
+
+        # The enemies themselves are kept to pick their moves, along with their MoveState and planned move
+        self.enemies: list[list[AbstractEnemy]] = []
+        self.move_states: list[list] = []
+        self.planned_moves: list[list[str]] = []
+        self.rngs: list[RandomStreams] = []
+
+        for i, seed in enumerate(seeds):
+            # Made exactly the way batch.run_combat makes them, so the random streams line up
+            rng = RandomStreams(seed)
+            combat_enemies = [enemy(ascension=ascension, rng=rng) for enemy in enemies]
+
+            for j, enemy in enumerate(combat_enemies):
+                moves = ENEMY_MOVES[type(enemy)](enemy)
+                if i == 0:
+                    self.move_codes.append({move: code for code, move in enumerate(moves)})
+                self.move_table[i, j, :len(moves)] = list(moves.values())
+                self.enemy_health[i, j] = enemy.health
+                self.enemy_block[i, j] = enemy.get_effect_stacks(Block)
+                self.enemy_strength[i, j] = enemy.get_effect_stacks(Strength)
+                self.enemy_vulnerable[i, j] = enemy.get_effect_stacks(Vulnerable)
+                self.enemy_weak[i, j] = enemy.get_effect_stacks(Weak)
+                self.enemy_ritual[i, j] = enemy.get_effect_stacks(Ritual)
+                self.enemy_curl_up[i, j] = enemy.get_effect_stacks(CurlUp)
+
+            # The draw pile is shuffled at the start of every combat
+            pile = list(deck_ids)
+            rng.shuffle.shuffle(pile)
+            self.draw_pile[i] = pile
+            self.draw_count[i] = size
+
+            self.enemies.append(combat_enemies)
+            self.move_states.append([enemy.move_state for enemy in combat_enemies])
+            # Room.start_combat has every enemy plan its first move
+            self.planned_moves.append([enemy.next_move(enemy.move_state, rng.ai) for enemy in combat_enemies])
+            self.rngs.append(rng)
+
+    def run(self, max_turns: int = 100) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Plays every combat out, following Room.run_combat. Returns arrays of whether each combat
+        was won, the hp lost and the number of turns taken.
+        """
+        n = len(self.health)
+        turns = np.zeros(n, dtype=np.int64)
+        running = np.ones(n, dtype=bool)
+        for _ in range(max_turns):
+            running &= (self.health > 0) & (self.enemy_health > 0).any(axis=1)
+            if not running.any():
+                break
+            turns[running] += 1
+            self._actor_turn(running)
+            running &= (self.enemy_health > 0).any(axis=1)
+            for enemy in range(self.enemy_health.shape[1]):
+                self._enemy_turn(running & (self.enemy_health[:, enemy] > 0) & (self.health > 0), enemy)
+
+        won = (self.health > 0) & (self.enemy_health <= 0).all(axis=1)
+        self.health[won] = np.minimum(self.health[won] + self.heal, self.max_health)
+        return won, self.max_health - self.health, turns
+
+    def _draw(self, lanes: np.ndarray, quantity: int):
+        for _ in range(quantity):
+            # Shuffle the discard pile into the empty draw pile, one combat at a time as each has its own streams
+            for i in np.flatnonzero(lanes & (self.draw_count == 0) & (self.discard_count > 0)):
+                size = self.discard_count[i]
+                pile = self.discard_pile[i, :size].tolist()
+                self.rngs[i].shuffle.shuffle(pile)
+                self.draw_pile[i, :size] = pile
+                self.draw_count[i] = size
+                self.discard_count[i] = 0
+
+            drawing = np.flatnonzero(lanes & (self.draw_count > 0))
+            self.hand[drawing, self.hand_count[drawing]] = self.draw_pile[drawing, self.draw_count[drawing] - 1]
+            self.draw_count[drawing] -= 1
+            self.hand_count[drawing] += 1
+
+    def _actor_turn(self, lanes: np.ndarray):
+        self.energy[lanes] = self.max_energy
+        self._draw(lanes, HAND_SIZE)
+        self.block[lanes] = 0
+
+        # LeftToRightAI: play the leftmost playable card at the first living enemy until none can be played
+        slots = np.arange(HAND_SIZE)
+        while True:
+            playable = (slots < self.hand_count[:, None]) & (self.card_cost[self.hand] <= self.energy[:, None])
+            playing = np.flatnonzero(lanes & playable.any(axis=1) & (self.enemy_health > 0).any(axis=1))
+            if not len(playing):
+                break
+            slot = playable[playing].argmax(axis=1)
+            card = self.hand[playing, slot]
+            target = (self.enemy_health[playing] > 0).argmax(axis=1)
+
+            self._play(playing, card, target)
+
+            # Take the card out of the hand, keeping the order of the rest, and discard it
+            shifted = np.minimum(slots + (slots >= slot[:, None]), HAND_SIZE - 1)
+            self.hand[playing] = np.take_along_axis(self.hand[playing], shifted, axis=1)
+            self.hand_count[playing] -= 1
+            self.discard_pile[playing, self.discard_count[playing]] = card
+            self.discard_count[playing] += 1
+            self.energy[playing] -= self.card_cost[card]
+
+        # End of turn: weak wears off and the rest of the hand is discarded in order
+        self.weak[lanes & (self.weak > 0)] -= 1
+        ending = np.flatnonzero(lanes)
+        for slot in range(HAND_SIZE):
+            holding = ending[self.hand_count[ending] > slot]
+            self.discard_pile[holding, self.discard_count[holding] + slot] = self.hand[holding, slot]
+        self.discard_count[ending] += self.hand_count[ending]
+        self.hand_count[ending] = 0
+
+    def _play(self, lanes: np.ndarray, card: np.ndarray, target: np.ndarray):
+        damage = self.card_damage[card]
+        hits = self.card_hits[card]
+        all_enemies = self.card_all_enemies[card]
+        for hit in range(int(hits.max())):
+            single = (hits > hit) & ~all_enemies
+            self._attack_enemy(lanes[single], target[single], damage[single])
+            every = (hits > hit) & all_enemies
+            for enemy in range(self.enemy_health.shape[1]):
+                self._attack_enemy(lanes[every], np.full(every.sum(), enemy), damage[every])
+
+        self.block[lanes] += self.card_block[card]
+        self.enemy_vulnerable[lanes, target] += self.card_vulnerable[card]
+        self.enemy_weak[lanes, target] += self.card_weak[card]
+
+    def _attack_enemy(self, lanes: np.ndarray, enemy: np.ndarray, damage: np.ndarray):
+        # AbstractActor.deal_damage then AbstractEnemy.take_damage, with Weak, Block, Vulnerable and CurlUp
+        damage = np.where(self.weak[lanes] > 0, damage * 3 // 4, damage)
+        block = self.enemy_block[lanes, enemy]
+        blocked = np.minimum(block, damage)
+        actual = damage - blocked + np.where(self.enemy_vulnerable[lanes, enemy] > 0, damage // 2, 0)
+        self.enemy_health[lanes, enemy] -= actual
+
+        curled = actual > 0
+        self.enemy_block[lanes, enemy] = block - blocked + np.where(curled, self.enemy_curl_up[lanes, enemy], 0)
+        self.enemy_curl_up[lanes[curled], enemy[curled]] = 0
+
+    def _enemy_turn(self, lanes: np.ndarray, enemy: int):
+        acting = np.flatnonzero(lanes)
+        if not len(acting):
+            return
+        self.enemy_block[acting, enemy] = 0
+
+        # Moves are picked one combat at a time, each from its own streams
+        codes = self.move_codes[enemy]
+        moves = np.empty(len(acting), dtype=np.int64)
+        for n, i in enumerate(acting):
+            combat_enemy = self.enemies[i][enemy]
+            state = self.move_states[i][enemy]
+            move = self.planned_moves[i][enemy]
+            moves[n] = codes[move]
+            state = self.move_states[i][enemy] = state.advance(move, combat_enemy.history_size)
+            self.planned_moves[i][enemy] = combat_enemy.next_move(state, self.rngs[i].ai)
+        damage, block, strength, ritual, weak = self.move_table[acting, enemy, moves].T
+
+        # AbstractEnemy.deal_damage then AbstractActor.take_damage, with Strength, Weak and Block
+        attacking = acting[damage > 0]
+        damage = damage[damage > 0]
+        damage = (damage + self.enemy_strength[attacking, enemy]
+                  - np.where(self.enemy_weak[attacking, enemy] > 0, damage - damage * 3 // 4, 0))
+        blocked = np.minimum(self.block[attacking], damage)
+        self.block[attacking] -= blocked
+        self.health[attacking] -= damage - blocked
+
+        self.enemy_block[acting, enemy] += block
+        self.enemy_strength[acting, enemy] += strength
+        self.enemy_ritual[acting, enemy] += ritual
+        self.weak[acting] += weak
+
+        # End of turn: vulnerable and weak wear off and ritual gives strength
+        self.enemy_vulnerable[acting, enemy] -= self.enemy_vulnerable[acting, enemy] > 0
+        self.enemy_weak[acting, enemy] -= self.enemy_weak[acting, enemy] > 0
+        self.enemy_strength[acting, enemy] += np.where(self.enemy_ritual[acting, enemy] > 0, RITUAL_STRENGTH, 0)
+
+
+def run_lockstep(n: int,
+                 actor: type[AbstractActor],
+                 deck: Sequence[type[AbstractCard] | AbstractCard],
+                 enemies: Sequence[type[AbstractEnemy]],
+                 relics: Sequence[type[AbstractRelic]] = (),
+                 ascension: int = 0,
+                 seed: int = 0,
+                 hero: type[STSClass] = Ironclad,
+                 max_turns: int = 100,
+                 chunk_size: int = 20_000,
+                 cross_check: bool = False,
+                 workers: Optional[int] = None) -> BatchResult:
+    """
+    Runs n headless combats in lockstep and aggregates the outcomes, giving the same results as
+    batch.run_batch with the same settings. Combats the lockstep engine doesn't support (see supports)
+    are handed to batch.run_batch instead.
+
+    Parameters
+    ----------
+    :param chunk_size:
+        How many combats are stepped together, which bounds the memory used.
+
+    :param cross_check:
+        Replays every combat on the object engine and raises a RuntimeError if any result differs.
+
+    :param workers:
+        Number of worker processes for the batch.run_batch fallback.
+    """
+    if not supports(actor, deck, enemies, relics):
+        return run_batch(n, actor, deck, enemies, relics=relics, ascension=ascension, seed=seed,
+                         hero=hero, workers=workers, max_turns=max_turns)
+
+    results = []
+    for start in range(0, n, chunk_size):
+        seeds = [combat_seed(seed, index) for index in range(start, min(start + chunk_size, n))]
+        combats = LockstepCombats(deck, enemies, seeds, relics=relics, ascension=ascension, hero=hero)
+        won, hp_lost, turns = combats.run(max_turns=max_turns)
+        results.extend(CombatResult(*result) for result in zip(won.tolist(), hp_lost.tolist(), turns.tolist()))
+
+    if cross_check:
+        for index, result in enumerate(results):
+            expected = run_combat(actor, deck, enemies, relics=relics, ascension=ascension,
+                                  seed=combat_seed(seed, index), hero=hero, max_turns=max_turns)
+            if result != expected:
+                raise RuntimeError(f'Lockstep combat {index} gave {result}, the object engine gave {expected}')
+
+    return BatchResult(results)
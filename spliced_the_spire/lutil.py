@@ -1,5 +1,113 @@
-from random import randint
-from typing import Dict, Tuple, Union, Optional
+import json
+from importlib import import_module
+from random import randint, getrandbits, Random
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Tuple, Union, Optional
+
+# The highest ascension, compiled ascension tables have an entry for every ascension from 0 to this
+MAX_ASCENSION = 20
+
+
+class RandomStreams:
+    """
+    The random number generators of one combat or run. Each stream is its own random.Random, seeded
+    from the seed and the stream's name, so drawing more from one stream never changes what another
+    produces, and the same seed always plays out the same way without touching the random module.
+    """
+
+    # Every stream, and the ones that can be drawn from during a combat
+    names: Tuple[str, ...] = ('shuffle', 'ai', 'monster_hp', 'card_random', 'rewards')
+    combat_names: Tuple[str, ...] = ('shuffle', 'ai', 'card_random')
+
+    def __init__(self, seed: Union[int, str, None] = None):
+        """
+        :param seed: Seeds every stream. If not provided, one is drawn from the random module, so
+            code that seeds the random module stays reproducible.
+        """
+        self.seed: Union[int, str] = seed if seed is not None else getrandbits(64)
+        # Shuffling the draw pile and putting cards into it at random
+        self.shuffle: Random = Random(f'{self.seed}:shuffle')
+        # Enemies picking their moves
+        self.ai: Random = Random(f'{self.seed}:ai')
+        # Values enemies roll when they are created (max health, curl up, louse damage)
+        self.monster_hp: Random = Random(f'{self.seed}:monster_hp')
+        # Random targets and picks made by cards
+        self.card_random: Random = Random(f'{self.seed}:card_random')
+        # Card rewards
+        self.rewards: Random = Random(f'{self.seed}:rewards')
+
+    def getstate(self, names: Tuple[str, ...] = names) -> tuple:
+        """Returns the state of the named streams (Default: all of them), to be handed back to setstate()."""
+        return tuple((name, getattr(self, name).getstate()) for name in names)
+
+    def setstate(self, state: tuple):
+        """Puts the streams in a state returned by getstate() back the way they were."""
+        for name, stream_state in state:
+            getattr(self, name).setstate(stream_state)
+
+
+class Registry(Mapping[str, type]):
+    """
+    A read only name -> class mapping (E.g. cards.card_classes, enemies.enemies) built from class
+    level metadata the first time it is looked into, so defining one never instantiates or even
+    lists any classes.
+
+    key(cls) names each class and must only read class attributes. Instead of listing classes,
+    a registry can be loaded from an index written by write_index(), a JSON object of
+    name -> 'module:ClassName', in which case each lookup only imports the module its class is in.
+    """
+
+    def __init__(self, classes: Callable[[], Iterable[type]], key: Callable[[type], str]):
+        """
+        :param classes: Returns the classes to register, called on first use. E.g. AbstractEnemy.__subclasses__
+        :param key: Returns the name a class is registered under.
+        """
+        self._classes = classes
+        self._key = key
+        self._by_name: Optional[Dict[str, type]] = None
+        # 'module:ClassName' by name, for names loaded from an index but not imported yet
+        self._paths: Dict[str, str] = {}
+
+    def _table(self) -> Dict[str, type]:
+        if self._by_name is None:
+            self._by_name = {self._key(cls): cls for cls in self._classes()}
+        return self._by_name
+
+    def load_index(self, path: str):
+        """Loads names from an index written by write_index(), replacing any lookup done so far."""
+        with open(path) as file:
+            self._paths = json.load(file)
+        self._by_name = {}
+
+    def write_index(self, path: str):
+        """Writes every registered name and where its class is defined to path, as JSON."""
+        index = {name: f'{cls.__module__}:{cls.__qualname__}' for name, cls in self.items()}
+        with open(path, 'w') as file:
+            json.dump(index, file, indent=1)
+
+    def __getitem__(self, name: str) -> type:
+        table = self._table()
+        if name not in table and name in self._paths:
+            module, qualname = self._paths[name].split(':')
+            cls = import_module(module)
+            for attribute in qualname.split('.'):
+                cls = getattr(cls, attribute)
+            table[name] = cls
+        return table[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._table() or name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        # Listed up front, looking the names up can add to the table
+        table = self._table()
+        return iter([*table, *(name for name in self._paths if name not in table)])
+
+    def __len__(self) -> int:
+        table = self._table()
+        return len(table) + sum(name not in table for name in self._paths)
+
+    def __repr__(self):
+        return f'Registry({list(self)})'
 
 
 class C:
@@ -22,11 +130,46 @@ def parse_class_name(class_name: str) -> str:
     return final_name[1:]
 
 
+def compile_asc(value_dict: Dict[int, Union[Tuple[int, int], int]]) -> Tuple[Union[Tuple[int, int], int], ...]:
+    """
+    Compiles a value dict in the asc_int format into a tuple with one entry per ascension (0 to MAX_ASCENSION),
+    so the value for an ascension is a single index instead of a sort and a scan.
+    Entries are left as they were in the dict, either a static int or an inclusive (lower, upper) range,
+    use roll_asc to turn an entry into a number.
+    Example: {0: 3, 2: 4} -> (3, 3, 4, 4, ..., 4)
+    ! Warning: Exception will be thrown if there is no 0 key in @value_dict
+    ! Warning: Exception will be thrown if the first tuple int is larger than the second
+    :param value_dict: A dictionary representing values by ascension, see asc_int
+    :return: A tuple of MAX_ASCENSION + 1 entries, indexed by ascension
+    """
+    ascension_bounds = sorted(value_dict.keys())
+    if ascension_bounds[0] != 0:
+        raise Exception('Ascension bounds must include a 0 key.')
+    for value in value_dict.values():
+        if type(value) is tuple and value[0] > value[1]:
+            raise Exception()
+
+    table = []
+    for ascension in range(MAX_ASCENSION + 1):
+        # The entry for the highest bound at or below this ascension
+        bound = max(bound for bound in ascension_bounds if bound <= ascension)
+        table.append(value_dict[bound])
+    return tuple(table)
 
 
+def roll_asc(entry: Union[Tuple[int, int], int], rng=None) -> int:
+    """
+    Turns an entry of a compile_asc table into a number, rolling between the (inclusive)
+    bounds if it is a range.
+    :param entry: A static int, or a (lower, upper) tuple
+    :param rng: The random number generator to roll ranges with (Default: the random module)
+    """
+    if type(entry) is tuple:
+        return rng.randint(*entry) if rng is not None else randint(*entry)
+    return entry
 
 
-def asc_int(ascension: int, value_dict: Dict[int, Union[Tuple[int, int], int]]) -> int:
+def asc_int(ascension: int, value_dict: Dict[int, Union[Tuple[int, int], int]], rng=None) -> int:
     """
     Use this to get a value based on ascension
     This will either return a random value between (lower, upper) bounds if a tuple is provided
@@ -41,6 +184,7 @@ def asc_int(ascension: int, value_dict: Dict[int, Union[Tuple[int, int], int]])
     :param value_dict: A dictionary representing ranges by ascension in either of the following formats:
         {$ascension: (lower_bound, upper_bound)} for randomized numbers
         {$ascension: value} for set static numbers
+    :param rng: The random number generator to roll ranges with (Default: the random module)
     :return: An integer value based on provided ascension and value dict
     """
 
@@ -59,7 +203,7 @@ def asc_int(ascension: int, value_dict: Dict[int, Union[Tuple[int, int], int]])
             if result[0] > result[1]:
                 raise Exception()
             else:
-                return randint(*result)
+                return rng.randint(*result) if rng is not None else randint(*result)
         return result
 
     # Iterate through to try and match the ascension to a range
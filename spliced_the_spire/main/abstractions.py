@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import random
 from abc import abstractmethod, ABC
-from copy import copy
-from typing import Optional
+from array import array
+from collections import deque
+from itertools import count
+from random import Random
+from types import MappingProxyType
+from typing import Callable, Collection, Iterable, Mapping, Optional, NamedTuple
 from spliced_the_spire import lutil
-from spliced_the_spire.lutil import C, asc_int
+from spliced_the_spire.lutil import C, asc_int, compile_asc, roll_asc, MAX_ASCENSION, RandomStreams
 from spliced_the_spire.main.enumerations import *
 from spliced_the_spire.main.effects import *
 
@@ -13,6 +16,20 @@ from spliced_the_spire.main.effects import *
 X = True
 NO_COST = False
 
+# How many entries each log keeps at LogLevel.SUMMARY, older ones are dropped
+SUMMARY_LOG_SIZE = 16
+
+
+def new_log(level: LogLevel) -> list | deque:
+    """An empty log for level, bounded to SUMMARY_LOG_SIZE entries at LogLevel.SUMMARY."""
+    return deque(maxlen=SUMMARY_LOG_SIZE) if level is LogLevel.SUMMARY else []
+
+
+def _drop_last(log: list | deque, entries: int):
+    # Takes back the last entries appended to a log, as far as a bounded log still has them
+    for _ in range(min(entries, len(log))):
+        log.pop()
+
 
 class EffectMixin:
     """
@@ -29,13 +46,43 @@ class EffectMixin:
     - entity.has_effect(effect) -> Returns true if entity has effect
     - entity.has_effect(effect, qty) -> returns true if entity has at least qty stacks of effect
     - entity.get_stacks(effect) -> Returns the number of stacks of effect
+
+    The entity also owns the event bus its effects and relics subscribe to. implemented_hooks
+    maps each EventHookMixin hook to the tuple of bound methods listening for it, and is kept
+    up to date as effects are gained or drop to zero stacks (see add_hooks/remove_hooks).
+
+    Stacks themselves live in effect_stacks, a flat integer array indexed by each effect's
+    AbstractEffect.effect_id. It is cheap to copy (hash bytes(effect_stacks), the array itself
+    is unhashable), and can be handed to numpy without copying:
+    numpy.frombuffer(entity.effect_stacks, dtype=numpy.int64)
     """
 
     def __init__(self):
-        # This is the primary dictionary of effects on an entity
+        # Stacks of every registered effect, indexed by effect_id
+        self.effect_stacks: array = array('q', bytes(8 * len(AbstractEffect.registry)))
+        # This is the primary dictionary of effects on an entity, holding an instance
+        # for every effect with stacks so that its hooks are subscribed
         self.effects: dict[type[AbstractEffect], AbstractEffect] = dict()
         self.ritual_flag: bool = False
-        self.implemented_hooks = {}
+        self.implemented_hooks: dict[callable, tuple[callable, ...]] = {}
+
+    def add_hooks(self, listener: EventHookMixin):
+        """Subscribes listener to every hook its class overrides."""
+        hooks = self.implemented_hooks
+        for hook in type(listener).overridden_hooks:
+            # Tuples are rebuilt rather than mutated, so call_all can iterate safely
+            # while a hook adds or removes listeners
+            hooks[hook] = hooks.get(hook, ()) + (getattr(listener, hook.__name__),)
+
+    def remove_hooks(self, listener: EventHookMixin):
+        """Unsubscribes listener from every hook it was listening to."""
+        hooks = self.implemented_hooks
+        for hook in type(listener).overridden_hooks:
+            remaining = tuple(method for method in hooks.get(hook, ()) if method.__self__ is not listener)
+            if remaining:
+                hooks[hook] = remaining
+            else:
+                hooks.pop(hook, None)
 
     def get_effects_dict(self) -> dict[str, int]:
         """
@@ -46,7 +93,7 @@ class EffectMixin:
         effects_dict = {}
         for effect in self.effects:
             # Add a dictionary entry using the name of the effect as key and stacks as qty
-            effects_dict[effect.__name__] = self.effects[effect].stacks
+            effects_dict[effect.__name__] = self.get_effect_stacks(effect)
         # Return the final dict
         return effects_dict
 
@@ -54,50 +101,82 @@ class EffectMixin:
         """
         Removes all effects from the owner.
         """
+        for instance in self.effects.values():
+            self.remove_hooks(instance)
         self.effects.clear()
+        self.effect_stacks = array('q', bytes(8 * len(AbstractEffect.registry)))
+
+    def remove_effect(self, effect):
+        """Removes effect from the owner, along with any hooks it was listening to."""
+        self.set_effect(effect, 0)
 
     def has_effect(self, effect, quantity=None):
         if quantity is None:
-            return effect in self.effects
+            return self.get_effect_stacks(effect) != 0
         else:
-            return effect.stacks >= quantity
+            return self.get_effect_stacks(effect) >= quantity
 
-    def _check_instantiate_effect(self, effect):
-        if effect not in self.effects:
-            self.effects[effect] = effect(self)
+    def _snapshot_effects(self) -> tuple:
+        # Effect instances keep no state of their own and the hook tuples are never mutated,
+        # so shallow copies are a complete snapshot
+        return self.effect_stacks[:], dict(self.effects), dict(self.implemented_hooks)
+
+    def _restore_effects(self, state: tuple):
+        stacks, effects, hooks = state
+        self.effect_stacks = stacks[:]
+        self.effects = dict(effects)
+        self.implemented_hooks = dict(hooks)
 
     def set_effect(self, effect, value):
-        self._check_instantiate_effect(effect)
-        self.effects.get(effect).stacks = value
+        room = getattr(self, 'room', None)
+        if room is not None and room.events is not None:
+            room.events.effect_changed(room, self, effect, self.get_effect_stacks(effect), value)
+        try:
+            self.effect_stacks[effect.effect_id] = value
+        except IndexError:
+            # The effect class was defined after this entity was created
+            missing = len(AbstractEffect.registry) - len(self.effect_stacks)
+            self.effect_stacks = self.effect_stacks + array('q', bytes(8 * missing))
+            self.effect_stacks[effect.effect_id] = value
+
+        # Keep an instance (and so its hooks) around only while the effect has stacks
+        if value:
+            if effect not in self.effects:
+                self.effects[effect] = effect(self)
+        elif effect in self.effects:
+            self.remove_hooks(self.effects.pop(effect))
 
     def increase_effect(self, effect, value):
-        self._check_instantiate_effect(effect)
-        self.effects.get(effect).stacks += value
+        self.set_effect(effect, self.get_effect_stacks(effect) + value)
 
     def decrease_effect(self, effect, value):
-        self._check_instantiate_effect(effect)
-        self.effects.get(effect).stacks -= value
+        self.set_effect(effect, self.get_effect_stacks(effect) - value)
 
     def get_effect_stacks(self, effect):
-        self._check_instantiate_effect(effect)
-        return self.effects.get(effect).stacks
+        try:
+            return self.effect_stacks[effect.effect_id]
+        except IndexError:
+            return 0
 
 
 class EventHookMixin:
-    def __init__(self, owner):
-        self.implemented_hooks = getattr(owner, 'implemented_hooks')
+    """
+    Base class for anything that reacts to game events (effects, relics, potions).
+    The hooks a subclass overrides are found once, when the class is created,
+    so instantiating an effect never has to inspect its class.
+    """
 
-        # Should in theory be every method in EventHookMixin
-        all_subclass_implemented_methods = [method for method in dir(EventHookMixin)
-                                            if not method.startswith('__') and method != 'implements_method']
-        for method in all_subclass_implemented_methods:
+    # The EventHookMixin hooks overridden by this class, filled in per subclass
+    overridden_hooks: tuple = ()
 
-            # If child overrode method this should activate
-            if getattr(EventHookMixin, method) != getattr(type(self), method):
-                # Add this object to the list of things that should be called for methods
-                parent_method = getattr(EventHookMixin, method)
-                self.implemented_hooks.setdefault(self, parent_method)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.overridden_hooks = tuple(hook for hook in _all_hooks
+                                     if getattr(cls, hook.__name__) is not hook)
 
+    def __init__(self, owner):
+        # Subscribe to the owner's event bus for each overridden hook
+        owner.add_hooks(self)
 
     # Damage hooks
 
@@ -123,7 +202,7 @@ class EventHookMixin:
     def on_lose_hp(self, owner: AbstractActor | AbstractEnemy, room):
         pass
 
-    def on_victim_of_attack(self, owner: AbstractActor | AbstractEnemy,
+    def on_victim_of_attack(self, owner: AbstractActor | AbstractEnemy, room,
                             damaging_enemy: AbstractEnemy | AbstractActor):
         pass
 
@@ -210,9 +289,15 @@ class EventHookMixin:
         return 0
 
 
+# Every hook method defined on EventHookMixin, used to build each subclass's overridden_hooks
+_all_hooks = tuple(method for name, method in vars(EventHookMixin).items()
+                   if callable(method) and not name.startswith('_'))
+
+
 class AbstractActor(EffectMixin, EventHookMixin):
     def __init__(self, clas, cards: list[AbstractCard] = None, hand: Optional[list[AbstractCard]] = None,
-                health: int = None, max_health: int = None):
+                health: int = None, max_health: int = None, room: Optional[Room] = None,
+                rng: Optional[RandomStreams] = None, log_level: LogLevel = LogLevel.FULL):
         super().__init__()
         self.times_received_damage: int = 0
         self.name: str = "Actor"
@@ -227,10 +312,11 @@ class AbstractActor(EffectMixin, EventHookMixin):
         self.energy: int = 3
         self.relics = []
 
-        self.draw_pile: list[AbstractCard] = (clas.start_cards if cards is None else cards)
-        self.hand_pile: list[AbstractCard] = [] if hand is None else hand
-        self.discard_pile: list[AbstractCard] = []
-        self._exhaust_pile: list[AbstractCard] = []
+        # Every actor gets its own starting deck, built from its class's spec
+        self.draw_pile = CardPile(clas.new_deck() if cards is None else cards, CardPiles.DRAW)
+        self.hand_pile = CardPile(() if hand is None else hand, CardPiles.HAND)
+        self.discard_pile = CardPile(pile=CardPiles.DISCARD)
+        self._exhaust_pile = CardPile(pile=CardPiles.EXHAUST)
 
         self.card_piles = {
             CardPiles.DRAW: self.draw_pile,
@@ -239,21 +325,55 @@ class AbstractActor(EffectMixin, EventHookMixin):
             CardPiles.EXHAUST: self._exhaust_pile
         }
 
-        # This log contains what the actor did each turn
-        self.logging: bool = True
-        self.turn_log = []
+        # This log contains what the actor did each turn, as much as log_level asks for
+        self.turns_started: int = 0
+        self.set_log_level(log_level)
 
         # Save the environment to class and add self to it
         #self.environment = environment
         #self.environment['actor'] = self
         self.room = room
 
+        # The random streams this actor draws from, replaced by the room's when it enters one
+        self.rng: RandomStreams = rng if rng is not None else RandomStreams()
+
+    def set_log_level(self, level: LogLevel):
+        """Sets how much goes into turn_log, starting it over. At LogLevel.OFF nothing is logged."""
+        self.log_level = level
+        self.turn_log = new_log(level)
+
     def is_dead(self):
         if self.health <= 0:
             return True
         else:
             return False
 
+    def snapshot(self) -> tuple:
+        """
+        Captures the combat state of the actor (health, energy, piles, cards and effects)
+        as a flat tuple that can be handed back to restore() any number of times.
+        Card objects are shared between snapshots, only their attributes are copied.
+        """
+        piles = (tuple(self.draw_pile), tuple(self.hand_pile),
+                 tuple(self.discard_pile), tuple(self._exhaust_pile))
+        cards = tuple((card, card.__dict__.copy()) for pile in piles for card in pile)
+        return (self.health, self.max_health, self.energy, self.max_energy, self.times_received_damage,
+                piles, cards, self.turns_started, self._snapshot_effects())
+
+    def restore(self, state: tuple):
+        """Puts the actor back into a state captured by snapshot()."""
+        (self.health, self.max_health, self.energy, self.max_energy, self.times_received_damage,
+         piles, cards, turns, effects) = state
+
+        # The pile lists are referenced from card_piles, so refill them rather than replace them
+        self.draw_pile[:], self.hand_pile[:], self.discard_pile[:], self._exhaust_pile[:] = piles
+        for card, attributes in cards:
+            card.__dict__ = attributes.copy()
+        if self.log_level:
+            _drop_last(self.turn_log, self.turns_started - turns)
+        self.turns_started = turns
+        self._restore_effects(effects)
+
     def set_start(self, health, hand):
         # TODO: Assert start
         self.max_health = health
@@ -263,11 +383,14 @@ class AbstractActor(EffectMixin, EventHookMixin):
 
     def receive_damage_from_card(self, damage: int, card: AbstractCard):
         self.health = self.health - damage
+        if self.room is not None and self.room.events is not None:
+            self.room.events.damage_dealt(self.room, None, self, damage)
         call_all(method=EventHookMixin.on_receive_damage_from_card,
+                 owner=self,
                  parameters=(self, self.room, card))
 
     def use_card(self, target: AbstractEnemy, card: AbstractCard, is_free=False, will_discard=True):
-        if card not in self.get_cards(from_piles=CardPiles.HAND):
+        if card not in self.hand_pile:
             raise RuntimeError("Tried to play card not in hand")
         if not card.is_playable(self):
             raise CardNotPlayable('Cannot play this card.')
@@ -275,14 +398,16 @@ class AbstractActor(EffectMixin, EventHookMixin):
         if card.energy_cost == 'x':
             card.energy_cost = self.energy
 
-        card.use(self, target)
+        if self.room is not None and self.room.events is not None:
+            self.room.events.card_played(self.room, card, target)
+        card.use(self, target, self.room)
 
         # If enemy was killed call the on_fatal effect
         card.on_fatal(self)
 
         call_all(method=EventHookMixin.on_card_play,
                  owner=self,
-                 parameters=(self, self, self.room, card))
+                 parameters=(self, self.room, card))
 
         # Exhaust Card logic
         if card in self.hand_pile and card.exhaust:
@@ -298,23 +423,22 @@ class AbstractActor(EffectMixin, EventHookMixin):
             self.hand_pile.remove(card)
         if not is_free:
             self.energy -= card.energy_cost
-        if self.logging:
-            if len(self.turn_log) == 0:
-                pass
-            else:
-                self.turn_log[-1]['turn_actions'].append({
-                    'type': 'use_card',
-                    'card': card,
-                    'target': target,
-                    'message': f'{self.name} used {card.name} on {target.name}'
-                })
-        target.on_victim_of_attack(owner=target, damaging_enemy=self)
+        if self.log_level and self.turn_log:
+            action = {'type': 'use_card', 'card': card, 'target': target}
+            if self.log_level is LogLevel.FULL:
+                action['message'] = f'{self.name} used {card.name} on {target.name}'
+            self.turn_log[-1]['turn_actions'].append(action)
+
+    def add_relic(self, relic: AbstractRelic):
+        self.relics.append(relic)
+        self.add_hooks(relic)
+
     def use_potion(self, target, potion: AbstractPotion):
         self.potionSlotsOpen += 1
         self.potions.remove(potion)
 
     def heal(self, increase: int):
-        self.health += increase
+        self.health = min(self.health + increase, self.max_health)
 
     def increase_max_health(self, increase):
         self.max_health += increase
@@ -322,7 +446,7 @@ class AbstractActor(EffectMixin, EventHookMixin):
 
     def add_card_to_draw(self, card, shuffle=False):
         if shuffle:
-            insert_at = random.randint(0, len(self.draw_pile))
+            insert_at = self.rng.shuffle.randint(0, len(self.draw_pile))
             self.draw_pile.insert(insert_at, card)
         else:
             raise NotImplementedError
@@ -340,63 +464,47 @@ class AbstractActor(EffectMixin, EventHookMixin):
         self.card_piles[CardPiles.DISCARD].append(card)
 
     def get_card(self, **kwargs):
-        return self.get_cards(**kwargs).pop()
+        """The first card get_cards(**kwargs) finds, in pile order. Raises IndexError if there are none."""
+        return self.get_cards(**kwargs)[0]
 
     def get_cards(self,
                   from_piles: CardPiles | list[CardPiles] = None,  # DRAW, HAND, DISCARD, EXHAUST | Default: All
                   with_names: str | list[str] = None,
                   with_types: CardType | list[CardType] = None,  # ATTACK, SKILL, POWER, STATUS, CURSE | Default: All
                   upgraded: bool = None,
-                  exclude_cards: AbstractCard | list[AbstractCard] = None):
+                  exclude_cards: AbstractCard | list[AbstractCard] = None) -> list[AbstractCard]:
         """
-        Get a set of cards based on search criteria
+        Get a list of the distinct cards matching the search criteria, pile by pile.
+        The piles are indexed (see CardPile.query), so this only looks at cards that can match.
 
         :param from_piles: Which card piles you want included in the search.
             (Options: DRAW, HAND, DISCARD, EXHAUST | Default: ALL)
+        :param with_names: Which card names you want included in the search, 'Strike' matches Strike and
+            Strike+ while 'Strike+' only matches upgraded strikes. (Default: ALL)
         :param with_types: Which type of cards you want included in the search.
             (Options: ATTACK, SKILL, POWER, STATUS, CURSE | Default: ALL)
+        :param upgraded: Only include upgraded (True) or not upgraded (False) cards. (Default: Either)
         :param exclude_cards: Specific cards that you want *excluded* from the search. (Default: NONE)
         """
 
         # 1. Default to using all options if none are specified
         # 2. If a singular option was provided auto-insert it into a list
-        # 3. Fetch all the cards based on the options provided
         from_piles = CardPiles.all() if from_piles is None else from_piles
         from_piles = [from_piles] if type(from_piles) == CardPiles else from_piles
-        valid_by_pile_cards = []
-        for pile in from_piles:
-            valid_by_pile_cards += self.card_piles.get(pile)
-
-        if upgraded == None:
-            valid_by_upgraded = self.get_all_cards()
-        else:
-            valid_by_upgraded = [card for card in self.get_all_cards() if card.upgraded == upgraded]
-
-        if with_names == None:
-            valid_by_name = self.get_all_cards()
-        else:
-            if type(with_names) == str:
-                with_names = [with_names]
-
-            valid_by_name = []
-            for card in self.get_all_cards():
-                if card.name in with_names:
-                    valid_by_name.append(card)
-
-        # 1. Default to using all options if none are specified
-        # 2. If a singular option was provided auto-insert it into a list
-        # 3. Fetch all the cards based on the options provided
-        with_types = CardType.all() if with_types is None else with_types
+        with_names = [with_names] if type(with_names) == str else with_names
         with_types = [with_types] if type(with_types) == CardType else with_types
-        valid_by_type_cards = [card for card in self.get_all_cards() if card.card_type in with_types]
 
-        # 1. For exclude cards if none default to empty list
+        # 1. For exclude cards if none default to nothing
         # 2. Listify data
-        exclude_cards = [] if exclude_cards is None else exclude_cards
+        exclude_cards = () if exclude_cards is None else exclude_cards
         exclude_cards = [exclude_cards] if issubclass(type(exclude_cards), AbstractCard) else exclude_cards
 
-        return (set(valid_by_type_cards) & set(valid_by_pile_cards) & set(valid_by_name) & set(
-            valid_by_upgraded)) - set(exclude_cards)
+        # Keyed by card, so a card is only returned once, in the order it was found
+        found = dict.fromkeys(card for pile in from_piles
+                              for card in self.card_piles[pile].query(with_names, with_types, upgraded))
+        for card in exclude_cards:
+            found.pop(card, None)
+        return list(found)
 
     def get_all_cards(self):
         cards = []
@@ -414,7 +522,8 @@ class AbstractActor(EffectMixin, EventHookMixin):
 
     def get_playable_cards(self) -> list[AbstractCard]:
         playable = []
-        for card in self.get_cards(from_piles=CardPiles.HAND):
+        # Walk the hand in order so the result is the same from run to run
+        for card in self.hand_pile:
             if card is None:
                 continue
             if (card.energy_cost == 'x'
@@ -427,20 +536,20 @@ class AbstractActor(EffectMixin, EventHookMixin):
     def deal_damage(self, target, damage):
         damage_mod = call_all(method=EventHookMixin.modify_damage_dealt,
                               owner=self,
-                              parameters=(self, damage),
-                              return_param=damage)
+                              parameters=(self, self.room, damage))
         actual_damage = damage + damage_mod
         target.take_damage(actual_damage)
 
     def take_damage(self, damage, damaging_enemy):
         damage_mod = call_all(method=EventHookMixin.modify_damage_taken,
                               owner=self,
-                              parameters=(self, self.room, damage),
-                              return_param=damage)
+                              parameters=(self, self.room, damage))
 
         actual_damage = damage + damage_mod
 
         self.health -= actual_damage
+        if self.room is not None and self.room.events is not None:
+            self.room.events.damage_dealt(self.room, damaging_enemy, self, actual_damage)
         if actual_damage > 0:
             self.times_received_damage += 1
             call_all(method=EventHookMixin.on_victim_of_attack,
@@ -467,12 +576,14 @@ class AbstractActor(EffectMixin, EventHookMixin):
     def start_turn(self, draw=None):
         self.energy = self.max_energy
         self.draw_card(5)
-        self.turn_log.append({
-            'initial_draw': tuple(self.hand_pile),
-            'initial_energy': copy(self.energy),
-            'initial_health': copy(self.health),
-            'turn_actions': []
-        })
+        self.turns_started += 1
+        if self.log_level:
+            self.turn_log.append({
+                'initial_draw': tuple(self.hand_pile),
+                'initial_energy': self.energy,
+                'initial_health': self.health,
+                'turn_actions': []
+            })
         call_all(method=EventHookMixin.on_start_turn,
                  owner=self,
                  parameters=(self, self.room))
@@ -496,16 +607,12 @@ class AbstractActor(EffectMixin, EventHookMixin):
 
     def draw_card(self, quantity: int = 1):
         """Draws quantity of cards, if the draw pile is empty it will auto shuffle and pull from discard."""
-        modify_card_draw = call_all(method=EventHookMixin.modify_card_draw,
-                                    owner=self,
-                                    parameters=(self, self.room, quantity),
-                                    return_param=quantity)
-        if modify_card_draw is None:
-            modify_card_draw = 0
-        quantity += modify_card_draw
+        quantity += call_all(method=EventHookMixin.modify_card_draw,
+                             owner=self,
+                             parameters=(self, self.room, quantity))
 
         # If it's turn 1 force innate cards to be drawn
-        if len(self.turn_log) == 0:
+        if self.turns_started == 0:
             for card in [card for card in self.draw_pile if card.innate is True]:
                 self.draw_pile.remove(card)
                 self.hand_pile.append(card)
@@ -519,14 +626,16 @@ class AbstractActor(EffectMixin, EventHookMixin):
             if len(self.draw_pile) <= 0 < len(self.discard_pile):
                 self.draw_pile.extend(self.discard_pile)
                 self.discard_pile.clear()
-                random.shuffle(self.draw_pile)
+                self.draw_pile.shuffle(self.rng.shuffle)
+                if self.room is not None and self.room.events is not None:
+                    self.room.events.shuffled(self.room, self.draw_pile)
             # Draw a card
             card = self.draw_pile.pop()
             self.hand_pile.append(card)
             # Process effects related to card draw
             call_all(method=EventHookMixin.on_card_draw,
                      owner=self,
-                     parameters=(self, card))
+                     parameters=(self, self.room, card))
         return True
 
     @abstractmethod
@@ -548,20 +657,23 @@ class AbstractActor(EffectMixin, EventHookMixin):
         return set().union(self.draw_pile, self.hand_pile, self.discard_pile)
 
     def turn_impl(self, verbose: bool):
+        """
+        Plays a whole turn with turn_logic. Returns the turn's turn_log entry, None at LogLevel.OFF.
+        verbose prints the turn as it goes, listing the cards played at LogLevel.FULL.
+        """
         self.start_turn()
 
         if verbose:
-            log = self.turn_log[-1]
             print(f'{C.GREEN}Actor\'s turn:'
-                  f'\n\t drew {log["initial_draw"]} '
-                  f'\n\t has {log["initial_health"]} health / {log["initial_energy"]} energy'
+                  f'\n\t drew {tuple(self.hand_pile)} '
+                  f'\n\t has {self.health} health / {self.energy} energy'
                   f'\n\t these effects: {self.get_effects_dict()}'
                   f'\n\t Draw Pile: {self.draw_pile}'
                   f'\n\t Discard Pile: {self.discard_pile}')
 
         self.turn_logic()
 
-        if verbose:
+        if verbose and self.log_level is LogLevel.FULL:
             print(C.GREEN, end='')
             for action in self.turn_log[-1]['turn_actions']:
                 print(action['message'])
@@ -576,7 +688,110 @@ class AbstractActor(EffectMixin, EventHookMixin):
                   f'\nExhaust Pile: {self._exhaust_pile}'
                   f'\nEnergy: {self.energy}')
 
-        return self.turn_log[-1]
+        return self.turn_log[-1] if self.log_level else None
+
+
+class MoveState(NamedTuple):
+    """
+    Everything that decides an enemy's next move. It is immutable, so forking, copying or
+    pickling an enemy's move selection only ever copies a reference.
+    """
+    # Number of moves the enemy has taken
+    turn: int = 0
+    # Names of the most recent moves, oldest first (at most AbstractEnemy.history_size of them)
+    history: tuple[str, ...] = ()
+
+    def advance(self, move: str, history_size: int) -> MoveState:
+        """Returns the state after the enemy uses move."""
+        return MoveState(self.turn + 1, (self.history + (move,))[-history_size:])
+
+
+class MovePolicy:
+    """
+    A compiled weighted move pattern: each move has a chance, and a successive limit n meaning it
+    can't be used n times in a row (so it is blocked when each of the last n - 1 moves was that move).
+
+    The possible sets of blocked moves are few, so the normalized distribution and an alias table
+    (https://en.wikipedia.org/wiki/Alias_method) are built once for each of them. Sampling a move is then
+    a lookup by history and a single random draw. Policies are shared by every enemy that uses them.
+    """
+
+    # Policies built by MovePolicy.of, keyed by their chances and limits
+    _compiled: dict[tuple, MovePolicy] = {}
+
+    def __init__(self, chances: dict[str, int], successive_limit_dict: dict[str, int]):
+        self.moves: tuple[str, ...] = tuple(successive_limit_dict)
+        self.successive_limits: tuple[int, ...] = tuple(successive_limit_dict.values())
+        weights = [chances[move] for move in self.moves]
+
+        # (moves, probabilities, alias probabilities, alias moves) for every mask of blocked moves,
+        # where bit i of the mask is set if self.moves[i] is blocked
+        self.tables: dict[int, tuple] = {}
+        for mask in range(1 << len(self.moves)):
+            allowed = [i for i in range(len(self.moves)) if not mask & (1 << i)]
+            total = sum(weights[i] for i in allowed)
+            if not total:
+                continue
+            probabilities = tuple(weights[i] / total for i in allowed)
+            keep, alias = self._alias_table(probabilities)
+            moves = tuple(self.moves[i] for i in allowed)
+            self.tables[mask] = (moves, probabilities, keep, tuple(moves[i] for i in alias))
+
+        # The table for each recent move history seen so far
+        self._tables_by_history: dict[tuple[str, ...], tuple] = {}
+
+    @classmethod
+    def of(cls, chances: dict[str, int], successive_limit_dict: dict[str, int]) -> MovePolicy:
+        """Returns the shared policy for these chances and limits, compiling it the first time."""
+        key = (tuple(chances.items()), tuple(successive_limit_dict.items()))
+        policy = cls._compiled.get(key)
+        if policy is None:
+            policy = cls._compiled[key] = cls(chances, successive_limit_dict)
+        return policy
+
+    @staticmethod
+    def _alias_table(probabilities: tuple[float, ...]) -> tuple[tuple[float, ...], tuple[int, ...]]:
+        # Vose's alias method: every slot keeps its own move with probability keep[i], otherwise alias[i]
+        n = len(probabilities)
+        scaled = [p * n for p in probabilities]
+        keep = [1.0] * n
+        alias = list(range(n))
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            keep[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        return tuple(keep), tuple(alias)
+
+    def blocked_mask(self, history: tuple[str, ...]) -> int:
+        """Returns the mask of moves blocked by their successive limits after history."""
+        mask = 0
+        for i, (move, limit) in enumerate(zip(self.moves, self.successive_limits)):
+            recent = history[1 - limit:]
+            if len(recent) == limit - 1 and all(previous == move for previous in recent):
+                mask |= 1 << i
+        return mask
+
+    def _table(self, history: tuple[str, ...]) -> tuple:
+        table = self._tables_by_history.get(history)
+        if table is None:
+            table = self._tables_by_history[history] = self.tables[self.blocked_mask(history)]
+        return table
+
+    def sample(self, state: MoveState, rng) -> str:
+        """Picks the next move for state, drawing a single random number from rng."""
+        moves, _, keep, alias = self._table(state.history)
+        draw = rng.random() * len(moves)
+        i = int(draw)
+        return moves[i] if draw - i < keep[i] else alias[i]
+
+    def distribution(self, state: MoveState) -> dict[str, float]:
+        """Returns the exact probability of each possible next move for state."""
+        moves, probabilities, _, _ = self._table(state.history)
+        return dict(zip(moves, probabilities))
 
 
 class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
@@ -586,6 +801,42 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
     https://slay-the-spire.fandom.com/wiki/Monsters
     """
 
+    # How many recent moves move_state remembers, which must cover the longest successive limit
+    history_size: int = 2
+
+    # Values that depend on ascension, in the asc_int dict format, keyed by the attribute name
+    # they are stored under. Each enemy gets the value for its ascension set as an attribute
+    # when it is created, E.g. {'chomp_damage': {0: 11, 2: 12}} -> self.chomp_damage == 12 on A2+
+    by_ascension: dict[str, dict] = {}
+
+    # The intent each move shows on the turn before the enemy uses it, keyed by method name
+    intents: dict[str, IntentType] = {}
+
+    # by_ascension and max_health compiled with compile_asc, filled in per subclass
+    ascension_tables: dict[str, tuple] = {}
+    max_health_table: Optional[tuple] = None
+
+    # The name the class is registered under (see enemies.enemies), parsed from the class name
+    # unless the class sets its own
+    sts_name: str = ''
+
+    # Every enemy class, in enemy_id order
+    registry: list[type[AbstractEnemy]] = []
+    enemy_id: int = -1
+    # The index of each move in intents, which is how event logs record moves
+    move_ids: dict[str, int] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.enemy_id = len(AbstractEnemy.registry)
+        AbstractEnemy.registry.append(cls)
+        cls.move_ids = {move: move_id for move_id, move in enumerate(cls.intents)}
+        if 'sts_name' not in cls.__dict__:
+            cls.sts_name = lutil.parse_class_name(cls.__name__)
+        cls.ascension_tables = {name: compile_asc(values) for name, values in cls.by_ascension.items()}
+        if isinstance(cls.__dict__.get('max_health'), dict):
+            cls.max_health_table = compile_asc(cls.max_health)
+
     def __init__(self,
                  name: Optional[str] = None,
                  sts_name: Optional[str] = None,
@@ -595,7 +846,10 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
                  ascension=0,
                  room=None,
                  act=1,
-                 target=None):
+                 target=None,
+                 rng: Optional[RandomStreams] = None,
+                 log_level: LogLevel = LogLevel.FULL,
+                 fixed: Optional[dict[str, int]] = None):
         """
         Create an enemy.
 
@@ -615,6 +869,17 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
         :param set_health:
             If specified will set the health of the creature to this amount.
 
+        :param rng:
+            The random streams of the combat. Max health and other rolled values come from
+            rng.monster_hp and moves from rng.ai. If not provided the enemy gets streams of its own.
+
+        :param log_level:
+            How much of each turn goes into print_log and ability_log, see set_log_level.
+
+        :param fixed:
+            Values for by_ascension attributes chosen by the caller, set as they are instead of rolled,
+            so they draw nothing from rng.monster_hp. E.g. {'curl_up_stacks': 3}
+
         Exceptions
         ----------
         :raises RuntimeError:
@@ -626,6 +891,13 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
         self.name = name if name else lutil.parse_class_name(type(self).__name__)
         self.sts_name = self.name
 
+        self.rng: RandomStreams = rng if rng is not None else RandomStreams()
+
+        # Enemies are sometimes created with an environment dict where the ascension goes
+        if ascension == {}:
+            ascension = 0
+        asc_index = min(ascension, MAX_ASCENSION)
+
         # Guards
         if not hasattr(self, 'max_health'):
             raise RuntimeError(f'Tried to call subclass AbstractEnemy without providing static max_health variable. '
@@ -636,12 +908,12 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
             self.max_health = max_health
         # 2. If it was provided in the constructor as a dict, calculate based on asc.
         elif type(max_health) is dict:
-            self.max_health = asc_int(ascension, max_health)
+            self.max_health = asc_int(ascension, max_health, self.rng.monster_hp)
         # 3. Finally, if not provided elsewhere get from the class variable
+        elif self.max_health_table is not None:
+            self.max_health = roll_asc(self.max_health_table[asc_index], self.rng.monster_hp)
         elif hasattr(self, 'max_health'):
-            if ascension == {}:
-                ascension = 0
-            self.max_health = asc_int(ascension, getattr(self, 'max_health'))
+            self.max_health = asc_int(ascension, getattr(self, 'max_health'), self.rng.monster_hp)
 
         if testing:
             max_map: dict = getattr(type(self), 'max_health')
@@ -658,6 +930,13 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
         # Since this was just created current health should be full
         self.health = set_health if set_health else self.max_health
 
+        # Resolve the ascension dependent values for this enemy, rolling the ones that weren't fixed
+        for attribute, table in self.ascension_tables.items():
+            if fixed is not None and attribute in fixed:
+                setattr(self, attribute, fixed[attribute])
+            else:
+                setattr(self, attribute, roll_asc(table[asc_index], self.rng.monster_hp))
+
         # Information about the room that is relevant to the battle
         self.ascension = ascension
         self.act = act
@@ -667,14 +946,14 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
 
         self.actor = target if target else NotImplemented
 
-        # This stores the move pattern of the enemy,
-        # It will populate with a generator the first time
-        # that take_turn is called on this enemy
-        self.ability_method_generator = self.pattern()
+        # This stores where the enemy is in its move pattern, see next_move
+        self.move_state: MoveState = MoveState()
+        # The move picked for the enemy's next turn, see plan_move
+        self.planned_move: Optional[str] = None
 
         # Track the history and stuffs
-        self.print_log = []
-        self.ability_log = []
+        self.turns_taken: int = 0
+        self.set_log_level(log_level)
 
         # Turn specific stuff for enemies to be set in abilities
         self.intent: Optional[IntentType] = None
@@ -685,6 +964,12 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
     def set_start(self):
         pass
 
+    def set_log_level(self, level: LogLevel):
+        """Sets how much goes into print_log and ability_log, starting them over. At LogLevel.OFF nothing is logged."""
+        self.log_level = level
+        self.print_log = new_log(level)
+        self.ability_log = new_log(level)
+
     def set_actor(self, actor):
         self.actor = actor
 
@@ -696,58 +981,100 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
     def is_dead(self):
         return self.health <= 0
 
+    def snapshot(self) -> tuple:
+        """
+        Captures the combat state of the enemy (health, effects, move history)
+        as a flat tuple that can be handed back to restore() any number of times.
+        """
+        return (self.health, self.max_health, self.intent, self.message, self.move_state, self.planned_move,
+                self.turns_taken, self._snapshot_effects())
+
+    def restore(self, state: tuple):
+        """Puts the enemy back into a state captured by snapshot()."""
+        (self.health, self.max_health, self.intent, self.message, self.move_state, self.planned_move,
+         turns, effects) = state
+        if self.log_level:
+            _drop_last(self.ability_log, self.turns_taken - turns)
+            _drop_last(self.print_log, self.turns_taken - turns)
+        self.turns_taken = turns
+        self._restore_effects(effects)
+
     def take_damage(self, damage: int):
         damage_mod = call_all(method=EventHookMixin.modify_damage_taken,
                               owner=self,
-                              parameters=(self, damage),
-                              return_param=damage)
+                              parameters=(self, self.room, damage))
         actual_damage = damage + damage_mod
         if actual_damage:  # TODO: Fix bad coding here
             self.health -= actual_damage
+        if self.room is not None and self.room.events is not None:
+            self.room.events.damage_dealt(self.room, self.actor, self, actual_damage)
         if actual_damage > 0:
 
             call_all(method=EventHookMixin.on_victim_of_attack,
                      owner=self,
-                     parameters=(self, self.actor))
+                     parameters=(self, self.room, self.actor))
 
     def deal_damage(self, damage: int):
         damage_mod = call_all(method=EventHookMixin.modify_damage_dealt,
                               owner=self,
-                              parameters=(self, self.room, damage),
-                              return_param=damage)
+                              parameters=(self, self.room, damage))
         damage = damage + damage_mod
         actor = self.get_actor()
         actor.take_damage(damage=damage, damaging_enemy=self)
 
     @abstractmethod
-    def pattern(self):
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
+        """
+        * You are REQUIRED to implement this method in subclasses. *
+        Returns how the enemy picks its next move from state: either the name of the method it
+        will use, or a MovePolicy to pick one at random. This must only depend on state and the
+        enemy's fixed settings (like ascension), never change the enemy, so that move selection
+        can be forked, replayed or run in another process.
+
+        Parameters
+        ----------
+        :param state:
+            The enemy's current MoveState.
+        """
         raise NotImplementedError
 
-    def rule_pattern(self, chances, successive_limit_dict):
-        # Get a list of the possible abilities based on successiveness?
+    def next_move(self, state: MoveState, rng) -> str:
+        """
+        Returns the name of the method the enemy will use next.
+
+        Parameters
+        ----------
+        :param state:
+            The enemy's current MoveState.
 
-        valid_abilities = []
-        turns_taken = len(self.ability_log)
+        :param rng:
+            The random number generator to draw from (a random.Random or the random module).
+        """
+        policy = self.move_policy(state)
+        return policy if type(policy) is str else policy.sample(state, rng)
 
-        for ability in successive_limit_dict:
-            ability_limit = successive_limit_dict[ability]
-            # For every ability, if turns taken so far is less than the limit, automatically valid.
-            if turns_taken < ability_limit:
-                valid_abilities.append(ability)
-            else:
-                for i in range(ability_limit):
-                    if self.ability_log[-i] == ability:
-                        continue
-                    valid_abilities.append(ability)
-                    break
+    def move_distribution(self, state: MoveState) -> dict[str, float]:
+        """Returns the exact probability of each possible next move from state, without sampling."""
+        policy = self.move_policy(state)
+        return {policy: 1.0} if type(policy) is str else policy.distribution(state)
 
-        # Then use chances to pick between them
-        weights = []
-        for ability in valid_abilities:
-            weights.append(chances[ability])
+    @staticmethod
+    def rule_pattern(state: MoveState, rng, chances: dict[str, int], successive_limit_dict: dict[str, int]) -> str:
+        """
+        Picks a move at random, weighted by chances, from the moves that aren't blocked by
+        successive_limit_dict. A move with a successive limit of n can't be used n times in a row,
+        so it is blocked when each of the last n - 1 moves was that move.
+        Enemies with a fixed pattern should keep a MovePolicy instead of calling this every turn.
+        """
+        return MovePolicy.of(chances, successive_limit_dict).sample(state, rng)
 
-        x = random.choices(valid_abilities, weights)
-        return x[0]  # Random.choices returns a list???
+    def plan_move(self):
+        """
+        Picks the move the enemy will use on its next turn and shows its intent, like the game does
+        at the start of combat and after every enemy turn.
+        """
+        self.planned_move = self.next_move(self.move_state, self.rng.ai)
+        self.intent = self.intents.get(self.planned_move, IntentType.UNKNOWN)
 
     def take_turn(self):
         call_all(method=EventHookMixin.on_start_turn,
@@ -757,44 +1084,76 @@ class AbstractEnemy(ABC, EffectMixin, EventHookMixin):
         self.intent = None
         self.message = None
 
-        # Get and call the next ability method the enemy will use
-        next_method = next(self.ability_method_generator)
+        # Get and call the next ability method the enemy will use, picking it now if it wasn't planned
+        move = self.planned_move if self.planned_move is not None else self.next_move(self.move_state, self.rng.ai)
+        self.planned_move = None
+        if self.room is not None and self.room.events is not None:
+            self.room.events.enemy_move(self.room, self, move)
+        next_method = getattr(self, move)
         next_method()
-        self.ability_log.append(next_method)
+        self.move_state = self.move_state.advance(move, self.history_size)
+        self.turns_taken += 1
 
-        if self.intent is None or self.message is None:
+        # Moves only need to build a message when it is logged
+        if self.intent is None or (self.log_level and self.message is None):
             raise RuntimeError(f'Yo, set the intent/message in the {next_method.__name__} method.')
 
         # Append the message
-        self.print_log.append(self.message)
+        if self.log_level:
+            self.ability_log.append(next_method)
+            self.print_log.append(self.message)
         call_all(method=EventHookMixin.on_end_turn,
                  owner=self,
                  parameters=(self, self.room))
+        self.plan_move()
         return self.print_log
 
 
-# TODO: Lots of occurrences of return_param damage being passed twice awkwardly and self and self.env being passed
-def call_all(method, owner, parameters, return_param: Optional[int] = None):
-    if method not in getattr(owner, 'implemented_hooks'):
-        return 0 if return_param else return_param
-
-    # Get all objects that the method requested
-    objects_with_hooks = owner.implemented_hooks[method]
-    print(objects_with_hooks)
-    # For each of those objects
-    for obj in objects_with_hooks:
-        # Get the actual method associated with the object
-        # (E.g. Strength.modify_damage_dealt instead of EventHookMixin.modify_damage_dealt)
-        method = getattr(obj, method.__name__)
-
-        # If the method is returning something keep track of that and return in
-        result = 0
-        if return_param:
-            result = method(*parameters)
-        else:
-            method(*parameters)
+def call_all(method, owner, parameters) -> int:
+    """
+    Calls every listener subscribed to method on owner's event bus and returns the sum of
+    their results (None counts as 0), so modifier hooks such as modify_damage_dealt stack.
 
-    return result
+    :param method: The EventHookMixin hook being fired (E.g. EventHookMixin.on_end_turn)
+    :param owner: The actor or enemy whose effects and relics should be notified
+    :param parameters: The arguments passed to each listener
+    """
+    listeners = owner.implemented_hooks.get(method)
+    # Nobody is listening, which is the common case
+    if not listeners:
+        return 0
+
+    total = 0
+    for listener in listeners:
+        result = listener(*parameters)
+        if result:
+            total += result
+    return total
+
+
+class CardDefinition(NamedTuple):
+    """Everything the cards of one class have in common, see AbstractCard.definition()."""
+    card_id: int
+    name: str
+    energy_cost: int | bool
+    card_type: CardType
+    rarity: Rarity
+    color: Color
+    exhaust: bool
+    ethereal: bool
+    innate: bool
+    unplayable: bool
+    poof: bool
+    allow_multiple_upgrades: bool
+    # The card's own attributes (damage, block, ...) and the ones upgrading it changes, with their new values
+    stats: Mapping[str, object]
+    upgrade: Mapping[str, object]
+
+
+# The AbstractCard.__init__ arguments a class shares between its cards, in order
+_CARD_ARGUMENTS = ('card_type', 'energy_cost', 'rarity', 'color', 'name', 'exhaust', 'ethereal', 'innate',
+                   'unplayable', 'allow_multiple_upgrades')
+_card_uids = count()
 
 
 class AbstractCard(ABC):
@@ -803,8 +1162,37 @@ class AbstractCard(ABC):
     is to allow simple, quick implementation of Slay the Spire cards. To use write an implementation
     for a card, write a class that inherits this class as well as ABC, then implement an __init__,
     use, and upgrade_logic methods.
+
+    What a class's cards share (name, cost, type, rarity, color and flags) is set on the class from
+    the first card made, so a card only holds its uid, its own numbers and whatever has been changed
+    on it (upgraded, a temporary cost, ...). Every class gets a card_id, its index in
+    AbstractCard.registry. Copy cards with card.copy() or make them with Class.make(), neither
+    of which runs __init__.
     """
 
+    # Every card class, in card_id order
+    registry: list[type[AbstractCard]] = []
+    card_id: int = -1
+
+    # Shared by all cards of a class, see _define
+    name: str = ''
+    energy_cost: int | bool = NO_COST
+    card_type: CardType = CardType.UNKNOWN
+    rarity: Rarity = Rarity.UNKNOWN
+    color: Color = Color.UNKNOWN
+    exhaust: bool = False
+    ethereal: bool = False
+    innate: bool = False
+    unplayable: bool = False
+    poof: bool = False
+    allow_multiple_upgrades: bool = False
+
+    # Card state, set on a card when it changes
+    upgraded: bool = False
+    # old cost of the card if the cost is ever changed temporarily (For example, card costs 0 this turn)
+    ex_energy_cost: int = -1
+    room = None
+
     def __init__(self,
                  card_type: CardType = CardType.UNKNOWN,
                  energy_cost: int | str = NO_COST,
@@ -857,53 +1245,101 @@ class AbstractCard(ABC):
             If the card can be upgraded multiple times (Example: Searing blow)
 
         """
-        # If name is not provided then it will be parsed from subclass name
-        if name is None:
-            class_name = type(self).__name__
-            final_name = ''
-
-            for char in class_name:
-                if char.isupper():
-                    final_name += ' '
-                final_name += char
-            self.name: str = final_name[1:]
-        else:
-            self.name: str = name
-
-        # normal energy cost of card ("cost" int)
-        self.energy_cost: int = energy_cost
-
-        # old cost of the card if the cost is ever changed temporarily (For example, card costs 0 this turn)
-        self.ex_energy_cost: int = -1
-
-        # If the card is innate or not
-        self.innate: bool = innate
-
-        # If the card is upgraded or not
-        self.upgraded: bool = upgraded
-
-        # Type and rarity of card
-        self.card_type: CardType = card_type
-        self.rarity: Rarity = card_rarity
-        self.color: Color = card_color
-
-        # The room?
-        self.room = room
-
-        # Card behavior
-        self.exhaust: bool = exhaust
-        self.ethereal: bool = ethereal
-        self.unplayable: bool = unplayable
-        self.poof: bool = False
-
-        # Allows the card to be upgraded multiple times (Searing blow)
-        self.allow_multiple_upgrades = allow_multiple_upgrades
-
-        # Setup for power type cards
-        if self.card_type is CardType.POWER:
-            self.poof = True
-            if self.exhaust or self.ethereal:
-                raise RuntimeError('WAT? (Power card with exhaust/ethereal found)')
+        cls = type(self)
+        arguments = (card_type, energy_cost, card_rarity, card_color, name, exhaust, ethereal, innate,
+                     unplayable, allow_multiple_upgrades)
+        if '_arguments' not in cls.__dict__:
+            cls._define(*arguments)
+
+        # Cards share their class's attributes, only keeping what is their own (and anything they
+        # were made with that differs from their class) on the card itself
+        self.uid: int = next(_card_uids)
+        if arguments != cls._arguments:
+            for attribute, value in zip(_CARD_ARGUMENTS, arguments):
+                if value is not None and value != getattr(cls, attribute):
+                    setattr(self, attribute, value)
+        if upgraded:
+            self.upgraded = True
+        if room is not None:
+            self.room = room
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.card_id = len(AbstractCard.registry)
+        AbstractCard.registry.append(cls)
+        # Parsed once per class, replaced by the name its cards pass to __init__ if they do
+        cls.name = lutil.parse_class_name(cls.__name__)
+
+    @classmethod
+    def _define(cls,
+                card_type: CardType,
+                energy_cost: int | bool,
+                card_rarity: Rarity,
+                card_color: Color,
+                name: Optional[str],
+                exhaust: bool,
+                ethereal: bool,
+                innate: bool,
+                unplayable: bool,
+                allow_multiple_upgrades: bool):
+        # Sets the attributes every card of the class shares, from the first one made
+        if card_type is CardType.POWER and (exhaust or ethereal):
+            raise RuntimeError('WAT? (Power card with exhaust/ethereal found)')
+        if name is not None:
+            cls.name = name
+        cls.energy_cost = energy_cost
+        cls.card_type = card_type
+        cls.rarity = card_rarity
+        cls.color = card_color
+        cls.exhaust = exhaust
+        cls.ethereal = ethereal
+        cls.innate = innate
+        cls.unplayable = unplayable
+        cls.allow_multiple_upgrades = allow_multiple_upgrades
+        # Power cards are removed from play once used
+        cls.poof = card_type is CardType.POWER
+        # As given, so cards made the same way as the first can skip comparing them one by one
+        cls._arguments = (card_type, energy_cost, card_rarity, card_color, name, exhaust, ethereal, innate,
+                          unplayable, allow_multiple_upgrades)
+
+    @classmethod
+    def definition(cls) -> CardDefinition:
+        """
+        The CardDefinition shared by every card of this class, built the first time it is asked for
+        by making a card and upgrading a copy of it.
+        """
+        definition = cls.__dict__.get('_definition')
+        if definition is None:
+            prototype = cls()
+            upgraded = prototype.copy()
+            upgraded.upgrade()
+            stats = {attribute: value for attribute, value in vars(prototype).items() if attribute != 'uid'}
+            upgrade = {attribute: value for attribute, value in vars(upgraded).items()
+                       if attribute not in ('uid', 'name', 'upgraded')
+                       and getattr(prototype, attribute) != value}
+            definition = CardDefinition(cls.card_id, cls.name, cls.energy_cost, cls.card_type, cls.rarity,
+                                        cls.color, cls.exhaust, cls.ethereal, cls.innate, cls.unplayable,
+                                        cls.poof, cls.allow_multiple_upgrades,
+                                        MappingProxyType(stats), MappingProxyType(upgrade))
+            cls._definition = definition
+            cls._prototype = prototype
+        return definition
+
+    @classmethod
+    def make(cls) -> AbstractCard:
+        """A new card of this class, copied from the class's prototype card rather than built by __init__."""
+        if '_prototype' not in cls.__dict__:
+            cls.definition()
+        return cls._prototype.copy()
+
+    def copy(self) -> AbstractCard:
+        """A copy of this card as it is now (upgrades, costs and all) with its own uid."""
+        card = object.__new__(type(self))
+        card.__dict__ = self.__dict__.copy()
+        card.uid = next(_card_uids)
+        return card
+
+    __copy__ = copy
 
     @abstractmethod
     def use(self, caller: 'AbstractActor', enemies: ['AbstractEnemy']):
@@ -1015,18 +1451,189 @@ class AbstractCard(ABC):
         return self.name
 
 
+def _base_name(card: AbstractCard) -> str:
+    # The name a card is indexed under, upgrading only ever appends a +
+    return card.name.rstrip('+')
+
+
+class CardPile(list):
+    """
+    A list of cards that indexes what it holds by card type and name as cards come and go,
+    so `card in pile` is O(1) and query() only looks at the cards that can match.
+
+    Every list method that changes the pile keeps the indexes up to date, so cards and relics can
+    keep appending, removing and popping as they would on a list. Shuffle with shuffle(rng) rather
+    than rng.shuffle(pile), which would reindex on every swap.
+    """
+
+    __slots__ = ('pile', '_counts', '_by_type', '_by_name')
+
+    def __init__(self, cards: Iterable[AbstractCard] = (), pile: Optional[CardPiles] = None):
+        super().__init__()
+        self.pile: Optional[CardPiles] = pile
+        # How many times each card is in the pile, and the cards of each type / base name in the order they came in
+        self._counts: dict[AbstractCard, int] = {}
+        self._by_type: dict[CardType, dict[AbstractCard, None]] = {}
+        self._by_name: dict[str, dict[AbstractCard, None]] = {}
+        self.extend(cards)
+
+    def __reduce__(self):
+        # Copy and pickle through __init__, so the indexes are rebuilt rather than appended to twice
+        return type(self), (list(self), self.pile)
+
+    # --- Index upkeep ---
+
+    def _index(self, card: AbstractCard):
+        count = self._counts.get(card, 0)
+        self._counts[card] = count + 1
+        if not count:
+            self._by_type.setdefault(card.card_type, {})[card] = None
+            self._by_name.setdefault(_base_name(card), {})[card] = None
+
+    def _unindex(self, card: AbstractCard):
+        count = self._counts[card] - 1
+        if count:
+            self._counts[card] = count
+            return
+        del self._counts[card]
+        del self._by_type[card.card_type][card]
+        del self._by_name[_base_name(card)][card]
+
+    # --- List methods ---
+
+    def __contains__(self, card) -> bool:
+        return card in self._counts
+
+    def append(self, card: AbstractCard):
+        super().append(card)
+        self._index(card)
+
+    def extend(self, cards: Iterable[AbstractCard]):
+        cards = list(cards)
+        super().extend(cards)
+        for card in cards:
+            self._index(card)
+
+    def __iadd__(self, cards: Iterable[AbstractCard]):
+        self.extend(cards)
+        return self
+
+    def insert(self, index: int, card: AbstractCard):
+        super().insert(index, card)
+        self._index(card)
+
+    def remove(self, card: AbstractCard):
+        super().remove(card)
+        self._unindex(card)
+
+    def pop(self, index: int = -1) -> AbstractCard:
+        card = super().pop(index)
+        self._unindex(card)
+        return card
+
+    def clear(self):
+        super().clear()
+        self._counts.clear()
+        self._by_type.clear()
+        self._by_name.clear()
+
+    def __setitem__(self, index, value):
+        old = self[index]
+        if isinstance(index, slice):
+            value = list(value)
+            super().__setitem__(index, value)
+            for card in old:
+                self._unindex(card)
+            for card in value:
+                self._index(card)
+        else:
+            super().__setitem__(index, value)
+            self._unindex(old)
+            self._index(value)
+
+    def __delitem__(self, index):
+        old = self[index]
+        super().__delitem__(index)
+        for card in (old if isinstance(index, slice) else (old,)):
+            self._unindex(card)
+
+    def __imul__(self, times: int):
+        if times <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (times - 1))
+        return self
+
+    # --- Queries ---
+
+    def shuffle(self, rng: Random):
+        """Shuffles the pile in place with rng, the same as rng.shuffle(pile) without touching the indexes."""
+        cards = list(self)
+        rng.shuffle(cards)
+        super().__setitem__(slice(None), cards)
+
+    def count_of(self, card: AbstractCard) -> int:
+        """How many times card is in the pile, in O(1)."""
+        return self._counts.get(card, 0)
+
+    def query(self,
+              with_names: Optional[Collection[str]] = None,
+              with_types: Optional[Collection[CardType]] = None,
+              upgraded: Optional[bool] = None) -> list[AbstractCard]:
+        """
+        The distinct cards in the pile with one of with_names, one of with_types and the given upgraded
+        state, where None matches anything. A name without a + matches the card upgraded or not,
+        E.g. 'Strike' matches Strike and Strike+ while 'Strike+' only matches Strike+.
+
+        Cards are looked up by name or type first, so the work done is proportional to the cards
+        of those names / types rather than to the size of the pile.
+        """
+        if with_names is not None:
+            candidates = [card for name in dict.fromkeys(name.rstrip('+') for name in with_names)
+                          for card in self._by_name.get(name, ())]
+        elif with_types is not None:
+            candidates = [card for card_type in with_types for card in self._by_type.get(card_type, ())]
+        else:
+            candidates = list(self._counts)
+        return [card for card in candidates
+                if (with_names is None or card.name in with_names or _base_name(card) in with_names)
+                and (with_types is None or card.card_type in with_types)
+                and (upgraded is None or card.upgraded == upgraded)]
+
+
 class AbstractEffect(EventHookMixin, EffectMixin):
     """
     This abstraction allows the easy creation of Effects.
     An effect in this context is a Slay The Spire Buff,
     Debuff, or block.
+
+    Every subclass is given an effect_id when it is defined, which is its index in
+    AbstractEffect.registry and in its owner's effect_stacks array.
     """
 
+    # Every effect class, in effect_id order
+    registry: list[type[AbstractEffect]] = []
+    effect_id: int = -1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.effect_id = len(AbstractEffect.registry)
+        AbstractEffect.registry.append(cls)
+
     def __init__(self, owner):
         super().__init__(owner)
         self.max = None
         self.owner = owner
-        self.stacks = 0  # Number of stacks of this effect
+
+    @property
+    def stacks(self) -> int:
+        """Number of stacks of this effect, read from the owner's effect_stacks."""
+        return self.owner.get_effect_stacks(type(self))
+
+    @stacks.setter
+    def stacks(self, value: int):
+        # An effect set to zero stacks is removed from its owner, and stops listening for events
+        self.owner.set_effect(type(self), value)
 
 
 class AbstractPotion(EventHookMixin):
@@ -1043,13 +1650,11 @@ class AbstractRelic(ABC, EventHookMixin):
     def __init__(self,
                  relic_rarity: Rarity,
                  relic_color: Color,
-                 implemented_hooks: []
                  ):
+        # Relics start listening for events once an actor picks them up (see AbstractActor.add_relic)
         self.relic_rarity = relic_rarity
         self.relic_color = relic_color
 
-        super().__init__(self)
-
 
 class AbstractGame(ABC):
     def __init__(self,
@@ -1101,6 +1706,9 @@ class AbstractGame(ABC):
 
 
 class AbstractRoom(ABC):
+    # Where the events of a combat in the room are written, see Room
+    events: Optional[EventLog] = None
+
     def __init__(self,
                  actor: AbstractActor,
                  ):
@@ -1159,6 +1767,146 @@ class AbstractCombat(AbstractRoom):
         self.actor.use_card(target=self.enemies[0], card=useCard)
 
 
+class Room(AbstractCombat):
+    """
+    A combat between an actor and a group of enemies. Creating the room (or adding things
+    to it) links everything together, so enemies target the actor and everyone can reach the room.
+
+    The room owns the random streams of the combat (rng) and hands them to everyone in it. If it
+    isn't given any it takes over the actor's. Given a log_level, it sets everyone in it to that too.
+    Given an events.EventLog, the combat writes what happens in it there, from start_combat on.
+    """
+
+    def __init__(self,
+                 actor: Optional[AbstractActor] = None,
+                 enemies: Optional[list[AbstractEnemy]] = None,
+                 isElite: bool = False,
+                 isBoss: bool = False,
+                 rng: Optional[RandomStreams] = None,
+                 log_level: Optional[LogLevel] = None,
+                 events: Optional[EventLog] = None):
+        super().__init__(actor=None, enemies=[], isElite=isElite, isBoss=isBoss)
+        # Where the combat's events are written, if anywhere
+        self.events: Optional[EventLog] = events
+        self.rng: RandomStreams = (rng if rng is not None
+                                   else actor.rng if actor is not None
+                                   else RandomStreams())
+        # If given, the log level everyone in the room is set to
+        self.log_level: Optional[LogLevel] = log_level
+        if actor is not None:
+            self.set_actor(actor)
+        for enemy in enemies if enemies is not None else []:
+            self.add_enemy(enemy)
+
+    def set_actor(self, actor: AbstractActor):
+        self.actor = actor
+        actor.room = self
+        actor.rng = self.rng
+        if self.log_level is not None:
+            actor.set_log_level(self.log_level)
+        for enemy in self.enemies:
+            enemy.set_actor(actor)
+
+    def add_enemy(self, enemy: AbstractEnemy):
+        self.enemies.append(enemy)
+        enemy.room = self
+        enemy.rng = self.rng
+        if self.log_level is not None:
+            enemy.set_log_level(self.log_level)
+        if self.actor is not None:
+            enemy.set_actor(self.actor)
+
+    def enemies_dead(self) -> bool:
+        return all(enemy.is_dead() for enemy in self.enemies)
+
+    def is_won(self) -> bool:
+        return not self.actor.is_dead() and self.enemies_dead()
+
+    def start_combat(self):
+        """
+        Shuffles the draw pile, fires the enter combat hooks and has the enemies plan their
+        first moves, before the actor's first turn.
+        """
+        actor = self.actor
+
+        if self.events is not None:
+            self.events.combat_started(self)
+        # The draw pile is shuffled at the start of every combat
+        actor.draw_pile.shuffle(self.rng.shuffle)
+        if self.events is not None:
+            self.events.shuffled(self, actor.draw_pile)
+        call_all(method=EventHookMixin.on_enter_combat,
+                 owner=actor,
+                 parameters=(actor, self))
+        for enemy in self.enemies:
+            enemy.plan_move()
+
+    def take_enemy_turns(self):
+        """Every living enemy takes its turn in order, stopping if the actor dies."""
+        for enemy in self.enemies:
+            if not enemy.is_dead():
+                enemy.take_turn()
+            if self.actor.is_dead():
+                break
+
+    def end_combat(self):
+        """Fires the end combat hooks if the actor won."""
+        if self.events is not None:
+            self.events.combat_ended(self)
+        if self.is_won():
+            call_all(method=EventHookMixin.on_end_combat,
+                     owner=self.actor,
+                     parameters=(self.actor, self))
+
+    def run_combat(self, max_turns: int = 100, on_turn: Optional[Callable[[Room], None]] = None) -> int:
+        """
+        Plays the combat out without printing anything, with the actor's turn_logic choosing what to play,
+        until the actor or every enemy is dead. Returns the number of turns taken.
+
+        Parameters
+        ----------
+        :param max_turns:
+            The combat is abandoned after this many turns, so decks that can't win don't loop forever.
+
+        :param on_turn:
+            Called with the room after the enemies' turns that end every round, E.g. to hash the state.
+        """
+        actor = self.actor
+        self.start_combat()
+
+        turns = 0
+        while turns < max_turns and not actor.is_dead():
+            turns += 1
+            actor.turn_impl(verbose=False)
+            if self.enemies_dead():
+                break
+            self.take_enemy_turns()
+            if on_turn is not None:
+                on_turn(self)
+
+        self.end_combat()
+        return turns
+
+    def snapshot(self) -> tuple:
+        """
+        Captures the whole combat (actor, enemies and the random streams) so that search
+        based agents can fork it with restore(). Snapshots are flat tuples that share
+        card and effect objects, so taking one is cheap.
+        """
+        return (self.actor.snapshot(),
+                tuple((enemy, enemy.snapshot()) for enemy in self.enemies),
+                self.rng.getstate(RandomStreams.combat_names))
+
+    def restore(self, state: tuple):
+        """Puts the combat back into a state captured by snapshot(). A snapshot may be restored many times."""
+        actor_state, enemy_states, random_state = state
+        self.actor.restore(actor_state)
+        self.enemies[:] = [enemy for enemy, _ in enemy_states]
+        for enemy, enemy_state in enemy_states:
+            enemy.restore(enemy_state)
+        self.rng.setstate(random_state)
+
+
 class AbstractShop(AbstractRoom):
     pass
 
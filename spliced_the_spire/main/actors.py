@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABC
 
 from spliced_the_spire.main.abstractions import AbstractActor, AbstractCard
-from spliced_the_spire.main.enumerations import SelectEvent
+from spliced_the_spire.main.enumerations import LogLevel, SelectEvent
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -17,15 +17,15 @@ class DummyActor(AbstractActor, ABC):
         self.energy = energy
         self.max_energy = energy
 
-        self.logging = False
+        self.set_log_level(LogLevel.OFF)
 
     def select_card(self, options: list[AbstractCard], event_type: SelectEvent) -> AbstractCard:
         return options[-1]
 
 
 class LeftToRightAI(AbstractActor):
-    def __init__(self, clas, environment, cards):
-        super().__init__(clas, environment, cards=cards)
+    def __init__(self, clas, cards=None, *args, **kwargs):
+        super().__init__(clas, cards=cards, *args, **kwargs)
 
     def turn_logic(self):
 
@@ -34,7 +34,7 @@ class LeftToRightAI(AbstractActor):
         while len(choices) > 0:
             # Find a valid enemy with health remaining
             valid_enemy = None
-            for enemy in self.environment['enemies']:
+            for enemy in self.room.enemies:
                 if enemy.health > 0:
                     valid_enemy = enemy
                     break
@@ -43,10 +43,26 @@ class LeftToRightAI(AbstractActor):
             if not valid_enemy:
                 break
 
-            self.use_card(valid_enemy, choices[0], self.environment['enemies'])
+            self.use_card(valid_enemy, choices[0])
             choices = self.get_playable_cards()
 
     def select_card(self, options: list[AbstractCard], event_type: SelectEvent) -> AbstractCard:
         if event_type is SelectEvent.COPY:
             return options[-1]
         return options[0]
+
+
+class ExternalActor(AbstractActor):
+    """
+    An actor whose cards are picked from outside, one use_card call at a time (E.g. by env.CombatEnv),
+    so its turn_logic does nothing. Cards that make it choose take the first option.
+    """
+
+    def turn_logic(self):
+        pass
+
+    def select_card(self, options: list[AbstractCard], event_type: SelectEvent) -> AbstractCard:
+        return options[0]
+
+    def select_option(self, options: list, event) -> int:
+        return 0
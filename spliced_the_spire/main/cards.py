@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from copy import deepcopy
 from itertools import product
 from spliced_the_spire.main import effects
 from spliced_the_spire.main.effects import *
 
 from spliced_the_spire.main.abstractions import *
+from spliced_the_spire.lutil import Registry
 
 
 ################
@@ -377,7 +377,7 @@ class Bash(AbstractCard, ABC):
                          card_rarity=Rarity.STARTER, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: ['AbstractEnemy']):
+    def use(self, caller: 'AbstractActor', target: ['AbstractEnemy'], room: Room):
         caller.deal_damage(target, self.damage)
 
         target.increase_effect(Vulnerable, self.vulnerable)
@@ -418,7 +418,7 @@ class Armaments(AbstractCard, ABC):
                 card.upgrade()
             return
         caller.hand_pile.remove(self)
-        random.choice(caller.get_hand()).upgrade()
+        caller.rng.card_random.choice(caller.get_hand()).upgrade()
         caller.hand_pile.append(self)
 
     def upgrade_logic(self):
@@ -633,7 +633,7 @@ class SwordBoomerang(AbstractCard, ABC):
 
     def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         for _ in range(self.damage_times):
-            caller.deal_damage(random.choice(room.enemies), 3)
+            caller.deal_damage(caller.rng.card_random.choice(room.enemies), 3)
 
     def upgrade_logic(self):
         self.damage_times = 4
@@ -668,7 +668,7 @@ class TrueGrit(AbstractCard, ABC):
             if self.upgraded:
                 caller.exhaust_card(caller.select_card(caller.get_hand_without(self), SelectEvent.EXHAUST))
             else:
-                caller.exhaust_card(random.choice(caller.get_hand_without(self)))
+                caller.exhaust_card(caller.rng.card_random.choice(caller.get_hand_without(self)))
 
     def upgrade_logic(self):
         self.block = 9
@@ -743,7 +743,7 @@ class BloodForBlood(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.deal_damage(target, self.damage)
 
     def upgrade_logic(self):
@@ -761,7 +761,7 @@ class Bloodletting(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.receive_damage_from_card(3, self)
         caller.gain_energy(self.energy_gain)
 
@@ -776,7 +776,7 @@ class BurningPact(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.draw_card(self.card_draw)
         caller.exhaust_card(caller.select_card(caller.get_hand_without(self), SelectEvent.EXHAUST))
 
@@ -791,7 +791,7 @@ class Carnage(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.deal_damage(target, self.damage)
 
     def upgrade_logic(self):
@@ -805,7 +805,7 @@ class Combust(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(effects.CombustEffect, self.stacks)
 
     def upgrade_logic(self):
@@ -818,7 +818,7 @@ class DarkEmbrace(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(DarkEmbraceEffect, 1)
 
     def upgrade_logic(self):
@@ -832,7 +832,7 @@ class Disarm(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         target.decrease_effect(Strength, self.strength_loss)
 
     def upgrade_logic(self):
@@ -846,7 +846,7 @@ class Dropkick(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.deal_damage(target, self.damage)
         if target.has_effect(Vulnerable):
             caller.gain_energy()
@@ -862,7 +862,7 @@ class DuelWield(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         # Have the actor select a valid card
         card = caller.select_card(
             event_type=SelectEvent.COPY,
@@ -871,11 +871,11 @@ class DuelWield(AbstractCard, ABC):
                 with_types=[CardType.ATTACK, CardType.POWER]))
 
         # Add one to hand
-        caller.add_card_to_hand(deepcopy(card))
+        caller.add_card_to_hand(card.copy())
 
         # And if upgraded add a second
         if self.upgraded:
-            caller.add_card_to_hand(deepcopy(card))
+            caller.add_card_to_hand(card.copy())
 
     def upgrade_logic(self):
         pass
@@ -887,7 +887,7 @@ class Entrench(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(Block, caller.get_effect_stacks(Block))
 
     def upgrade_logic(self):
@@ -901,7 +901,7 @@ class Evolve(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(EvolveEffect, self.draw)
 
     def upgrade_logic(self):
@@ -915,7 +915,7 @@ class FeelNoPain(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(FeelNoPainEffect, self.block)
 
     def upgrade_logic(self):
@@ -929,7 +929,7 @@ class FireBreathing(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(FireBreathingEffect, self.damage)
 
     def upgrade_logic(self):
@@ -943,7 +943,7 @@ class FlameBarrier(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(FlameBarrierEffect, self.damage)
 
     def upgrade_logic(self):
@@ -957,7 +957,7 @@ class GhostlyArmor(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(Block, self.block)
 
     def upgrade_logic(self):
@@ -971,7 +971,7 @@ class Hemokinesis(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.deal_damage(target, self.damage)
         caller.receive_damage_from_card(2, self)
 
@@ -985,10 +985,10 @@ class InfernalBlade(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
-        card_cls = random.choice([subclass for subclass in AbstractCard.__subclasses__()
-                                  if subclass().card_type == CardType.ATTACK
-                                  and subclass not in (Feed, Reaper)])
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
+        card_cls = caller.rng.card_random.choice([subclass for subclass in AbstractCard.__subclasses__()
+                                                  if subclass().card_type == CardType.ATTACK
+                                                  and subclass not in (Feed, Reaper)])
         card = card_cls()
         card.modify_cost_this_turn(0)
         caller.add_card_to_hand(card)
@@ -1004,7 +1004,7 @@ class Inflame(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy'):
+    def use(self, caller: 'AbstractActor', target: 'AbstractEnemy', room: Room):
         caller.increase_effect(Strength, self.str)
 
     def upgrade_logic(self):
@@ -1018,7 +1018,7 @@ class Intimidate(AbstractCard, ABC):
                          card_rarity=Rarity.UNCOMMON, card_color=Color.RED,
                          *args, **kwargs)
 
-    def use(self, caller: 'AbstractActor', target: ['AbstractEnemy']):
+    def use(self, caller: 'AbstractActor', target: ['AbstractEnemy'], room: Room):
         for enemy in target:
             enemy: AbstractEnemy
             enemy.increase_effect(Weak, self.weak)
@@ -1546,7 +1546,6 @@ class Reaper(AbstractCard, ABC):
         self.damage = 5
 
 
-card_classes = {
-    (card_cls.sts_name if hasattr(card_cls, 'sts_name') else card_cls.__name__): card_cls
-    for card_cls in AbstractCard.__subclasses__()
-}
+# Every card by its Slay the Spire id, or its class name if it doesn't have one set
+card_classes = Registry(AbstractCard.__subclasses__,
+                        key=lambda card_cls: getattr(card_cls, 'sts_name', card_cls.__name__))
@@ -1,37 +1,53 @@
+from typing import Iterable, NamedTuple, Optional
+
 from spliced_the_spire.main.cards import *
 from spliced_the_spire.main.relics import *
 
+
+class DeckEntry(NamedTuple):
+    """count copies of the card with AbstractCard.card_id card_id, upgraded or not."""
+    card_id: int
+    count: int
+    upgraded: bool = False
+
+
+def build_deck(spec: Iterable[DeckEntry]) -> list[AbstractCard]:
+    """
+    Builds a new deck from a spec, E.g. build_deck([DeckEntry(RedStrike.card_id, 5)]).
+    Every card is a new object, copied from its class's prototype (see AbstractCard.make).
+    """
+    deck = []
+    for card_id, count, upgraded in spec:
+        if count <= 0:
+            continue
+        card = AbstractCard.registry[card_id].make()
+        if upgraded:
+            card.upgrade()
+        deck.append(card)
+        deck.extend(card.copy() for _ in range(count - 1))
+    return deck
+
+
 class STSClass():
-    pass
+    health: int
+    # The starting deck, built fresh for every actor by new_deck
+    start_deck: tuple[DeckEntry, ...] = ()
+    # The starting relic's class, so every actor given it gets its own instance
+    start_relic: Optional[type[AbstractRelic]] = None
+
+    @classmethod
+    def new_deck(cls) -> list[AbstractCard]:
+        """A new copy of the class's starting deck, for one actor."""
+        return build_deck(cls.start_deck)
 
 
 class Ironclad(STSClass):
     health = 80
 
-    start_relic = BurningBlood()
-
-    start_cards = [
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedDefend(),
-        RedDefend(),
-        RedDefend(),
-        RedDefend(),
-        Bash(),
-    ]
-
-    cards = (
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedStrike(),
-        RedDefend(),
-        RedDefend(),
-        RedDefend(),
-        RedDefend(),
-        Bash(),
+    start_relic = BurningBlood
+
+    start_deck = (
+        DeckEntry(RedStrike.card_id, 5),
+        DeckEntry(RedDefend.card_id, 4),
+        DeckEntry(Bash.card_id, 1),
     )
@@ -177,8 +177,7 @@ class RageEffect(AbstractEffect):
 
 
 class CurlUp(AbstractEffect):
-    def on_victim_of_attack(self, owner, damaging_enemy):
-        print("hello victim")
+    def on_victim_of_attack(self, owner, environment, damaging_enemy):
         owner.increase_effect(Block, self.stacks)
         owner.set_effect(CurlUp, 0)
 
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import random
 from abc import ABC
 from typing import TYPE_CHECKING, Optional
 
-from spliced_the_spire.lutil import asc_int
-from spliced_the_spire.main.abstractions import AbstractEnemy
+from spliced_the_spire.lutil import Registry
+from spliced_the_spire.main.abstractions import AbstractEnemy, MoveState, MovePolicy
 from spliced_the_spire.main.effects import *
 from spliced_the_spire.main.enumerations import IntentType
 
@@ -57,17 +56,19 @@ class Intent:
 
 
 class DummyEnemy(AbstractEnemy, ABC):
+    sts_name = 'Dummy'
     max_health = {0: 10, 100: 10}
 
-    def __init__(self, environment, health=10, ascension=0):
+    def __init__(self, environment, health=10, ascension=0, rng=None):
         super().__init__(
                          name='Dummy',
                          max_health=health,
                          ascension=ascension,
-                         act=1)
+                         act=1,
+                         rng=rng)
         self.environment = environment
 
-    def pattern(self):
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
         pass
 
 
@@ -82,11 +83,18 @@ class Cultist(AbstractEnemy):
         7: (50, 56)  # Health is 50-56 on A7+
     }
 
-    # The amount of ritual gained by ascension
-    ritual_gain = {
-        +0: 3,
-        +2: 4,
-        17: 5
+    intents = {
+        'incantation': IntentType.BUFF,
+        'dark_strike': IntentType.AGGRESSIVE
+    }
+
+    by_ascension = {
+        # The amount of ritual gained by ascension
+        'ritual_gain': {
+            +0: 3,
+            +2: 4,
+            17: 5
+        }
     }
 
     def __init__(self, *args, **kwargs):
@@ -109,11 +117,7 @@ class Cultist(AbstractEnemy):
     def incantation(self):
         self.intent = IntentType.BUFF,
         self.message = 'Cultist used incantation'
-        self.increase_effect(Ritual, asc_int(self.ascension, {
-            +0: 3,
-            +2: 4,
-            17: 5
-        }))
+        self.increase_effect(Ritual, self.ritual_gain)
 
     def dark_strike(self):
         """Deal 6 damage."""
@@ -121,11 +125,9 @@ class Cultist(AbstractEnemy):
         self.message = 'Cultist used Dark Strike'
         self.deal_damage(6)
 
-    def pattern(self):
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
         """Simple pattern: casts incantation, then spams dark stroke."""
-        yield self.incantation
-        while True:
-            yield self.dark_strike
+        return 'incantation' if state.turn == 0 else 'dark_strike'
 
 
 # Checked 12/12/23
@@ -135,20 +137,54 @@ class JawWorm(AbstractEnemy):
         7: (42, 46)  # A7+ Health is 50-56
     }
 
-    def __init__(self, environment: dict = None, ascension=0, act=1):
+    intents = {
+        'chomp': IntentType.AGGRESSIVE,
+        'thrash': IntentType.AGGRESSIVE_DEFENSE,
+        'bellow': IntentType.DEFENSIVE_BUFF
+    }
+
+    by_ascension = {
+        # Chomp: Deal 11 damage, or 12 on ascension 2+
+        'chomp_damage': {
+            0: 11,
+            2: 12
+        },
+        # Bellow: Gain strength and block
+        'bellow_strength': {
+            +0: 3,
+            +2: 4,
+            17: 5
+        },
+        'bellow_block': {
+            +0: 6,
+            17: 9
+        }
+    }
+
+    # After the opening chomp
+    policy = MovePolicy(
+        chances={
+            'bellow': 45,
+            'thrash': 30,
+            'chomp': 25},
+        successive_limit_dict={
+            'bellow': 2,
+            'thrash': 3,
+            'chomp': 2
+        }
+    )
+
+    def __init__(self, environment: dict = None, ascension=0, act=1, rng=None):
         super().__init__(
                          ascension=ascension,
-                         act=act)
+                         act=act,
+                         rng=rng)
 
     def chomp(self):
         # Chomp: Deal 11 damage, or 12 on ascension 2+
         self.intent = IntentType.AGGRESSIVE
         self.message = 'Jaw Worm used Chomp'
-        self.deal_damage(
-            asc_int(self.ascension, {
-                0: 11,
-                2: 12
-            }))
+        self.deal_damage(self.chomp_damage)
 
     def thrash(self):
         # Thrash: Deal 7 damage, gain 5 block.
@@ -161,30 +197,13 @@ class JawWorm(AbstractEnemy):
         # Bellow: Gain strength and block
         self.intent = IntentType.DEFENSIVE_BUFF
         self.message = 'Jaw Worm used Bellow'
-        self.increase_effect(Strength,
-                             asc_int(self.ascension, {
-                                 +0: 3,
-                                 +2: 4,
-                                 17: 5}))
-        self.increase_effect(Block,
-                             asc_int(self.ascension, {
-                                 +0: 6,
-                                 17: 9}))
-
-    def pattern(self):
-        yield self.chomp
-        while True:
-            yield self.rule_pattern(
-                chances={
-                    self.bellow: 45,
-                    self.thrash: 30,
-                    self.chomp: 25},
-                successive_limit_dict={
-                    self.bellow: 2,
-                    self.thrash: 3,
-                    self.chomp: 2
-                }
-            )
+        self.increase_effect(Strength, self.bellow_strength)
+        self.increase_effect(Block, self.bellow_block)
+
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
+        if state.turn == 0:
+            return 'chomp'
+        return self.policy
 
 
 class GreenLouse(AbstractEnemy, ABC):
@@ -198,16 +217,34 @@ class GreenLouse(AbstractEnemy, ABC):
         7: (12, 18)
     }
 
-    # Curl up effect applied at start
-    curl_up_stack_map = {
-        +0: (3, 7),
-        +7: (4, 8),
-        17: (9, 12)
+    intents = {
+        'bite': IntentType.AGGRESSIVE,
+        'spit_web': IntentType.DEBUFF
+    }
+
+    by_ascension = {
+        # Curl up effect applied at start
+        'curl_up_stacks': {
+            +0: (3, 7),
+            +7: (4, 8),
+            17: (9, 12)
+        },
+        # Bite deals base_damage, plus one on ascension 2+
+        'bite_bonus': {
+            0: 0,
+            2: 1
+        },
+        # Can't Spit Web three times in a row (twice on ascension 17+)
+        'spit_web_limit': {
+            +0: 3,
+            17: 2
+        }
     }
 
     def __init__(self, ascension=0, act=1,
-                 base_damage: int = random.randint(5, 7),
-                 curl_up_stacks: Optional[int] = None):
+                 base_damage: Optional[int] = None,
+                 curl_up_stacks: Optional[int] = None,
+                 rng=None):
         """
         Create a Green louse. Note that base damage may be provided as a static value, but
         if it is not, then it will be randomly selected between 5 and 7 on enemy creation,
@@ -225,32 +262,45 @@ class GreenLouse(AbstractEnemy, ABC):
             Green Louse select a value 'D' on creation, and then deal damage consistently
             throughout the fight based on that. The base_damage variable allows you to set
             the value of d manually, if you choose to. If you choose not to it will be
-            generated randomly per slay the spire rules.
+            generated randomly per slay the spire rules, from rng.monster_hp.
 
         :param curl_up_stacks:
             Green Louse starts with multiple stacks of Curl Up. Generally, this is
             determined randomly based on ascension, following the mapping in
-            GreenLouse.curl_up_stack_map. If you would like to create a Green Louse
+            GreenLouse.by_ascension['curl_up_stacks']. If you would like to create a Green Louse
             starting with a specific number of curl up, you may provide it here.
+
+        :param rng:
+            The random streams of the combat, see AbstractEnemy.
         """
-        super().__init__( ascension=ascension, act=act)
-        # Apply the curl up stacks, calculating an appropriate one if none was provided
-        self.increase_effect(CurlUp,
-                             curl_up_stacks if curl_up_stacks else asc_int(ascension, GreenLouse.curl_up_stack_map))
+        # Curl up stacks are only rolled for this ascension if none were provided
+        super().__init__(ascension=ascension, act=act, rng=rng,
+                         fixed={'curl_up_stacks': curl_up_stacks} if curl_up_stacks else None)
+        self.increase_effect(CurlUp, self.curl_up_stacks)
+
+        self.base_damage = base_damage if base_damage is not None else self.rng.monster_hp.randint(5, 7)
+        self.policy = MovePolicy.of(
+            chances={
+                'spit_web': 25,
+                'bite': 75},
+            successive_limit_dict={
+                'spit_web': self.spit_web_limit,
+                'bite': 3})
 
-        self.base_damage = base_damage
     def bite(self):
         """Deals damage based on the base_damage of the louse and the ascension."""
-        self.deal_damage(asc_int(self.ascension, {
-            self.base_damage: 0,
-            self.base_damage + 1: 2
-        }))
+        self.intent = IntentType.AGGRESSIVE
+        if self.log_level:
+            self.message = f'{self.name} used Bite'
+        self.deal_damage(self.base_damage + self.bite_bonus)
 
     def spit_web(self):
         """Applies two weak."""
+        self.intent = IntentType.DEBUFF
+        self.message = 'Green Louse used Spit Web'
         self.get_actor().increase_effect(Weak, 2)
 
-    def pattern(self):
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
         """
         Has a 25% chance of using Spit Web and a 75% chance of using Bite.
         Cannot use the same move three times in a row.
@@ -258,14 +308,7 @@ class GreenLouse(AbstractEnemy, ABC):
         On Ascension Icon Ascension 17, it cannot use Spit Web twice in a row
         and cannot use Bite three times in a row.
         """
-        while True:
-            yield self.rule_pattern(
-                chances={
-                    self.spit_web: 25,
-                    self.bite: 75},
-                successive_limit_dict={
-                    self.spit_web: 2 if self.ascension >= 17 else 3,
-                    self.bite: 3})
+        return self.policy
 
 
 class RedLouse(AbstractEnemy):
@@ -279,17 +322,40 @@ class RedLouse(AbstractEnemy):
         7: (11, 16)
     }
 
-    # Curl Up effect applied at start
-    curl_up_power = {
-        +0: (3, 7),
-        +7: (4, 8),
-        17: (9, 12)
+    intents = {
+        'bite': IntentType.AGGRESSIVE,
+        'grow': IntentType.BUFF
+    }
+
+    by_ascension = {
+        # Curl Up effect applied at start
+        'curl_up_stacks': {
+            +0: (3, 7),
+            +7: (4, 8),
+            17: (9, 12)
+        },
+        # Bite deals base_damage, plus one on ascension 2+
+        'bite_bonus': {
+            0: 0,
+            2: 1
+        },
+        # Grow gains 3 strength (4 on ascension 17+)
+        'grow_strength': {
+            +0: 3,
+            17: 4
+        },
+        # Can't Grow three times in a row (twice on ascension 17+)
+        'grow_limit': {
+            +0: 3,
+            17: 2
+        }
     }
 
     # TODO: Is 5, 7 right? Is this inclusive or exclusive?
     def __init__(self, ascension=0, act=1,
-                 base_damage: int = random.randint(5, 7),
-                 curl_up_stacks: Optional[int] = None):
+                 base_damage: Optional[int] = None,
+                 curl_up_stacks: Optional[int] = None,
+                 rng=None):
         """
         Create a Red Louse. Note that base damage may be provided as a static value, but
         if it is not, then it will be randomly selected between 5 and 7 on enemy creation,
@@ -307,32 +373,44 @@ class RedLouse(AbstractEnemy):
             Red Louse select a value 'D' on creation, and then deal damage consistently
             throughout the fight based on that. The base_damage variable allows you to set
             the value of d manually, if you choose to. If you choose not to it will be
-            generated randomly per slay the spire rules.
+            generated randomly per slay the spire rules, from rng.monster_hp.
 
         :param curl_up_stacks:
             Red Louse starts with multiple stacks of Curl Up. Generally, this is
             determined randomly based on ascension, following the mapping in
-            RedLouse.curl_up_stack_map. If you would like to create a Red Louse
+            RedLouse.by_ascension['curl_up_stacks']. If you would like to create a Red Louse
             starting with a specific number of curl up, you may provide it here.
+
+        :param rng:
+            The random streams of the combat, see AbstractEnemy.
         """
-        super().__init__(ascension=ascension, act=act)
-        # Apply the curl up stacks, calculating an appropriate one if none was provided
-        self.increase_effect(CurlUp,
-                             curl_up_stacks if curl_up_stacks else asc_int(ascension, GreenLouse.curl_up_stack_map))
-        self.base_damage = base_damage
+        # Curl up stacks are only rolled for this ascension if none were provided
+        super().__init__(ascension=ascension, act=act, rng=rng,
+                         fixed={'curl_up_stacks': curl_up_stacks} if curl_up_stacks else None)
+        self.increase_effect(CurlUp, self.curl_up_stacks)
+        self.base_damage = base_damage if base_damage is not None else self.rng.monster_hp.randint(5, 7)
+        self.policy = MovePolicy.of(
+            chances={
+                'grow': 25,
+                'bite': 75},
+            successive_limit_dict={
+                'grow': self.grow_limit,
+                'bite': 3})
 
     def bite(self):
         """Deals damage based on the base_damage of the louse and the ascension."""
-        self.deal_damage(asc_int(self.ascension, {
-            self.base_damage: 0,
-            self.base_damage + 1: 2
-        }))
+        self.intent = IntentType.AGGRESSIVE
+        if self.log_level:
+            self.message = f'{self.name} used Bite'
+        self.deal_damage(self.base_damage + self.bite_bonus)
 
     def grow(self):
         """Gains 3 Strength. (4 on asc. 17+)"""
-        self.increase_effect(Strength, 4 if self.ascension >= 17 else 3)
+        self.intent = IntentType.BUFF
+        self.message = 'Red Louse used Grow'
+        self.increase_effect(Strength, self.grow_strength)
 
-    def pattern(self):
+    def move_policy(self, state: MoveState) -> MovePolicy | str:
         """
         Has a 25% chance of using Spit Web and a 75% chance of using Bite.
         Cannot use the same move three times in a row.
@@ -340,15 +418,8 @@ class RedLouse(AbstractEnemy):
         On Ascension Icon Ascension 17, it cannot use Spit Web twice in a row
         and cannot use Bite three times in a row.
         """
-        while True:
-            yield self.rule_pattern(
-                chances={
-                    self.grow: 25,
-                    self.bite: 75},
-                successive_limit_dict={
-                    self.grow: 2 if self.ascension >= 17 else 3,
-                    self.bite: 3})
-
-env = {}
-enemies = {cls(env).sts_name: cls for cls in AbstractEnemy.__subclasses__()}
+        return self.policy
+
+# Every enemy by its name, listed the first time it is looked into rather than at import
+enemies = Registry(AbstractEnemy.__subclasses__, key=lambda cls: cls.sts_name)
 
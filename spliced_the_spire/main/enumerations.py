@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class SelectEvent(Enum):
@@ -102,4 +102,36 @@ class IntentType(Enum):
     COWARDLY = 10
     SLEEPING = 11
     STUNNED = 12
-    UNKNOWN = 13
\ No newline at end of file
+    UNKNOWN = 13
+
+
+class RoomType(Enum):
+    NONE = 0
+    MONSTER = 1
+    EVENT = 2
+    ELITE = 3
+    REST = 4
+    SHOP = 5
+    TREASURE = 6
+
+
+class LogLevel(IntEnum):
+    """
+    How much actors and enemies record as they play. OFF records nothing, SUMMARY keeps the last few
+    turns in bounded logs, FULL keeps every turn along with the messages printed for it.
+    """
+    OFF = 0
+    SUMMARY = 1
+    FULL = 2
+
+
+class EventType(IntEnum):
+    """The kinds of event a combat writes to an events.EventLog, see events.Event for what each records."""
+    COMBAT_STARTED = 0
+    CARD_PLAYED = 1
+    DAMAGE_DEALT = 2
+    BLOCK_GAINED = 3
+    EFFECT_CHANGED = 4
+    ENEMY_MOVE = 5
+    SHUFFLE = 6
+    COMBAT_ENDED = 7
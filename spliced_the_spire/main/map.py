@@ -1,162 +1,276 @@
-import random
-import networkx as nx
-from matplotlib import pyplot as plt
-from networkx import DiGraph
-
-G = nx.grid_2d_graph(7, 15)
-G.clear_edges()
-D = DiGraph(G)
-
-
-def get_uncrossed_successors(node, potential_successors):
-    uncrossed = []
-    for potential in potential_successors:
-        if potential[0] == node[0]:
-            uncrossed.append(potential)
-        if potential[0] == node[0] - 1:
-            if (node[0], node[1] + 1) not in D.successors((node[0] - 1, node[1])):
-                uncrossed.append(potential)
-        if potential[0] == node[0] + 1:
-            if (node[0], node[1] + 1) not in D.successors((node[0] + 1, node[1])):
-                uncrossed.append(potential)
-
-    return uncrossed
-
-
-def get_possible_successors(node):
-    floor = node[1] + 1
-    if floor > 14:
-        raise RuntimeError("Tried to find successors for room on top floor")
-    if node[0] == 0:
-        return get_uncrossed_successors(node, [(0, floor), (1, floor)])
-    if node[0] == 6:
-        return get_uncrossed_successors(node, [(5, floor), (6, floor)])
-    return get_uncrossed_successors(node,
-                                    [(node[0] - 1, floor), (node[0], floor), (node[0] + 1, floor)])
-
-
-def generate_random_path(node):
-    if node[1] < 14:
-        choice = random.choice(get_possible_successors(node))
-        D.add_edge(node, choice)
-        generate_random_path(choice)
-
-nums = [x for x in range(0, 6)]
-start = random.choice(nums)
-nums.remove(start)
-second_start = random.choice(nums)
-
-generate_random_path((start, 0))
-generate_random_path((second_start, 0))
-for _ in range(4):
-    start = random.randint(0, 6)
-    generate_random_path((start, 0))
-
-# Casted to a list to get around a weird error (per guy on stackexchange)
-D.remove_nodes_from(list(nx.isolates(D)))
-
-unfilled_nodes = []
-for node in D.nodes:
-    if node[1] == 0:
-        D.nodes[node]["room"] = "Monster"
-    elif node[1] == 8:
-        D.nodes[node]["room"] = "Treasure"
-    elif node[1] == 14:
-        D.nodes[node]["room"] = "Rest"
-    else:
-        unfilled_nodes.append(node)
-
-room_bucket = []
-for _ in range(len(unfilled_nodes)):
-    x = random.randint(1, 100)
-    if x <= 45:  # 45% chance
-        room_bucket.append("Monster")
-    elif x <= 67:  # 22% chance
-        room_bucket.append("Event")
-    elif x <= 83:  # 16% chance
-        room_bucket.append("Elite")
-    elif x <= 95:  # 12% chance
-        room_bucket.append("Rest")
-    else:  # 5% chance
-        room_bucket.append("Shop")
-
-random.shuffle(room_bucket)
-
-
-def rule1(node, room_type):
-    return not (node[1] < 5 and (room_type == "Elite" or room_type == "Rest"))
-
-
-def rule2(node, room_type):
-    if room_type == "Elite":
-        for successor in D.successors(node):
-            if D.nodes[successor].get("room") == "Elite":
-                return False
-        for predecessor in D.predecessors(node):
-            if D.nodes[predecessor].get("room") == "Elite":
-                return False
-
-    if room_type == "Shop":
-        for successor in D.successors(node):
-            if D.nodes[successor].get("room") == "Shop":
-                return False
-        for predecessor in D.predecessors(node):
-            if D.nodes[predecessor].get("room") == "Shop":
-                return False
-
-    if room_type == "Rest":
-        for successor in D.successors(node):
-            if D.nodes[successor].get("room") == "Rest":
-                return False
-        for predecessor in D.predecessors(node):
-            if D.nodes[predecessor].get("room") == "Rest":
-                return False
-    return True
-
-
-def rule3(node, room_type):
-    for predecessor in D.predecessors(node):
-        for successor in D.successors(predecessor):
-            if D.nodes[successor].get("room") == room_type:
-                return False
-    return True
-
-
-def rule4(node, room_type):
-    return not (node[1] == 13 and room_type == "Rest")
-
-
-for node in list(unfilled_nodes):
-    i = 0
-    while i < len(room_bucket):
-        if (rule1(node, room_bucket[i]) and rule2(node, room_bucket[i])
-                and rule3(node, room_bucket[i]) and rule4(node, room_bucket[i])):
-            D.nodes[node]["room"] = room_bucket.pop(i)
-            unfilled_nodes.remove(node)
-            break
+"""
+Act map generation.
+
+generate_map(seed, act) lays out the 7 x 15 map of an act: six paths climb from the bottom floor
+to the top, and each room on them is given a type under rule1 - rule4 (see _FORBIDDEN and _assign).
+A map is two flat byte strings indexed by y * WIDTH + x, the edges leaving each room as a 3 bit
+mask (LEFT, UP, RIGHT) and each room's RoomType value, so generating, hashing and storing maps is
+cheap. encode_map packs both into ENCODED_SIZE bytes, the records of the on-disk cache in map_cache.
+
+Example:
+    game_map = generate_map(seed=1, act=1)
+    game_map.room(3, 8)                     # RoomType.TREASURE, if there is a room there
+    game_map.successors(3, 8)               # [(2, 9), (3, 9)]
+    game_map.draw()                         # Needs networkx and matplotlib
+    decode_map(encode_map(game_map), seed=1, act=1) == game_map
+
+Maps are seeded from (seed, act) with their own random.Random, importing this module generates
+nothing and touches no global random state.
+"""
+from __future__ import annotations
+
+from collections import deque
+from random import Random
+from typing import NamedTuple
+
+from spliced_the_spire.main.enumerations import RoomType
+
+WIDTH = 7
+HEIGHT = 15
+
+# Edge mask bits, for the room one floor up and to the left, straight up and to the right
+LEFT = 1
+UP = 2
+RIGHT = 4
+_STEPS = ((LEFT, -1), (UP, 0), (RIGHT, 1))
+
+# RoomType values, as they are stored in GameMap.rooms
+NONE = RoomType.NONE.value
+MONSTER = RoomType.MONSTER.value
+EVENT = RoomType.EVENT.value
+ELITE = RoomType.ELITE.value
+REST = RoomType.REST.value
+SHOP = RoomType.SHOP.value
+TREASURE = RoomType.TREASURE.value
+
+# Rooms that can't be next to a room of the same type (rule2)
+_NOT_ADJACENT = frozenset((ELITE, SHOP, REST))
+# Tried in this order for rooms left over once the bucket has nothing that fits, the last one that fits is used
+_FALLBACK = (MONSTER, EVENT, ELITE, REST, SHOP)
+
+
+class GameMap(NamedTuple):
+    """
+    A generated act map. edges and rooms hold a byte per position, at y * WIDTH + x: the mask of
+    the edges to the floor above (LEFT | UP | RIGHT) and the RoomType value of the room there.
+    Positions off every path have no edges into or out of them and RoomType.NONE.
+    """
+    seed: int | str
+    act: int
+    edges: bytes
+    rooms: bytes
+
+    def room(self, x: int, y: int) -> RoomType:
+        return RoomType(self.rooms[y * WIDTH + x])
+
+    def successors(self, x: int, y: int) -> list[tuple[int, int]]:
+        """The rooms on the floor above that (x, y) leads to."""
+        mask = self.edges[y * WIDTH + x]
+        return [(x + step, y + 1) for bit, step in _STEPS if mask & bit]
+
+    def predecessors(self, x: int, y: int) -> list[tuple[int, int]]:
+        """The rooms on the floor below that lead to (x, y)."""
+        if y == 0:
+            return []
+        below = (y - 1) * WIDTH + x
+        return [(x - step, y - 1) for bit, step in _STEPS
+                if 0 <= x - step < WIDTH and self.edges[below - step] & bit]
+
+    def nodes(self) -> list[tuple[int, int]]:
+        """Every room on a path, floor by floor."""
+        return [(x, y) for y in range(HEIGHT) for x in range(WIDTH)
+                if self.edges[y * WIDTH + x] or self.predecessors(x, y)]
+
+    def to_networkx(self):
+        """The map as a networkx DiGraph of (x, y) nodes with a 'room' attribute. Needs networkx."""
+        import networkx as nx
+        graph = nx.DiGraph()
+        for x, y in self.nodes():
+            graph.add_node((x, y), room=self.room(x, y).name.title())
+        for x, y in self.nodes():
+            graph.add_edges_from(((x, y), successor) for successor in self.successors(x, y))
+        return graph
+
+    def draw(self):
+        """Shows the map with matplotlib. Needs networkx and matplotlib."""
+        import networkx as nx
+        from matplotlib import pyplot as plt
+        graph = self.to_networkx()
+        plt.figure(figsize=(6, 6))
+        nx.draw(graph, pos={node: node for node in graph.nodes},
+                node_color='lightgreen',
+                with_labels=True,
+                node_size=600,
+                labels=nx.get_node_attributes(graph, 'room'))
+        plt.show()
+
+
+# A position's edge mask and room type share its byte in an encoded map, the room in the bits above the edges
+ROOM_SHIFT = 3
+ENCODED_SIZE = WIDTH * HEIGHT
+_DECODE_EDGES = bytes(value & (1 << ROOM_SHIFT) - 1 for value in range(256))
+_DECODE_ROOMS = bytes(value >> ROOM_SHIFT for value in range(256))
+
+
+def encode_map(game_map: GameMap) -> bytes:
+    """The edges and rooms of a map in ENCODED_SIZE bytes, one per position: edge mask | room type << 3."""
+    return bytes(mask | room << ROOM_SHIFT for mask, room in zip(game_map.edges, game_map.rooms))
+
+
+def decode_map(data: bytes, seed: int | str, act: int = 1) -> GameMap:
+    """The map encode_map encoded as data. The seed and act aren't part of the encoding."""
+    return GameMap(seed, act, data.translate(_DECODE_EDGES), data.translate(_DECODE_ROOMS))
+
+
+def _add_path(edges: bytearray, rng: Random, x: int):
+    # Walks a path from (x, 0) to the top floor, never crossing an edge that is already there
+    for y in range(HEIGHT - 1):
+        i = y * WIDTH + x
+        options = []
+        if x > 0 and not edges[i - 1] & RIGHT:
+            options.append(x - 1)
+        options.append(x)
+        if x < WIDTH - 1 and not edges[i + 1] & LEFT:
+            options.append(x + 1)
+        following = rng.choice(options)
+        edges[i] |= (LEFT, UP, RIGHT)[following - x + 1]
+        x = following
+
+
+def _room_bucket(rng: Random, count: int) -> list[int]:
+    # The room types to hand out, rolled one per room then shuffled
+    bucket = []
+    for _ in range(count):
+        roll = rng.randint(1, 100)
+        if roll <= 45:  # 45% chance
+            bucket.append(MONSTER)
+        elif roll <= 67:  # 22% chance
+            bucket.append(EVENT)
+        elif roll <= 83:  # 16% chance
+            bucket.append(ELITE)
+        elif roll <= 95:  # 12% chance
+            bucket.append(REST)
+        else:  # 5% chance
+            bucket.append(SHOP)
+    rng.shuffle(bucket)
+    return bucket
+
+
+def _neighbours(edges: bytearray) -> tuple[list[list[int]], list[list[int]], list[bool]]:
+    # For every position, the rooms it connects to (above and below), the other rooms its
+    # predecessors lead to, and whether it is on a path at all
+    neighbours = [[] for _ in range(WIDTH * HEIGHT)]
+    successors = [[] for _ in range(WIDTH * HEIGHT)]
+    present = [False] * (WIDTH * HEIGHT)
+    for i, mask in enumerate(edges):
+        if mask:
+            present[i] = True
+            above = i + WIDTH
+            for bit, step in _STEPS:
+                if mask & bit:
+                    j = above + step
+                    present[j] = True
+                    successors[i].append(j)
+                    neighbours[i].append(j)
+                    neighbours[j].append(i)
+    siblings = [[]] * (WIDTH * HEIGHT)
+    for i in range(WIDTH, WIDTH * HEIGHT):
+        if present[i]:
+            siblings[i] = [j for predecessor in neighbours[i] if predecessor < i
+                           for j in successors[predecessor] if j != i]
+    return neighbours, siblings, present
+
+
+# Rooms are kept out of a position by setting the bit of their type, 1 << RoomType value, in the position's mask.
+# rule1: No elites or rest sites below floor 5.
+# rule4: No rest site right below the rest sites of the top floor.
+# Both only depend on the floor, so every position starts with them.
+_FORBIDDEN = tuple((1 << ELITE | 1 << REST if y < 5 else 0) | (1 << REST if y == 13 else 0)
+                   for y in range(HEIGHT) for _ in range(WIDTH))
+
+
+def _assign(i: int, room: int, rooms: bytearray, forbidden: list[int],
+            neighbours: list[list[int]], siblings: list[list[int]]):
+    # Gives position i its room, and rules the type out where it is now against the rules:
+    # rule2: Elites, shops and rest sites can't lead to or follow a room of the same type.
+    # rule3: Rooms reached from the same room are all of different types.
+    rooms[i] = room
+    bit = 1 << room
+    if room in _NOT_ADJACENT:
+        for j in neighbours[i]:
+            forbidden[j] |= bit
+    for j in siblings[i]:
+        forbidden[j] |= bit
+
+
+def generate_map(seed: int | str, act: int = 1) -> GameMap:
+    """
+    Generates the map of an act, the same map every time for the same seed and act.
+
+    Two paths start from different rooms among the first six of the bottom floor and four more from
+    anywhere on it. The bottom floor is monsters, floor 8 treasure and the top floor rest sites, the
+    rest are handed out from a shuffled bucket of rolled room types, each room taking the first one
+    that passes rule1 - rule4. Rooms nothing left in the bucket fits get the last type that fits.
+
+    Each position keeps a mask of the types the rules rule out for it, updated as its neighbours
+    are given rooms, so checking a type is a bit test.
+    """
+    rng = Random(f'{seed}:map:{act}')
+    edges = bytearray(WIDTH * HEIGHT)
+
+    starts = list(range(WIDTH - 1))
+    first = rng.choice(starts)
+    starts.remove(first)
+    second = rng.choice(starts)
+    _add_path(edges, rng, first)
+    _add_path(edges, rng, second)
+    for _ in range(4):
+        _add_path(edges, rng, rng.randint(0, WIDTH - 1))
+
+    neighbours, siblings, present = _neighbours(edges)
+    rooms = bytearray(WIDTH * HEIGHT)
+    forbidden = list(_FORBIDDEN)
+    unfilled = []
+    # Column by column, the order rooms are handed out in
+    for x in range(WIDTH):
+        for y in range(HEIGHT):
+            i = y * WIDTH + x
+            if not present[i]:
+                continue
+            if y == 0:
+                _assign(i, MONSTER, rooms, forbidden, neighbours, siblings)
+            elif y == 8:
+                _assign(i, TREASURE, rooms, forbidden, neighbours, siblings)
+            elif y == HEIGHT - 1:
+                _assign(i, REST, rooms, forbidden, neighbours, siblings)
+            else:
+                unfilled.append(i)
+
+    # Where each type is in the bucket, in order. The first entry of the bucket a room can take is
+    # the earliest of the first entries of the types it allows
+    positions = [deque() for _ in range(TREASURE + 1)]
+    for position, room in enumerate(_room_bucket(rng, len(unfilled))):
+        positions[room].append(position)
+    leftover = []
+    for i in unfilled:
+        mask = forbidden[i]
+        first = None
+        for room in _FALLBACK:
+            if positions[room] and not mask >> room & 1 and (first is None or positions[room][0] < positions[first][0]):
+                first = room
+        if first is None:
+            leftover.append(i)
         else:
-            i += 1
-
-print(unfilled_nodes)
-
-# This might be needed if something is left unfilled at the end because nothing is left
-# in room_bucket that follows the rules
-if len(unfilled_nodes) > 0:
-    # iterate through unfilled_nodes and fill with whatever passes the rules
-    room_options = ["Monster", "Event", "Elite", "Rest", "Shop"]
-    for node in unfilled_nodes:
-        for i in range(len(room_options)):
-            if (rule1(node, room_options[i]) and rule2(node, room_options[i])
-                    and rule3(node, room_options[i]) and rule4(node, room_options[i])):
-                D.nodes[node]["room"] = room_options[i]
-    unfilled_nodes.clear()
-
-plt.figure(figsize=(6, 6))
-pos = {(x, y): (x, y) for x, y in D.nodes()}
-labels = nx.get_node_attributes(D, 'room')
-nx.draw(D, pos=pos,
-        node_color='lightgreen',
-        with_labels=True,
-        node_size=600,
-        labels=labels)
-plt.show()
+            positions[first].popleft()
+            _assign(i, first, rooms, forbidden, neighbours, siblings)
+
+    for i in leftover:
+        fits = [room for room in _FALLBACK if not forbidden[i] >> room & 1]
+        if fits:
+            _assign(i, fits[-1], rooms, forbidden, neighbours, siblings)
+
+    return GameMap(seed, act, bytes(edges), bytes(rooms))
+
+
+if __name__ == '__main__':
+    generate_map(Random().getrandbits(64)).draw()
@@ -4,6 +4,7 @@ from spliced_the_spire.main.effects import *
 from math import floor
 from random import Random
 
+from spliced_the_spire.lutil import Registry, parse_class_name
 from spliced_the_spire.main.enumerations import *
 from spliced_the_spire.main.abstractions import AbstractRelic
 
@@ -11,7 +12,6 @@ from spliced_the_spire.main.abstractions import AbstractRelic
 class BurningBlood(AbstractRelic):
     """Gain 6 health at the end of combat."""
     def __init__(self):
-        self.implemented_hooks = [self.on_end_combat]
         super().__init__(relic_color=Color.RED,
                          relic_rarity=Rarity.STARTER)
 
@@ -1031,3 +1031,5 @@ class Circlet(AbstractRelic):
     pass
 
 
+# Every relic by its name, parsed from the class name
+relic_classes = Registry(AbstractRelic.__subclasses__, key=lambda cls: parse_class_name(cls.__name__))
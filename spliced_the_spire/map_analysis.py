@@ -0,0 +1,250 @@
+"""
+Route analysis over generated act maps (see main.map.generate_map), by dynamic programming up the
+floors of the map rather than by walking every path.
+
+Example:
+    game_map = generate_map(seed=1)
+    count_paths(game_map)                                        # Distinct paths up to the boss
+    score, path = best_path(game_map, {RoomType.ELITE: 1, RoomType.REST: 0.5, RoomType.SHOP: 0.25})
+    room_count_range(game_map, RoomType.ELITE)                   # (fewest, most) elites on any path
+    most_before(game_map, RoomType.ELITE, RoomType.REST)         # Elites before the first rest site
+    pareto_routes(game_map, (RoomType.ELITE, RoomType.REST, RoomType.SHOP))
+
+    maps = [generate_map(seed) for seed in range(10_000)]
+    scores = best_scores(maps, {RoomType.ELITE: 1})              # With NumPy, every map at once
+    counts = path_counts(maps)
+    scores = best_scores(MapCache('act1.maps'), {RoomType.ELITE: 1})   # Or from a map cache file
+
+A path is the tuple of the x of its room on each floor, bottom to top. Every room on the top floor
+leads to the boss, so all paths end there.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Mapping, Sequence
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import GameMap, WIDTH, HEIGHT, LEFT, UP, RIGHT, ROOM_SHIFT
+
+_SIZE = WIDTH * HEIGHT
+_TOP = _SIZE - WIDTH
+_EDGES = LEFT | UP | RIGHT
+
+
+def _predecessors(edges: bytes) -> list[list[int]]:
+    # The positions leading to each position, left to right
+    predecessors = [[] for _ in range(_SIZE)]
+    for i in range(_TOP):
+        mask = edges[i]
+        if mask & LEFT:
+            predecessors[i + WIDTH - 1].append(i)
+        if mask & UP:
+            predecessors[i + WIDTH].append(i)
+        if mask & RIGHT:
+            predecessors[i + WIDTH + 1].append(i)
+    for incoming in predecessors:
+        incoming.sort()
+    return predecessors
+
+
+def _weights(weights: Mapping[RoomType, float]) -> list[float]:
+    # Indexed by RoomType value, types left out score 0
+    table = [0.0] * len(RoomType)
+    for room, weight in weights.items():
+        table[room.value] = weight
+    return table
+
+
+def _path(came_from: list[int], end: int) -> tuple[int, ...]:
+    path = []
+    while end >= 0:
+        path.append(end % WIDTH)
+        end = came_from[end]
+    return tuple(reversed(path))
+
+
+def count_paths(game_map: GameMap) -> int:
+    """The number of distinct paths from the bottom floor to the boss."""
+    edges = game_map.edges
+    ways = [1 if edges[i] else 0 for i in range(WIDTH)] + [0] * (_SIZE - WIDTH)
+    for i, incoming in enumerate(_predecessors(edges)):
+        for j in incoming:
+            ways[i] += ways[j]
+    return sum(ways[_TOP:])
+
+
+def iter_paths(game_map: GameMap) -> Iterator[tuple[int, ...]]:
+    """Every path from the bottom floor to the boss. There can be thousands, prefer the DP functions."""
+    edges = game_map.edges
+
+    def walk(i: int, path: tuple[int, ...]):
+        if i >= _TOP:
+            yield path
+            return
+        mask = edges[i]
+        for bit, step in ((LEFT, WIDTH - 1), (UP, WIDTH), (RIGHT, WIDTH + 1)):
+            if mask & bit:
+                yield from walk(i + step, path + ((i + step) % WIDTH,))
+
+    for x in range(WIDTH):
+        if edges[x]:
+            yield from walk(x, (x,))
+
+
+def best_path(game_map: GameMap, weights: Mapping[RoomType, float]) -> tuple[float, tuple[int, ...]]:
+    """
+    The highest scoring path and its score, where a path scores the sum of weights[room type] over its
+    rooms (types left out of weights score 0). Ties go to the path through the leftmost rooms.
+    """
+    weight = _weights(weights)
+    rooms = game_map.rooms
+    best: list[float | None] = [None] * _SIZE
+    came_from = [-1] * _SIZE
+    for i in range(WIDTH):
+        if game_map.edges[i]:
+            best[i] = weight[rooms[i]]
+    for i, incoming in enumerate(_predecessors(game_map.edges)):
+        if incoming:
+            previous = max(incoming, key=best.__getitem__)
+            best[i] = best[previous] + weight[rooms[i]]
+            came_from[i] = previous
+    end = max((i for i in range(_TOP, _SIZE) if best[i] is not None), key=best.__getitem__)
+    return best[end], _path(came_from, end)
+
+
+def room_count_range(game_map: GameMap, room: RoomType) -> tuple[int, int]:
+    """The fewest and the most rooms of a type on any path."""
+    most, _ = best_path(game_map, {room: 1})
+    fewest, _ = best_path(game_map, {room: -1})
+    return int(-fewest), int(most)
+
+
+def most_before(game_map: GameMap, room: RoomType, before: RoomType) -> int:
+    """
+    The most rooms of type room any path goes through before its first room of type before,
+    E.g. most_before(game_map, RoomType.ELITE, RoomType.REST) for the elites that can be fought
+    before the first rest site. Paths without a room of type before count up to the boss.
+    """
+    rooms = game_map.rooms
+    # The most rooms of type room on a path to each position that hasn't been through before yet
+    most: list[int | None] = [None] * _SIZE
+    best = 0
+    for i, incoming in enumerate(_predecessors(game_map.edges)):
+        if i < WIDTH:
+            if not game_map.edges[i]:
+                continue
+            arriving = 0
+        else:
+            if not incoming:
+                continue
+            arriving = max((most[j] for j in incoming if most[j] is not None), default=None)
+            if arriving is None:
+                continue
+        if rooms[i] == before.value:
+            best = max(best, arriving)
+        else:
+            most[i] = arriving + (rooms[i] == room.value)
+    return max([best, *(count for count in most[_TOP:] if count is not None)])
+
+
+def _dominates(a: tuple[int, ...], b: tuple[int, ...]) -> bool:
+    return a != b and all(x >= y for x, y in zip(a, b))
+
+
+def pareto_routes(game_map: GameMap, objectives: Sequence[RoomType]) -> list[tuple[tuple[int, ...], tuple[int, ...]]]:
+    """
+    The paths no other path beats on every objective, as (counts, path) with counts the number of rooms
+    of each objective type on the path. More of each type is better, one path is kept per counts.
+    """
+    index = {room.value: k for k, room in enumerate(objectives)}
+    rooms = game_map.rooms
+    zero = (0,) * len(objectives)
+
+    def gain(counts: tuple[int, ...], i: int) -> tuple[int, ...]:
+        k = index.get(rooms[i])
+        return counts if k is None else counts[:k] + (counts[k] + 1,) + counts[k + 1:]
+
+    def prune(front: dict) -> dict:
+        return {counts: path for counts, path in front.items()
+                if not any(_dominates(other, counts) for other in front)}
+
+    # The Pareto front of the paths up to each position, as counts -> path
+    fronts: list[dict] = [{} for _ in range(_SIZE)]
+    for i in range(WIDTH):
+        if game_map.edges[i]:
+            fronts[i] = {gain(zero, i): (i,)}
+    for i, incoming in enumerate(_predecessors(game_map.edges)):
+        if incoming:
+            front = {}
+            for j in incoming:
+                for counts, path in fronts[j].items():
+                    front.setdefault(gain(counts, i), path + (i % WIDTH,))
+            fronts[i] = prune(front)
+
+    final = {}
+    for i in range(_TOP, _SIZE):
+        for counts, path in fronts[i].items():
+            final.setdefault(counts, path)
+    return sorted(prune(final).items(), reverse=True)
+
+
+def stack_maps(maps: Sequence[GameMap]) -> tuple['numpy.ndarray', 'numpy.ndarray']:
+    """
+    The edges and rooms of maps as two uint8 arrays of shape (len(maps), HEIGHT, WIDTH), without copying
+    each map. maps can also be a map_cache.MapCache, whose records are split into two new arrays.
+    """
+    import numpy as np
+    if hasattr(maps, 'packed'):
+        packed = maps.packed()
+        return packed & _EDGES, packed >> ROOM_SHIFT
+    edges = np.frombuffer(b''.join(game_map.edges for game_map in maps), dtype=np.uint8)
+    rooms = np.frombuffer(b''.join(game_map.rooms for game_map in maps), dtype=np.uint8)
+    return edges.reshape(-1, HEIGHT, WIDTH), rooms.reshape(-1, HEIGHT, WIDTH)
+
+
+def _packed(maps: Sequence[GameMap]) -> 'numpy.ndarray':
+    # maps in encode_map's one byte per room, shape (len(maps), HEIGHT, WIDTH). For a MapCache this is a
+    # view of the file, which _climb splits into edges and rooms a floor at a time
+    if hasattr(maps, 'packed'):
+        return maps.packed()
+    edges, rooms = stack_maps(maps)
+    return edges | rooms << ROOM_SHIFT
+
+
+def _climb(packed: 'numpy.ndarray', value: 'numpy.ndarray', gain, combine, empty) -> 'numpy.ndarray':
+    # Carries value (one per bottom floor room of every map) up the floors, combining what comes into
+    # each room and adding gain(room types) of its floor, if given. Rooms nothing leads to end up with empty
+    import numpy as np
+    for y in range(1, HEIGHT):
+        # The edge bits are tested in place, they are the low bits of each byte
+        below = packed[:, y - 1]
+        incoming = np.where(below & UP, value, empty)
+        from_left = np.where(below[:, :-1] & RIGHT, value[:, :-1], empty)
+        incoming[:, 1:] = combine(incoming[:, 1:], from_left)
+        from_right = np.where(below[:, 1:] & LEFT, value[:, 1:], empty)
+        incoming[:, :-1] = combine(incoming[:, :-1], from_right)
+        value = incoming if gain is None else incoming + gain(packed[:, y] >> ROOM_SHIFT)
+    return value
+
+
+def path_counts(maps: Sequence[GameMap]) -> 'numpy.ndarray':
+    """count_paths for every map, as an int64 array. Needs NumPy."""
+    import numpy as np
+    packed = _packed(maps)
+    start = ((packed[:, 0] & _EDGES) > 0).astype(np.int64)
+    return _climb(packed, start, None, np.add, 0).sum(axis=1)
+
+
+def best_scores(maps: Sequence[GameMap], weights: Mapping[RoomType, float]) -> 'numpy.ndarray':
+    """The score of best_path for every map, as a float64 array. Needs NumPy."""
+    import numpy as np
+    packed = _packed(maps)
+    weight = np.asarray(_weights(weights))
+    start = np.where(packed[:, 0] & _EDGES, weight[packed[:, 0] >> ROOM_SHIFT], -np.inf)
+    return _climb(packed, start, weight.__getitem__, np.maximum, -np.inf).max(axis=1)
+
+
+def room_count_ranges(maps: Sequence[GameMap], room: RoomType) -> tuple['numpy.ndarray', 'numpy.ndarray']:
+    """room_count_range for every map, as arrays of the fewest and the most. Needs NumPy."""
+    most = best_scores(maps, {room: 1})
+    fewest = -best_scores(maps, {room: -1})
+    return fewest.astype(int), most.astype(int)
@@ -0,0 +1,128 @@
+"""
+An on-disk cache of generated act maps, for reloading millions of maps without generating them again.
+
+Example:
+    build_cache('act1.maps', stop=1_000_000, act=1)
+    with MapCache('act1.maps') as cache:
+        cache[123]                                           # The GameMap of seed 123
+        maps = cache.maps(0, 10_000)
+        scores = best_scores(cache, {RoomType.ELITE: 1})     # Every map at once, straight from the file
+
+A cache file is a header (see _HEADER) followed by the encode_map record of each seed from start to
+start + count - 1 in order, so the map of a seed is at a fixed offset and the file is memory-mapped
+rather than read. Only integer seeds can be cached.
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from spliced_the_spire.main.map import ENCODED_SIZE, HEIGHT, WIDTH, GameMap, decode_map, encode_map, generate_map
+
+_MAGIC = b'STSM'
+_VERSION = 1
+# Magic, version, act, the first seed and how many seeds follow
+_HEADER = struct.Struct('<4sHHqq')
+
+
+def _encode_shard(start: int, stop: int, act: int) -> bytes:
+    # Worker entry point, the records of seeds start to stop - 1
+    return b''.join(encode_map(generate_map(seed, act)) for seed in range(start, stop))
+
+
+def build_cache(path: str,
+                stop: int,
+                start: int = 0,
+                act: int = 1,
+                workers: Optional[int] = 1,
+                shard_size: int = 10000):
+    """
+    Generates the maps of seeds start to stop - 1 into a new cache file at path, replacing any file there.
+
+    Parameters
+    ----------
+    :param workers:
+        Number of worker processes. None uses one per CPU, 1 runs everything in this process.
+
+    :param shard_size:
+        How many maps each task sent to a worker generates.
+    """
+    shards = [(first, min(first + shard_size, stop)) for first in range(start, stop, shard_size)]
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, act, start, max(stop - start, 0)))
+        if workers == 1:
+            for first, last in shards:
+                file.write(_encode_shard(first, last, act))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_encode_shard, first, last, act) for first, last in shards]
+                for future in futures:
+                    file.write(future.result())
+
+
+class MapCache:
+    """A memory-mapped cache file written by build_cache. Indexed by seed, E.g. cache[seed] or seed in cache."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            self.close()
+            raise ValueError(f'{path!r} is not a version {_VERSION} map cache')
+        magic, version, self.act, self.start, self.count = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f'{path!r} is not a version {_VERSION} map cache')
+        if len(self._mmap) < _HEADER.size + self.count * ENCODED_SIZE:
+            self.close()
+            raise ValueError(f'{path!r} is truncated, expected {self.count} maps')
+
+    @property
+    def stop(self) -> int:
+        return self.start + self.count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, seed) -> bool:
+        return isinstance(seed, int) and self.start <= seed < self.stop
+
+    def record(self, seed: int) -> bytes:
+        """The encode_map bytes of the map of seed."""
+        if seed not in self:
+            raise KeyError(seed)
+        offset = _HEADER.size + (seed - self.start) * ENCODED_SIZE
+        return self._mmap[offset:offset + ENCODED_SIZE]
+
+    def __getitem__(self, seed: int) -> GameMap:
+        return decode_map(self.record(seed), seed, self.act)
+
+    def maps(self, start: Optional[int] = None, stop: Optional[int] = None) -> list[GameMap]:
+        """The maps of seeds start to stop - 1, all of them by default."""
+        start = self.start if start is None else max(start, self.start)
+        stop = self.stop if stop is None else min(stop, self.stop)
+        data = self._mmap[_HEADER.size + (start - self.start) * ENCODED_SIZE:
+                          _HEADER.size + (stop - self.start) * ENCODED_SIZE]
+        return [decode_map(data[offset:offset + ENCODED_SIZE], seed, self.act)
+                for seed, offset in zip(range(start, stop), range(0, len(data), ENCODED_SIZE))]
+
+    def packed(self) -> 'numpy.ndarray':
+        """
+        The encode_map record of every map as a uint8 array of shape (len(self), HEIGHT, WIDTH), row i being
+        seed start + i. It is a view of the memory-mapped file, so nothing is copied, and has to be let go of
+        before the cache is closed. Needs NumPy.
+        """
+        import numpy as np
+        packed = np.frombuffer(self._mmap, dtype=np.uint8, count=self.count * ENCODED_SIZE, offset=_HEADER.size)
+        return packed.reshape(-1, HEIGHT, WIDTH)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self) -> MapCache:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,118 @@
+"""
+Encodes combats as flat float32 arrays for agents, writing in place into buffers the caller owns.
+
+Example:
+    encoder = ObservationEncoder()
+    buffer = encoder.new_buffer()
+    encoder.encode(room, buffer)          # Every step, no allocation
+    batch = encoder.new_buffer(64)
+    encoder.encode_batch(rooms, batch)    # Fills a (64, encoder.size) array
+
+The vocabularies are stable: card ids are AbstractCard.card_id, effect ids are
+AbstractEffect.effect_id and intents are IntentType values, so an encoding means the same thing from
+run to run as long as no cards or effects are added. encoder.fields names the slice each part of the
+encoding is written to.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from spliced_the_spire.main.cards import AbstractCard
+from spliced_the_spire.main.abstractions import AbstractEffect, EffectMixin, Room
+from spliced_the_spire.main.enumerations import IntentType
+
+# The id of every card class, its AbstractCard.card_id
+CARD_IDS: dict[type[AbstractCard], int] = {card_cls: card_cls.card_id for card_cls in AbstractCard.registry}
+INTENTS: tuple[IntentType, ...] = tuple(IntentType)
+
+
+class ObservationEncoder:
+    """
+    Lays a combat out as, in order:
+    - actor: health, max health, energy, max energy
+    - actor_effects: the stacks of every effect, by effect_id
+    - hand: the card id + 1 in each hand slot, 0 for an empty slot
+    - draw, hand_counts, discard, exhaust: how many of each card id are in each pile
+    - enemies: for each enemy slot, whether it is alive, its health and max health, a one hot of the
+      intent of its planned move and the stacks of every effect
+    Missing enemies, and hand slots or enemies past the maximums, are left as zeros.
+    """
+
+    def __init__(self, max_hand: int = 10, max_enemies: int = 5):
+        self.max_hand = max_hand
+        self.max_enemies = max_enemies
+        self.effects = len(AbstractEffect.registry)
+        self.cards = len(AbstractCard.registry)
+        # The offset of each intent in an enemy's one hot
+        self.intent_ids: dict[IntentType, int] = {intent: i for i, intent in enumerate(INTENTS)}
+        self.enemy_size = 3 + len(INTENTS) + self.effects
+
+        self.fields: dict[str, slice] = {}
+        at = 0
+        for name, size in (('actor', 4), ('actor_effects', self.effects), ('hand', max_hand),
+                           ('draw', self.cards), ('hand_counts', self.cards), ('discard', self.cards),
+                           ('exhaust', self.cards), ('enemies', max_enemies * self.enemy_size)):
+            self.fields[name] = slice(at, at + size)
+            at += size
+        self.size: int = at
+
+    def new_buffer(self, batch: Optional[int] = None) -> np.ndarray:
+        """Returns a zeroed buffer for one observation, or a (batch, size) buffer for encode_batch."""
+        return np.zeros(self.size if batch is None else (batch, self.size), dtype=np.float32)
+
+    def _write_effects(self, out: np.ndarray, at: int, entity: EffectMixin):
+        # effect_stacks is read in place, effects defined after the encoder was made are left out
+        stacks = entity.effect_stacks
+        count = min(len(stacks), self.effects)
+        out[at:at + count] = np.frombuffer(stacks, dtype=np.int64, count=count)
+
+    def encode(self, room: Room, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Writes room into out (a buffer from new_buffer, or a row of one), and returns it."""
+        if out is None:
+            out = self.new_buffer()
+        else:
+            out.fill(0)
+        actor = room.actor
+        fields = self.fields
+
+        at = fields['actor'].start
+        out[at] = actor.health
+        out[at + 1] = actor.max_health
+        out[at + 2] = actor.energy
+        out[at + 3] = actor.max_energy
+        self._write_effects(out, fields['actor_effects'].start, actor)
+
+        # Cards defined after the encoder was made are left out
+        at = fields['hand'].start
+        for slot, card in enumerate(actor.hand_pile[:self.max_hand]):
+            if card.card_id < self.cards:
+                out[at + slot] = card.card_id + 1
+
+        for name, pile in (('draw', actor.draw_pile), ('hand_counts', actor.hand_pile),
+                           ('discard', actor.discard_pile), ('exhaust', actor._exhaust_pile)):
+            counts = out[fields[name]]
+            for card in pile:
+                if card.card_id < self.cards:
+                    counts[card.card_id] += 1
+
+        at = fields['enemies'].start
+        for enemy in room.enemies[:self.max_enemies]:
+            if not enemy.is_dead():
+                out[at] = 1
+                if enemy.intent is not None:
+                    out[at + 3 + self.intent_ids[enemy.intent]] = 1
+            out[at + 1] = enemy.health
+            out[at + 2] = enemy.max_health
+            self._write_effects(out, at + 3 + len(INTENTS), enemy)
+            at += self.enemy_size
+        return out
+
+    def encode_batch(self, rooms: Sequence[Room], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Writes every room into a row of out, a (len(rooms), size) buffer from new_buffer, and returns it."""
+        if out is None:
+            out = self.new_buffer(len(rooms))
+        for row, room in zip(out, rooms):
+            self.encode(room, row)
+        return out
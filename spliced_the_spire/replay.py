@@ -0,0 +1,228 @@
+"""
+Deterministic combat replays: a combat is stored as how it started (a CombatSpec) and the decisions
+its actor made, and replayed without the actor's turn_logic in the loop.
+
+Example:
+    spec = CombatSpec(seed=7, deck='5xStrike_R 4xDefend_R Bash', enemies=('Jaw Worm',))
+    recorded, result = record_combat(LeftToRightAI, spec)
+    write_replays('combats.replays', [recorded])
+    for recorded in read_replays('combats.replays'):
+        assert replay(recorded) == result        # Checks the state hash of every turn on the way
+
+Every random draw of a combat comes from the RandomStreams seeded with spec.seed, so the same spec
+and decisions play out the same way every time. Decisions are plain integers, in the order the
+actor made them: END_TURN, or hand slot * MAX_TARGETS + target for playing a card from the hand
+at an enemy (by its index in room.enemies), or the index of the option picked whenever a card
+asks the actor to select something.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from spliced_the_spire.main.cards import AbstractCard
+from spliced_the_spire.main.abstractions import AbstractActor, Room
+from spliced_the_spire.main.classes import STSClass, build_deck
+from spliced_the_spire.main.enemies import enemies
+from spliced_the_spire.main.enumerations import LogLevel, SelectEvent
+from spliced_the_spire.main.relics import relic_classes
+from spliced_the_spire.batch import CombatResult
+from spliced_the_spire.decks import parse_deck
+from spliced_the_spire.lutil import RandomStreams
+
+END_TURN = -1
+# Targets per hand slot in a play decision
+MAX_TARGETS = 16
+
+
+class CombatSpec(NamedTuple):
+    """
+    How a combat starts. deck is a decks.parse_deck spec, enemies are enemies.enemies keys, relics
+    are relics.relic_classes keys and hero the name of an STSClass.
+    """
+    seed: int | str
+    deck: str
+    enemies: tuple[str, ...]
+    relics: tuple[str, ...] = ()
+    ascension: int = 0
+    hero: str = 'Ironclad'
+    max_turns: int = 100
+
+
+class Replay(NamedTuple):
+    """A recorded combat, with the state_hash after every round if they were recorded."""
+    spec: CombatSpec
+    decisions: tuple[int, ...]
+    hashes: Optional[tuple[int, ...]] = None
+
+
+class ReplayMismatch(RuntimeError):
+    """A replayed combat didn't reach the state it was recorded in."""
+
+
+def _index(items, item) -> int:
+    # The position of item in items, by identity rather than ==
+    for i, other in enumerate(items):
+        if other is item:
+            return i
+    raise ValueError(f'{item} is not in {items}')
+
+
+def state_hash(room: Room) -> int:
+    """A checksum of the combat state: health, energy, effects, piles and the enemies' move states."""
+    actor = room.actor
+    state = (actor.health, actor.max_health, actor.energy, tuple(actor.effect_stacks),
+             tuple(tuple((card.card_id, card.upgraded, card.energy_cost) for card in pile)
+                   for pile in actor.card_piles.values()),
+             tuple((enemy.health, tuple(enemy.effect_stacks), enemy.move_state, enemy.planned_move)
+                   for enemy in room.enemies))
+    return zlib.crc32(repr(state).encode())
+
+
+@lru_cache(maxsize=None)
+def _recording(actor: type[AbstractActor]) -> type[AbstractActor]:
+    # actor, writing every decision it makes to its decisions list
+
+    class Recording(actor):
+        decisions: list[int]
+        # How deep in use_card calls the actor is, cards like Havoc play other cards
+        _playing = 0
+
+        def use_card(self, target, card, is_free=False, will_discard=True):
+            if not self._playing:
+                self.decisions.append(_index(self.hand_pile, card) * MAX_TARGETS + _index(self.room.enemies, target))
+            self._playing += 1
+            try:
+                super().use_card(target, card, is_free=is_free, will_discard=will_discard)
+            finally:
+                self._playing -= 1
+
+        def end_turn(self):
+            self.decisions.append(END_TURN)
+            super().end_turn()
+
+        def select_card(self, options: list[AbstractCard], event_type: SelectEvent) -> AbstractCard:
+            card = super().select_card(options, event_type)
+            self.decisions.append(_index(options, card))
+            return card
+
+        def select_option(self, options: list, event) -> int:
+            option = super().select_option(options, event)
+            self.decisions.append(option)
+            return option
+
+    Recording.__name__ = Recording.__qualname__ = f'Recording{actor.__name__}'
+    return Recording
+
+
+class ReplayActor(AbstractActor):
+    """An actor that makes the decisions it is given, in order, instead of deciding."""
+
+    def __init__(self, clas, decisions: Iterable[int], cards=None, *args, **kwargs):
+        super().__init__(clas, cards=cards, *args, **kwargs)
+        self.decisions: Iterator[int] = iter(decisions)
+
+    def _next_decision(self, choices: Optional[int] = None) -> int:
+        # The next decision, which has to be below choices if given
+        decision = next(self.decisions, None)
+        if decision is None:
+            raise ReplayMismatch(f'Replay ran out of decisions on turn {self.turns_started}')
+        if choices is not None and not 0 <= decision < choices:
+            raise ReplayMismatch(f'Replay picked option {decision} of {choices} on turn {self.turns_started}')
+        return decision
+
+    def turn_logic(self):
+        decision = self._next_decision()
+        while decision != END_TURN:
+            slot, target = divmod(decision, MAX_TARGETS)
+            if not 0 <= slot < len(self.hand_pile) or target >= len(self.room.enemies):
+                raise ReplayMismatch(f'Replay played hand slot {slot} of {len(self.hand_pile)} at enemy {target} '
+                                     f'of {len(self.room.enemies)} on turn {self.turns_started}')
+            self.use_card(self.room.enemies[target], self.hand_pile[slot])
+            decision = self._next_decision()
+
+    def select_card(self, options: list[AbstractCard], event_type: SelectEvent) -> AbstractCard:
+        return options[self._next_decision(len(options))]
+
+    def select_option(self, options: list, event) -> int:
+        return self._next_decision(len(options))
+
+
+def _room(spec: CombatSpec, actor: type[AbstractActor], **kwargs) -> Room:
+    # A fresh combat set up from spec
+    rng = RandomStreams(spec.seed)
+    hero = next(cls for cls in STSClass.__subclasses__() if cls.__name__ == spec.hero)
+    player = actor(hero, cards=build_deck(parse_deck(spec.deck)), rng=rng, **kwargs)
+    for name in spec.relics:
+        player.add_relic(relic_classes[name]())
+    return Room(player, [enemies[name](ascension=spec.ascension, rng=rng) for name in spec.enemies], rng=rng,
+                log_level=LogLevel.OFF)
+
+
+def _result(room: Room, starting_health: int, turns: int) -> CombatResult:
+    return CombatResult(won=room.is_won(), hp_lost=starting_health - room.actor.health, turns=turns)
+
+
+def record_combat(actor: type[AbstractActor], spec: CombatSpec, hashes: bool = True) -> tuple[Replay, CombatResult]:
+    """
+    Plays the combat spec sets up with actor making the decisions, and returns it as a Replay along with
+    its outcome. hashes records the state_hash after every round, for replay to check against.
+    """
+    room = _room(spec, _recording(actor))
+    room.actor.decisions = []
+    starting_health = room.actor.health
+    turn_hashes = []
+    on_turn = (lambda room: turn_hashes.append(state_hash(room))) if hashes else None
+    turns = room.run_combat(spec.max_turns, on_turn=on_turn)
+    recorded = Replay(spec, tuple(room.actor.decisions), tuple(turn_hashes) if hashes else None)
+    return recorded, _result(room, starting_health, turns)
+
+
+def replay(recorded: Replay, verify: bool = True) -> CombatResult:
+    """
+    Plays a recorded combat again from its decisions and returns its outcome. If verify and the replay
+    has hashes, the state after every round is checked against them, raising ReplayMismatch on the
+    first round that differs. ReplayMismatch is also raised if a decision names a hand slot, enemy or
+    option the combat doesn't have, if the combat needs more decisions than were recorded, or if it
+    ends before using all of them (or all of the hashes).
+    """
+    room = _room(recorded.spec, ReplayActor, decisions=recorded.decisions)
+    starting_health = room.actor.health
+    on_turn = None
+    expected = iter(recorded.hashes or ())
+    if verify and recorded.hashes is not None:
+
+        def on_turn(room: Room):
+            turn_hash = next(expected, None)
+            if turn_hash is None or state_hash(room) != turn_hash:
+                raise ReplayMismatch(f'Replay of seed {recorded.spec.seed!r} diverged on turn '
+                                     f'{room.actor.turns_started}')
+
+    turns = room.run_combat(recorded.spec.max_turns, on_turn=on_turn)
+    if next(room.actor.decisions, None) is not None:
+        raise ReplayMismatch(f'Replay of seed {recorded.spec.seed!r} ended on turn {turns} with decisions left over')
+    if on_turn is not None and next(expected, None) is not None:
+        raise ReplayMismatch(f'Replay of seed {recorded.spec.seed!r} ended on turn {turns} before its last hash')
+    return _result(room, starting_health, turns)
+
+
+def write_replays(path: str, replays: Iterable[Replay]):
+    """Appends replays to path, one JSON object per line."""
+    with open(path, 'a') as file:
+        file.writelines(json.dumps({'spec': recorded.spec._asdict(),
+                                    'decisions': recorded.decisions,
+                                    'hashes': recorded.hashes}, separators=(',', ':')) + '\n'
+                        for recorded in replays)
+
+
+def read_replays(path: str) -> Iterator[Replay]:
+    """The replays written to path by write_replays."""
+    with open(path) as file:
+        for line in file:
+            data = json.loads(line)
+            spec = data['spec']
+            spec = CombatSpec(**{**spec, 'enemies': tuple(spec['enemies']), 'relics': tuple(spec['relics'])})
+            hashes = data['hashes']
+            yield Replay(spec, tuple(data['decisions']), None if hashes is None else tuple(hashes))
@@ -0,0 +1,211 @@
+"""
+Scans ranges of seeds for act maps that pass a predicate, spread over a pool of worker processes.
+
+Example:
+    result = scan_seeds(AllOf([MostBefore(RoomType.ELITE, RoomType.REST, 2), RoomOnFloors(RoomType.SHOP, 5, 7)]),
+                        stop=1_000_000, output='seeds.txt')
+    print(result.matches, result.maps_per_second_per_core)
+
+or from the command line:
+    python -m spliced_the_spire.seed_scan seeds.txt --stop 1000000 --elites-before-rest 2 --shop-floors 5 7
+
+A predicate is called with each GameMap (see main.map) and returns whether to keep its seed. It is
+sent to the workers, so it has to pickle: a module level function or an instance of a module level
+class, like the ones below.
+
+The output file starts with a '#! seed_scan act=<act> start=<start>' header. Matching seeds are
+written to it one per line as each shard finishes, in seed order, followed by a '# <seed>' line once
+every seed below <seed> has been scanned. Scanning into a file written by a scan of the same act and
+start picks up from its last such line, so an interrupted scan can just be run again, or run with a
+larger stop to scan further. Any other existing file is left alone and raises ValueError.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple, Optional, Sequence
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import GameMap, WIDTH, generate_map
+from spliced_the_spire.map_analysis import most_before
+
+MapPredicate = Callable[[GameMap], bool]
+
+
+class RoomOnFloors:
+    """Whether the map has a room of type room on a floor from low to high (0 is the bottom floor)."""
+
+    def __init__(self, room: RoomType, low: int, high: int):
+        self.room = room
+        self.low = low
+        self.high = high
+
+    def __call__(self, game_map: GameMap) -> bool:
+        return self.room.value in game_map.rooms[self.low * WIDTH:(self.high + 1) * WIDTH]
+
+
+class MostBefore:
+    """Whether some path goes through at least count rooms of type room before its first room of type before."""
+
+    def __init__(self, room: RoomType, before: RoomType, count: int):
+        self.room = room
+        self.before = before
+        self.count = count
+
+    def __call__(self, game_map: GameMap) -> bool:
+        return most_before(game_map, self.room, self.before) >= self.count
+
+
+class AllOf:
+    """Whether the map passes every predicate, checked in order."""
+
+    def __init__(self, predicates: Sequence[MapPredicate]):
+        self.predicates = list(predicates)
+
+    def __call__(self, game_map: GameMap) -> bool:
+        return all(predicate(game_map) for predicate in self.predicates)
+
+
+class ScanResult(NamedTuple):
+    """How a scan went. seconds is wall time, worker_seconds the time spent generating and checking maps."""
+    scanned: int
+    matches: int
+    seconds: float
+    worker_seconds: float
+
+    @property
+    def maps_per_second(self) -> float:
+        return self.scanned / self.seconds if self.seconds else 0.0
+
+    @property
+    def maps_per_second_per_core(self) -> float:
+        return self.scanned / self.worker_seconds if self.worker_seconds else 0.0
+
+
+def _header(act: int, start: int) -> bytes:
+    return f'#! seed_scan act={act} start={start}\n'.encode()
+
+
+def _resume(output: str, act: int, start: int) -> int:
+    # The first seed left to scan into output. A new (or empty) file gets its header, a file of the same
+    # scan is cut back to its last progress line, anything else raises ValueError and is left alone
+    header = _header(act, start)
+    if not os.path.exists(output) or os.path.getsize(output) == 0:
+        with open(output, 'wb') as file:
+            file.write(header)
+        return start
+
+    with open(output, 'rb+') as file:
+        lines = file.readlines()
+        if not lines or not lines[0].startswith(b'#! seed_scan '):
+            raise ValueError(f'{output!r} is not a seed_scan output file')
+        if lines[0] != header:
+            raise ValueError(f'{output!r} was written by another scan ({lines[0][3:].decode().strip()}), '
+                             f'not act={act} start={start}')
+        end = kept = len(lines[0])
+        offset = start
+        for line in lines[1:]:
+            end += len(line)
+            if line.startswith(b'# ') and line.endswith(b'\n'):
+                offset = int(line[2:])
+                kept = end
+        # Seeds written after the last progress line are from a shard that didn't finish
+        file.truncate(kept)
+    return offset
+
+
+def _scan_shard(start: int, stop: int, act: int, predicate: MapPredicate) -> tuple[list[int], float]:
+    # Worker entry point, the seeds start to stop - 1 that pass and the time it took
+    began = time.perf_counter()
+    matches = [seed for seed in range(start, stop) if predicate(generate_map(seed, act))]
+    return matches, time.perf_counter() - began
+
+
+def scan_seeds(predicate: MapPredicate,
+               stop: int,
+               output: str,
+               start: int = 0,
+               act: int = 1,
+               workers: Optional[int] = None,
+               shard_size: int = 2000) -> ScanResult:
+    """
+    Generates the act maps of seeds start to stop - 1 and writes the seeds whose maps pass predicate to output.
+
+    Parameters
+    ----------
+    :param output:
+        The file matching seeds are written to. If it exists it has to be from an earlier scan of the same act
+        and start, which is resumed from where it stopped.
+
+    :param workers:
+        Number of worker processes. None uses one per CPU, 1 runs everything in this process.
+
+    :param shard_size:
+        How many seeds each task sent to a worker scans, and how often progress is written.
+    """
+    shards = [(first, min(first + shard_size, stop))
+              for first in range(_resume(output, act, start), stop, shard_size)]
+
+    began = time.perf_counter()
+    matches = 0
+    worker_seconds = 0.0
+    with open(output, 'a') as file:
+
+        def write(stop: int, found: list[int]):
+            file.writelines(f'{seed}\n' for seed in found)
+            file.write(f'# {stop}\n')
+            file.flush()
+
+        if workers == 1:
+            for first, last in shards:
+                found, seconds = _scan_shard(first, last, act, predicate)
+                write(last, found)
+                matches += len(found)
+                worker_seconds += seconds
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_scan_shard, first, last, act, predicate) for first, last in shards]
+                # Written in shard order, so the progress lines never skip a seed
+                for (_, last), future in zip(shards, futures):
+                    found, seconds = future.result()
+                    write(last, found)
+                    matches += len(found)
+                    worker_seconds += seconds
+
+    return ScanResult(scanned=sum(last - first for first, last in shards),
+                      matches=matches,
+                      seconds=time.perf_counter() - began,
+                      worker_seconds=worker_seconds)
+
+
+def read_seeds(output: str) -> list[int]:
+    """The seeds a scan wrote to output."""
+    with open(output) as file:
+        return [int(line) for line in file if line.strip() and not line.startswith('#')]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Scan seeds for act maps that match every given constraint.')
+    parser.add_argument('output', help='file the matching seeds are written to, resumed if it exists')
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--stop', type=int, required=True)
+    parser.add_argument('--act', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--elites-before-rest', type=int, default=0, metavar='N',
+                        help='some path has at least N elites before its first rest site')
+    parser.add_argument('--shop-floors', type=int, nargs=2, default=None, metavar=('LOW', 'HIGH'),
+                        help='there is a shop on a floor from LOW to HIGH, 0 being the bottom floor')
+    arguments = parser.parse_args()
+
+    predicates = []
+    if arguments.elites_before_rest:
+        predicates.append(MostBefore(RoomType.ELITE, RoomType.REST, arguments.elites_before_rest))
+    if arguments.shop_floors:
+        predicates.append(RoomOnFloors(RoomType.SHOP, *arguments.shop_floors))
+    result = scan_seeds(AllOf(predicates), arguments.stop, arguments.output,
+                        start=arguments.start, act=arguments.act, workers=arguments.workers)
+    print(f'{result.matches:,} of {result.scanned:,} seeds matched in {result.seconds:.1f}s, '
+          f'{result.maps_per_second:,.0f} maps/second, {result.maps_per_second_per_core:,.0f} maps/second per core')
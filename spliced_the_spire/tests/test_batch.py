@@ -0,0 +1,39 @@
+import random
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.enemies import JawWorm, GreenLouse, RedLouse
+from spliced_the_spire.batch import run_batch, run_combat, combat_seed
+
+
+class TestBatch(unittest.TestCase):
+    deck = [RedStrike] * 5 + [RedDefend] * 4 + [Bash]
+
+    def test_run_combat_is_seeded(self):
+        first = run_combat(LeftToRightAI, self.deck, [JawWorm], seed=combat_seed(7, 0))
+        second = run_combat(LeftToRightAI, self.deck, [JawWorm], seed=combat_seed(7, 0))
+
+        self.assertEqual(first, second)
+
+    def test_run_combat_leaves_random_module_alone(self):
+        random.seed(1)
+        state = random.getstate()
+        first = run_combat(LeftToRightAI, self.deck, [GreenLouse, RedLouse], seed=combat_seed(7, 1))
+
+        # Combats only draw from their own streams
+        self.assertEqual(state, random.getstate())
+        random.seed(2)
+        self.assertEqual(first, run_combat(LeftToRightAI, self.deck, [GreenLouse, RedLouse], seed=combat_seed(7, 1)))
+
+    def test_results_do_not_depend_on_workers(self):
+        in_process = run_batch(40, LeftToRightAI, self.deck, [JawWorm], seed=3, workers=1, shard_size=7)
+        pooled = run_batch(40, LeftToRightAI, self.deck, [JawWorm], seed=3, workers=2, shard_size=7)
+
+        self.assertEqual(40, in_process.combats)
+        self.assertEqual(in_process.wins, pooled.wins)
+        self.assertEqual(in_process.hp_lost, pooled.hp_lost)
+        self.assertEqual(in_process.turns, pooled.turns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from spliced_the_spire.main.cards import RedStrike, Bash, Inflame, DuelWield, card_classes
+from spliced_the_spire.main.actors import DummyActor
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.abstractions import AbstractCard
+from spliced_the_spire.main.enumerations import CardType, Color
+
+
+class TestCardDefinitions(unittest.TestCase):
+
+    def test_cards_share_their_class(self):
+        strike = RedStrike()
+        self.assertEqual({'damage', 'uid'}, set(vars(strike)))
+        self.assertEqual('Strike', strike.name)
+        self.assertEqual(CardType.ATTACK, strike.card_type)
+        self.assertNotEqual(strike.uid, RedStrike().uid)
+        # Names are parsed from the class once, not per card
+        self.assertEqual('Inflame', Inflame.name)
+
+        strike.upgrade()
+        self.assertEqual('Strike+', strike.name)
+        self.assertEqual('Strike', RedStrike.name)
+        self.assertEqual('Strike', RedStrike().name)
+        self.assertTrue(RedStrike(upgraded=True).upgraded)
+        self.assertFalse(RedStrike.upgraded)
+
+    def test_definition(self):
+        definition = Bash.definition()
+        self.assertIs(definition, Bash.definition())
+        self.assertEqual(Bash.card_id, definition.card_id)
+        self.assertIs(Bash, AbstractCard.registry[definition.card_id])
+        self.assertEqual(('Bash', 2, CardType.ATTACK, Color.RED),
+                         (definition.name, definition.energy_cost, definition.card_type, definition.color))
+        self.assertEqual({'damage': 8, 'vulnerable': 2}, dict(definition.stats))
+        self.assertEqual({'damage': 10, 'vulnerable': 3}, dict(definition.upgrade))
+        self.assertTrue(Inflame.definition().poof)
+
+    def test_ids_are_unique(self):
+        ids = [card_cls.card_id for card_cls in card_classes.values()]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_copy_and_make(self):
+        bash = Bash()
+        bash.upgrade()
+        copied = bash.copy()
+        self.assertEqual((10, 'Bash+', True), (copied.damage, copied.name, copied.upgraded))
+        self.assertNotEqual(bash.uid, copied.uid)
+        copied.damage = 1
+        self.assertEqual(10, bash.damage)
+
+        made = Bash.make()
+        self.assertEqual((8, 'Bash', False), (made.damage, made.name, made.upgraded))
+        self.assertNotEqual(made.uid, Bash.make().uid)
+
+    def test_duel_wield_copies(self):
+        bash = Bash()
+        bash.upgrade()
+        duel_wield = DuelWield()
+        actor = DummyActor(Ironclad, cards=[], hand=[bash, duel_wield], health=80, max_health=80, energy=3)
+        actor.use_card(None, duel_wield)
+        self.assertEqual(2, len(actor.hand_pile))
+        self.assertIsNot(bash, actor.hand_pile[1])
+        self.assertEqual('Bash+', actor.hand_pile[1].name)
+
+
+if __name__ == '__main__':
+    unittest.main()
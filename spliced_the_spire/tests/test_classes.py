@@ -0,0 +1,34 @@
+import unittest
+
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.classes import Ironclad, DeckEntry, build_deck
+
+
+class TestClasses(unittest.TestCase):
+
+    def test_build_deck(self):
+        deck = build_deck([DeckEntry(RedStrike.card_id, 2), DeckEntry(Bash.card_id, 2, upgraded=True),
+                           DeckEntry(RedDefend.card_id, 0)])
+        self.assertEqual(['Strike', 'Strike', 'Bash+', 'Bash+'], [card.name for card in deck])
+        self.assertEqual([10, 10], [card.damage for card in deck[2:]])
+        self.assertEqual(4, len({card.uid for card in deck}))
+        self.assertEqual(4, len({id(card) for card in deck}))
+
+    def test_actors_get_their_own_deck(self):
+        first, second = LeftToRightAI(Ironclad), LeftToRightAI(Ironclad)
+        self.assertEqual(10, len(first.draw_pile))
+        self.assertEqual([5, 4, 1], [sum(isinstance(card, card_cls) for card in first.draw_pile)
+                                     for card_cls in (RedStrike, RedDefend, Bash)])
+        self.assertFalse({id(card) for card in first.draw_pile} & {id(card) for card in second.draw_pile})
+
+        first.draw_card(5)
+        first.draw_pile[0].upgrade()
+        self.assertEqual(10, len(second.draw_pile))
+        self.assertEqual(0, len(second.hand_pile))
+        self.assertFalse(any(card.upgraded for card in second.draw_pile))
+        self.assertEqual(10, len(Ironclad.new_deck()))
+
+
+if __name__ == '__main__':
+    unittest.main()
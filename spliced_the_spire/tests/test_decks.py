@@ -0,0 +1,50 @@
+import unittest
+
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash, Inflame
+from spliced_the_spire.main.classes import DeckEntry
+from spliced_the_spire.main.abstractions import AbstractCard
+from spliced_the_spire.decks import parse_deck, format_deck, deck_entries, build_decks, deck_vectors
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestDecks(unittest.TestCase):
+
+    def test_parse_and_format(self):
+        spec = '5xStrike_R 4xDefend_R Bash+ Inflame'
+        entries = parse_deck(spec)
+        self.assertEqual((DeckEntry(RedStrike.card_id, 5), DeckEntry(RedDefend.card_id, 4),
+                          DeckEntry(Bash.card_id, 1, True), DeckEntry(Inflame.card_id, 1)), entries)
+        self.assertEqual(spec, format_deck(entries))
+        # Class names work too, and sorted specs are the same for the same cards
+        self.assertEqual(entries[:1], parse_deck('5xRedStrike'))
+        self.assertEqual(format_deck(parse_deck('Bash+ 2xStrike_R')), 'Bash+ 2xStrike_R')
+        self.assertEqual(format_deck(parse_deck('Bash+ 2xStrike_R'), sort=True),
+                         format_deck(parse_deck('2xStrike_R Bash+'), sort=True))
+
+        for spec in ('5xNotACard', 'Bash++', '3x'):
+            self.assertRaises(ValueError, parse_deck, spec)
+
+    def test_build(self):
+        first, second = build_decks(['2xStrike_R Bash+'] * 2)
+        self.assertEqual(['Strike', 'Strike', 'Bash+'], [card.name for card in first])
+        self.assertFalse({id(card) for card in first} & {id(card) for card in second})
+        self.assertEqual('2xStrike_R Bash+', format_deck(deck_entries(first)))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_vectors(self):
+        vectors = deck_vectors(['5xStrike_R Bash+ Bash', 'Inflame'])
+        cards = len(AbstractCard.registry)
+        self.assertEqual((2, 2 * cards), vectors.shape)
+        self.assertEqual(5, vectors[0, RedStrike.card_id])
+        self.assertEqual(1, vectors[0, Bash.card_id])
+        self.assertEqual(1, vectors[0, cards + Bash.card_id])
+        self.assertEqual(7, vectors[0].sum())
+        self.assertEqual(1, vectors[1].sum())
+
+
+if __name__ == '__main__':
+    unittest.main()
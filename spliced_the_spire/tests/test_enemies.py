@@ -1,9 +1,13 @@
+import pickle
+import random
 import unittest
-from spliced_the_spire.main.abstractions import Room
-from spliced_the_spire.main.actors import DummyActor
 from spliced_the_spire.main.cards import *
+from spliced_the_spire.main.abstractions import Room, MoveState
+from spliced_the_spire.main.actors import DummyActor
 from spliced_the_spire.main.classes import Ironclad
-from spliced_the_spire.main.enemies import DummyEnemy
+from spliced_the_spire.main.enemies import DummyEnemy, Cultist, JawWorm, GreenLouse
+from spliced_the_spire.main.effects import CurlUp
+from spliced_the_spire.lutil import RandomStreams
 
 
 class TestEnemies(unittest.TestCase):
@@ -17,5 +21,75 @@ class TestEnemies(unittest.TestCase):
         )
 
         actor.use_card(louse, card)
-        
 
+    def test_ascension_values(self):
+        for ascension, curl_up, bite_bonus, spit_web_limit in ((0, (3, 7), 0, 3), (2, (3, 7), 1, 3), (7, (4, 8), 1, 3),
+                                                               (17, (9, 12), 1, 2), (20, (9, 12), 1, 2)):
+            for seed in range(10):
+                louse = GreenLouse(ascension=ascension, rng=RandomStreams(seed))
+                self.assertTrue(curl_up[0] <= louse.get_effect_stacks(CurlUp) <= curl_up[1])
+                self.assertEqual((bite_bonus, spit_web_limit), (louse.bite_bonus, louse.spit_web_limit))
+
+    def test_given_values_are_not_rolled(self):
+        louse = GreenLouse(ascension=17, curl_up_stacks=5, rng=RandomStreams(1))
+        self.assertEqual(5, louse.get_effect_stacks(CurlUp))
+        # Only max health and base damage were drawn from monster_hp
+        rng = RandomStreams(1).monster_hp
+        self.assertEqual((rng.randint(12, 18), rng.randint(5, 7)), (louse.max_health, louse.base_damage))
+
+    def test_cultist_pattern(self):
+        cultist = Cultist()
+        rng = random.Random(0)
+
+        state = MoveState()
+        self.assertEqual('incantation', cultist.next_move(state, rng))
+        state = state.advance('incantation', cultist.history_size)
+        self.assertEqual('dark_strike', cultist.next_move(state, rng))
+
+    def test_jaw_worm_successive_limits(self):
+        jaw_worm = JawWorm()
+        rng = random.Random(0)
+
+        moves = []
+        state = MoveState()
+        for _ in range(500):
+            move = jaw_worm.next_move(state, rng)
+            moves.append(move)
+            state = state.advance(move, jaw_worm.history_size)
+
+        self.assertEqual('chomp', moves[0])
+        for i in range(1, len(moves)):
+            # Can't Bellow or Chomp twice in a row
+            if moves[i] in ('bellow', 'chomp'):
+                self.assertNotEqual(moves[i - 1], moves[i])
+            # Can't Thrash three times in a row
+            if i >= 2 and moves[i] == 'thrash':
+                self.assertFalse(moves[i - 1] == moves[i - 2] == 'thrash')
+
+    def test_move_state_survives_pickling(self):
+        jaw_worm = JawWorm()
+        jaw_worm.move_state = MoveState(3, ('thrash', 'bellow'))
+
+        copied = pickle.loads(pickle.dumps(jaw_worm))
+
+        self.assertEqual(jaw_worm.move_state, copied.move_state)
+        self.assertEqual(jaw_worm.next_move(jaw_worm.move_state, random.Random(5)),
+                         copied.next_move(copied.move_state, random.Random(5)))
+
+    def test_move_policy_distribution(self):
+        jaw_worm = JawWorm()
+
+        # Bellow is blocked right after a bellow, leaving thrash 30 : chomp 25
+        state = MoveState(2, ('chomp', 'bellow'))
+        distribution = jaw_worm.move_distribution(state)
+        self.assertEqual({'thrash', 'chomp'}, set(distribution))
+        self.assertAlmostEqual(30 / 55, distribution['thrash'])
+        self.assertAlmostEqual(25 / 55, distribution['chomp'])
+
+        self.assertEqual({'chomp': 1.0}, jaw_worm.move_distribution(MoveState()))
+
+        # Sampling should match the exact distribution
+        rng = random.Random(1)
+        draws = 20000
+        thrashes = sum(jaw_worm.next_move(state, rng) == 'thrash' for _ in range(draws))
+        self.assertAlmostEqual(30 / 55, thrashes / draws, delta=0.02)
@@ -0,0 +1,77 @@
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.enemies import JawWorm, GreenLouse, RedLouse
+from spliced_the_spire.main.relics import BurningBlood
+from spliced_the_spire.batch import run_combat, combat_seed
+
+try:
+    import numpy as np
+    from spliced_the_spire.env import (CombatEnv, VectorCombatEnv, SubprocessVectorCombatEnv,
+                                       END_TURN, ACTIONS, OBSERVATION_SIZE)
+except ImportError:
+    np = None
+
+
+def left_to_right(masks):
+    # The first legal action, which plays the leftmost playable card at the first living enemy
+    # like LeftToRightAI, and only ends the turn when nothing can be played
+    return masks.argmax(axis=-1)
+
+
+@unittest.skipIf(np is None, 'The environments need numpy')
+class TestEnv(unittest.TestCase):
+    deck = [RedStrike] * 5 + [RedDefend] * 4 + [Bash]
+
+    def test_plays_like_object_engine(self):
+        env = CombatEnv(self.deck, [GreenLouse, RedLouse], relics=[BurningBlood])
+        for index in range(10):
+            seed = combat_seed(4, index)
+            observation, _ = env.reset(seed)
+            self.assertEqual((OBSERVATION_SIZE,), observation.shape)
+
+            terminated = truncated = False
+            while not (terminated or truncated):
+                mask = env.action_mask()
+                self.assertTrue(mask[END_TURN])
+                _, reward, terminated, truncated, info = env.step(int(left_to_right(mask)))
+
+            expected = run_combat(LeftToRightAI, self.deck, [GreenLouse, RedLouse], relics=[BurningBlood], seed=seed)
+            self.assertEqual((expected.won, expected.hp_lost, expected.turns),
+                             (info['won'], info['hp_lost'], info['turns']))
+            self.assertFalse(env.action_mask().any())
+
+    def test_rejects_masked_actions(self):
+        env = CombatEnv(self.deck, [JawWorm])
+        env.reset(0)
+        # Only the first enemy slot is filled
+        with self.assertRaises(RuntimeError):
+            env.step(1)
+
+    def test_subprocess_matches_in_process(self):
+        envs = VectorCombatEnv(6, deck=self.deck, enemies=[JawWorm])
+        pooled = SubprocessVectorCombatEnv(6, workers=2, deck=self.deck, enemies=[JawWorm])
+        try:
+            observations, _ = envs.reset(seed=9)
+            pooled_observations, _ = pooled.reset(seed=9)
+            finished = 0
+            for _ in range(60):
+                masks = envs.action_masks()
+                self.assertEqual((6, ACTIONS), masks.shape)
+                np.testing.assert_array_equal(masks, pooled.action_masks())
+                np.testing.assert_array_equal(observations, pooled_observations)
+
+                actions = left_to_right(masks)
+                observations, rewards, terminated, truncated, infos = envs.step(actions)
+                pooled_observations, pooled_rewards, *_ = pooled.step(actions)
+                np.testing.assert_array_equal(rewards, pooled_rewards)
+                finished += terminated.sum()
+            # Finished combats are reset, so every env is still playable
+            self.assertGreater(finished, 0)
+            self.assertTrue(envs.action_masks()[:, END_TURN].all())
+        finally:
+            pooled.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.abstractions import Room
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.enemies import JawWorm, GreenLouse, RedLouse
+from spliced_the_spire.main.enumerations import EventType
+from spliced_the_spire.batch import run_batch, shard_events_path
+from spliced_the_spire.events import EventLog, read_events
+from spliced_the_spire.lutil import RandomStreams
+
+
+class TestEvents(unittest.TestCase):
+    deck = [RedStrike] * 5 + [RedDefend] * 4 + [Bash]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def play(self, path, combats=3, batch_size=8192):
+        rooms = []
+        with EventLog(path, batch_size=batch_size) as events:
+            for combat in range(combats):
+                rng = RandomStreams(combat)
+                actor = LeftToRightAI(Ironclad, cards=[card.make() for card in self.deck], rng=rng)
+                room = Room(actor, [GreenLouse(rng=rng), RedLouse(rng=rng)], rng=rng, events=events)
+                room.run_combat()
+                rooms.append(room)
+        return rooms
+
+    def test_events_match_combat(self):
+        path = os.path.join(self.directory, 'combats.events')
+        rooms = self.play(path)
+        events = list(read_events(path))
+        for combat, room in enumerate(rooms):
+            played = [event for event in events if event.combat == combat]
+            self.assertEqual(EventType.COMBAT_STARTED, played[0].type)
+            self.assertEqual((EventType.COMBAT_ENDED, int(room.is_won()), room.actor.health),
+                             (played[-1].type, played[-1].subject, played[-1].value))
+            actions = [action for turn in room.actor.turn_log for action in turn['turn_actions']]
+            self.assertEqual([action['card'].card_id for action in actions],
+                             [event.subject for event in played if event.type is EventType.CARD_PLAYED])
+            for slot, enemy in enumerate(room.enemies, start=1):
+                start = next(event.value for event in played
+                             if event.type is EventType.COMBAT_STARTED and event.source == slot)
+                lost = sum(event.value for event in played
+                           if event.type is EventType.DAMAGE_DEALT and event.subject == slot)
+                self.assertEqual(start - enemy.health, lost)
+
+    def test_jsonl_matches_binary(self):
+        binary = os.path.join(self.directory, 'combats.events')
+        jsonl = os.path.join(self.directory, 'combats.jsonl')
+        self.play(binary, batch_size=7)
+        self.play(jsonl)
+        self.assertEqual(list(read_events(binary)), list(read_events(jsonl)))
+
+    def test_batch_events(self):
+        run_batch(12, LeftToRightAI, self.deck, [JawWorm], seed=1, workers=1, shard_size=5, events_dir=self.directory)
+        combats = [event.combat for start in (0, 5, 10)
+                   for event in read_events(shard_events_path(self.directory, start))
+                   if event.type is EventType.COMBAT_ENDED]
+        self.assertEqual(list(range(12)), combats)
+
+
+if __name__ == '__main__':
+    unittest.main()
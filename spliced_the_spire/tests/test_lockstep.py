@@ -0,0 +1,49 @@
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash, IronWave, TwinStrike, Clothesline, Cleave, Anger
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.enemies import Cultist, JawWorm, GreenLouse, RedLouse
+from spliced_the_spire.main.relics import BurningBlood
+from spliced_the_spire.batch import run_batch
+
+try:
+    from spliced_the_spire.lockstep import run_lockstep, supports
+except ImportError:
+    run_lockstep = None
+
+
+@unittest.skipIf(run_lockstep is None, 'The lockstep engine needs numpy')
+class TestLockstep(unittest.TestCase):
+    deck = [RedStrike] * 5 + [RedDefend] * 4 + [Bash]
+
+    def test_matches_object_engine(self):
+        upgraded = Bash()
+        upgraded.upgrade()
+        fights = [
+            (self.deck, [JawWorm], 0),
+            (self.deck, [Cultist], 17),
+            (self.deck[1:] + [upgraded, IronWave, TwinStrike, Clothesline, Cleave], [GreenLouse, RedLouse], 7),
+            (self.deck, [RedLouse, JawWorm], 17),
+        ]
+        for deck, enemies, ascension in fights:
+            with self.subTest(enemies=enemies, ascension=ascension):
+                # cross_check raises if any combat differs from the object engine
+                lockstep = run_lockstep(60, LeftToRightAI, deck, enemies, relics=[BurningBlood],
+                                        ascension=ascension, seed=5, chunk_size=25, cross_check=True)
+                batch = run_batch(60, LeftToRightAI, deck, enemies, relics=[BurningBlood],
+                                  ascension=ascension, seed=5, workers=1)
+
+                self.assertEqual(batch.wins, lockstep.wins)
+                self.assertEqual(batch.hp_lost, lockstep.hp_lost)
+                self.assertEqual(batch.turns, lockstep.turns)
+
+    def test_falls_back_to_object_engine(self):
+        deck = self.deck + [Anger]
+        self.assertFalse(supports(LeftToRightAI, deck, [JawWorm]))
+
+        lockstep = run_lockstep(10, LeftToRightAI, deck, [JawWorm], seed=2)
+        batch = run_batch(10, LeftToRightAI, deck, [JawWorm], seed=2, workers=1)
+        self.assertEqual(batch.hp_lost, lockstep.hp_lost)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import LeftToRightAI
+from spliced_the_spire.main.abstractions import Room, SUMMARY_LOG_SIZE
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.enemies import JawWorm, RedLouse
+from spliced_the_spire.main.enumerations import LogLevel
+from spliced_the_spire.lutil import RandomStreams
+
+
+def combat(log_level, turns=100, seed=3, health=80, attack=True):
+    rng = RandomStreams(seed)
+    cards = [RedStrike(), RedDefend(), RedDefend(), Bash()] if attack else [RedDefend() for _ in range(4)]
+    actor = LeftToRightAI(Ironclad, cards=cards, rng=rng, health=health, max_health=health)
+    enemy = JawWorm(rng=rng)
+    room = Room(actor, [enemy], rng=rng, log_level=log_level)
+    return room, room.run_combat(max_turns=turns)
+
+
+class TestLogging(unittest.TestCase):
+
+    def test_off(self):
+        room, turns = combat(LogLevel.OFF, turns=30, health=10 ** 6, attack=False)
+        self.assertEqual(30, turns)
+        self.assertEqual(30, room.actor.turns_started)
+        self.assertEqual(0, len(room.actor.turn_log))
+        self.assertEqual(0, len(room.enemies[0].print_log) + len(room.enemies[0].ability_log))
+
+    def test_off_builds_no_enemy_messages(self):
+        for log_level, message in ((LogLevel.OFF, None), (LogLevel.FULL, 'Red Louse used Bite')):
+            rng = RandomStreams(5)
+            louse = RedLouse(rng=rng)
+            Room(LeftToRightAI(Ironclad, cards=[RedDefend()], rng=rng), [louse], rng=rng, log_level=log_level)
+            louse.message = None
+            louse.bite()
+            self.assertEqual(message, louse.message)
+
+    def test_summary_is_bounded(self):
+        room, _ = combat(LogLevel.SUMMARY, turns=30, health=10 ** 6, attack=False)
+        self.assertEqual(SUMMARY_LOG_SIZE, len(room.actor.turn_log))
+        self.assertEqual(SUMMARY_LOG_SIZE, len(room.enemies[0].print_log))
+        actions = [action for turn in room.actor.turn_log for action in turn['turn_actions']]
+        self.assertTrue(actions)
+        self.assertTrue(all('message' not in action for action in actions))
+
+    def test_full(self):
+        room, turns = combat(LogLevel.FULL, turns=30, health=10 ** 6, attack=False)
+        self.assertEqual(turns, len(room.actor.turn_log))
+        self.assertEqual(turns, len(room.enemies[0].ability_log))
+        self.assertIn('message', room.actor.turn_log[0]['turn_actions'][0])
+
+    def test_same_combat_at_every_level(self):
+        results = set()
+        for log_level in LogLevel:
+            room, turns = combat(log_level, seed=11)
+            results.add((turns, room.actor.health, room.enemies[0].health))
+        self.assertEqual(1, len(results))
+
+    def test_restore_takes_back_logs(self):
+        for log_level in LogLevel:
+            room, _ = combat(log_level, turns=3)
+            state = room.snapshot()
+            logged = list(room.actor.turn_log), list(room.enemies[0].print_log)
+            room.actor.turn_impl(verbose=False)
+            room.take_enemy_turns()
+            room.restore(state)
+            self.assertEqual(3, room.actor.turns_started)
+            self.assertEqual(logged, (list(room.actor.turn_log), list(room.enemies[0].print_log)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from random import Random
+
+from spliced_the_spire.lutil import MAX_ASCENSION, asc_int, compile_asc, roll_asc
+
+CURL_UP = {0: (3, 7), 7: (4, 8), 17: (9, 12)}
+
+
+class TestAscensionTables(unittest.TestCase):
+
+    def test_compile_asc(self):
+        table = compile_asc(CURL_UP)
+        self.assertEqual(MAX_ASCENSION + 1, len(table))
+        for ascension, entry in ((0, (3, 7)), (2, (3, 7)), (6, (3, 7)), (7, (4, 8)), (16, (4, 8)), (17, (9, 12)),
+                                 (20, (9, 12))):
+            self.assertEqual(entry, table[ascension])
+        self.assertEqual((0, 0, 1, 1), compile_asc({0: 0, 2: 1})[:4])
+        with self.assertRaises(Exception):
+            compile_asc({2: 1})
+        with self.assertRaises(Exception):
+            compile_asc({0: (5, 4)})
+
+    def test_roll_asc(self):
+        table = compile_asc(CURL_UP)
+        for ascension in (0, 2, 7, 17, 20):
+            rng, expected = Random(ascension), Random(ascension)
+            rolled = [roll_asc(table[ascension], rng) for _ in range(50)]
+            self.assertEqual(rolled, [asc_int(ascension, CURL_UP, expected) for _ in range(50)])
+            lower, upper = table[ascension]
+            self.assertTrue(all(lower <= value <= upper for value in rolled))
+        self.assertEqual(4, roll_asc(4, Random(0)))
+        self.assertEqual(9, roll_asc((9, 9), Random(0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from random import Random
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import generate_map, WIDTH, HEIGHT
+
+
+def reference_map(rng: Random) -> tuple[dict, dict]:
+    """The networkx generator map.py used to run at import, with dicts of lists in place of the DiGraph."""
+    successors = {(x, y): [] for x in range(7) for y in range(15)}
+    predecessors = {node: [] for node in successors}
+
+    def get_uncrossed_successors(node, potential_successors):
+        uncrossed = []
+        for potential in potential_successors:
+            if potential[0] == node[0]:
+                uncrossed.append(potential)
+            if potential[0] == node[0] - 1:
+                if (node[0], node[1] + 1) not in successors[(node[0] - 1, node[1])]:
+                    uncrossed.append(potential)
+            if potential[0] == node[0] + 1:
+                if (node[0], node[1] + 1) not in successors[(node[0] + 1, node[1])]:
+                    uncrossed.append(potential)
+        return uncrossed
+
+    def get_possible_successors(node):
+        floor = node[1] + 1
+        if node[0] == 0:
+            return get_uncrossed_successors(node, [(0, floor), (1, floor)])
+        if node[0] == 6:
+            return get_uncrossed_successors(node, [(5, floor), (6, floor)])
+        return get_uncrossed_successors(node, [(node[0] - 1, floor), (node[0], floor), (node[0] + 1, floor)])
+
+    def generate_random_path(node):
+        while node[1] < 14:
+            choice = rng.choice(get_possible_successors(node))
+            if choice not in successors[node]:
+                successors[node].append(choice)
+                predecessors[choice].append(node)
+            node = choice
+
+    nums = [x for x in range(0, 6)]
+    start = rng.choice(nums)
+    nums.remove(start)
+    second_start = rng.choice(nums)
+    generate_random_path((start, 0))
+    generate_random_path((second_start, 0))
+    for _ in range(4):
+        generate_random_path((rng.randint(0, 6), 0))
+
+    rooms = {}
+    unfilled_nodes = []
+    for node in [node for node in successors if successors[node] or predecessors[node]]:
+        if node[1] == 0:
+            rooms[node] = "Monster"
+        elif node[1] == 8:
+            rooms[node] = "Treasure"
+        elif node[1] == 14:
+            rooms[node] = "Rest"
+        else:
+            unfilled_nodes.append(node)
+
+    room_bucket = []
+    for _ in range(len(unfilled_nodes)):
+        x = rng.randint(1, 100)
+        if x <= 45:
+            room_bucket.append("Monster")
+        elif x <= 67:
+            room_bucket.append("Event")
+        elif x <= 83:
+            room_bucket.append("Elite")
+        elif x <= 95:
+            room_bucket.append("Rest")
+        else:
+            room_bucket.append("Shop")
+    rng.shuffle(room_bucket)
+
+    def allowed(node, room_type):
+        if node[1] < 5 and room_type in ("Elite", "Rest"):
+            return False
+        if room_type in ("Elite", "Shop", "Rest"):
+            if any(rooms.get(other) == room_type for other in successors[node] + predecessors[node]):
+                return False
+        for predecessor in predecessors[node]:
+            if any(rooms.get(successor) == room_type for successor in successors[predecessor]):
+                return False
+        return not (node[1] == 13 and room_type == "Rest")
+
+    for node in list(unfilled_nodes):
+        for i in range(len(room_bucket)):
+            if allowed(node, room_bucket[i]):
+                rooms[node] = room_bucket.pop(i)
+                unfilled_nodes.remove(node)
+                break
+    for node in unfilled_nodes:
+        for room_type in ["Monster", "Event", "Elite", "Rest", "Shop"]:
+            if allowed(node, room_type):
+                rooms[node] = room_type
+    return successors, rooms
+
+
+class TestMap(unittest.TestCase):
+
+    def test_matches_reference(self):
+        for seed in range(300):
+            game_map = generate_map(seed, act=1)
+            successors, rooms = reference_map(Random(f'{seed}:map:1'))
+            for x in range(WIDTH):
+                for y in range(HEIGHT):
+                    self.assertCountEqual(successors[(x, y)], game_map.successors(x, y))
+                    self.assertEqual(rooms.get((x, y), 'None'), game_map.room(x, y).name.title())
+
+    def test_room_distribution_unchanged(self):
+        # Room types over maps from the reference and from generate_map, on different seeds, should look
+        # like samples of the same distribution: a chi-squared test of homogeneity at p = 0.001
+        names = [room.name.title() for room in RoomType if room is not RoomType.NONE]
+        reference = dict.fromkeys(names, 0)
+        generated = dict.fromkeys(names, 0)
+        for seed in range(600):
+            for room in reference_map(Random(f'reference:{seed}'))[1].values():
+                reference[room] += 1
+            game_map = generate_map(f'generated:{seed}')
+            # Rooms nothing fits are left out, as they are from the reference's rooms
+            for room in game_map.rooms:
+                if room != RoomType.NONE.value:
+                    generated[RoomType(room).name.title()] += 1
+
+        total = sum(reference.values()) + sum(generated.values())
+        statistic = 0.0
+        for name in names:
+            for sample in (reference, generated):
+                expected = (reference[name] + generated[name]) * sum(sample.values()) / total
+                statistic += (sample[name] - expected) ** 2 / expected
+        # Critical value for 5 degrees of freedom
+        self.assertLess(statistic, 20.52)
+
+    def test_seeded(self):
+        self.assertEqual(generate_map(7), generate_map(7))
+        self.assertNotEqual(generate_map(7).edges, generate_map(8).edges)
+        self.assertNotEqual(generate_map(7, act=1).edges, generate_map(7, act=2).edges)
+
+    def test_shape(self):
+        game_map = generate_map('shape')
+        nodes = game_map.nodes()
+        self.assertTrue(all(game_map.room(x, y) is not RoomType.NONE for x, y in nodes))
+        self.assertTrue(all(game_map.room(x, 8) is RoomType.TREASURE for x, y in nodes if y == 8))
+        for x, y in nodes:
+            for successor in game_map.successors(x, y):
+                self.assertIn((x, y), game_map.predecessors(*successor))
+        # Paths run from the bottom floor to the top
+        self.assertTrue(all(game_map.predecessors(x, y) for x, y in nodes if y > 0))
+        self.assertTrue(all(game_map.successors(x, y) for x, y in nodes if y < HEIGHT - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import generate_map
+from spliced_the_spire.map_analysis import (count_paths, iter_paths, best_path, room_count_range, most_before,
+                                            pareto_routes, path_counts, best_scores, room_count_ranges)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WEIGHTS = {RoomType.ELITE: 1.0, RoomType.REST: 0.5, RoomType.SHOP: 0.25, RoomType.MONSTER: -0.125}
+
+
+def score(game_map, path, weights=WEIGHTS):
+    return sum(weights.get(game_map.room(x, y), 0) for y, x in enumerate(path))
+
+
+def counts(game_map, path, objectives):
+    rooms = [game_map.room(x, y) for y, x in enumerate(path)]
+    return tuple(rooms.count(room) for room in objectives)
+
+
+def elites_before_rest(game_map, path):
+    elites = 0
+    for y, x in enumerate(path):
+        room = game_map.room(x, y)
+        if room is RoomType.REST:
+            break
+        elites += room is RoomType.ELITE
+    return elites
+
+
+class TestMapAnalysis(unittest.TestCase):
+
+    def test_against_every_path(self):
+        objectives = (RoomType.ELITE, RoomType.REST, RoomType.SHOP)
+        for seed in range(20):
+            game_map = generate_map(seed)
+            paths = list(iter_paths(game_map))
+            self.assertEqual(len(set(paths)), len(paths))
+            self.assertEqual(len(paths), count_paths(game_map))
+
+            best, path = best_path(game_map, WEIGHTS)
+            self.assertIn(path, paths)
+            self.assertEqual(best, score(game_map, path))
+            self.assertEqual(max(score(game_map, path) for path in paths), best)
+
+            elites = [counts(game_map, path, (RoomType.ELITE,))[0] for path in paths]
+            self.assertEqual((min(elites), max(elites)), room_count_range(game_map, RoomType.ELITE))
+            self.assertEqual(max(elites_before_rest(game_map, path) for path in paths),
+                             most_before(game_map, RoomType.ELITE, RoomType.REST))
+
+            every = {counts(game_map, path, objectives) for path in paths}
+            front = {vector for vector in every
+                     if not any(other != vector and all(a >= b for a, b in zip(other, vector)) for other in every)}
+            routes = pareto_routes(game_map, objectives)
+            self.assertEqual(front, {vector for vector, _ in routes})
+            for vector, path in routes:
+                self.assertIn(path, paths)
+                self.assertEqual(vector, counts(game_map, path, objectives))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_vectorized(self):
+        maps = [generate_map(seed) for seed in range(50)]
+        self.assertEqual([count_paths(game_map) for game_map in maps], path_counts(maps).tolist())
+        self.assertEqual([best_path(game_map, WEIGHTS)[0] for game_map in maps], best_scores(maps, WEIGHTS).tolist())
+        fewest, most = room_count_ranges(maps, RoomType.REST)
+        self.assertEqual([room_count_range(game_map, RoomType.REST) for game_map in maps],
+                         list(zip(fewest.tolist(), most.tolist())))
+
+
+if __name__ == '__main__':
+    unittest.main()
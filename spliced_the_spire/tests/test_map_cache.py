@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import ENCODED_SIZE, decode_map, encode_map, generate_map
+from spliced_the_spire.map_analysis import best_scores, path_counts, stack_maps
+from spliced_the_spire.map_cache import MapCache, build_cache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestMapCache(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'act2.maps')
+
+    def test_encoding(self):
+        for seed in range(50):
+            game_map = generate_map(seed)
+            data = encode_map(game_map)
+            self.assertEqual(ENCODED_SIZE, len(data))
+            self.assertEqual(game_map, decode_map(data, seed))
+
+    def test_cache(self):
+        build_cache(self.path, start=10, stop=60, act=2, shard_size=16)
+        with MapCache(self.path) as cache:
+            self.assertEqual((50, 2), (len(cache), cache.act))
+            self.assertEqual(generate_map(42, act=2), cache[42])
+            self.assertEqual([generate_map(seed, act=2) for seed in range(10, 60)], cache.maps())
+            self.assertEqual([generate_map(seed, act=2) for seed in range(55, 60)], cache.maps(55, 100))
+            self.assertNotIn(9, cache)
+            with self.assertRaises(KeyError):
+                cache[60]
+
+    def test_workers(self):
+        build_cache(self.path, stop=40, shard_size=10, workers=2)
+        with MapCache(self.path) as cache:
+            self.assertEqual([generate_map(seed) for seed in range(40)], cache.maps())
+
+    def test_bad_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a map cache file at all')
+        with self.assertRaises(ValueError):
+            MapCache(self.path)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_arrays(self):
+        build_cache(self.path, stop=30)
+        weights = {RoomType.ELITE: 1, RoomType.REST: 0.5}
+        with MapCache(self.path) as cache:
+            packed = cache.packed()
+            self.assertFalse(packed.flags.owndata)
+            self.assertEqual(encode_map(cache[7]), packed[7].tobytes())
+            del packed
+            maps = cache.maps()
+            self.assertEqual(best_scores(maps, weights).tolist(), best_scores(cache, weights).tolist())
+            self.assertEqual(path_counts(maps).tolist(), path_counts(cache).tolist())
+            for expected, got in zip(stack_maps(maps), stack_maps(cache)):
+                self.assertEqual(expected.tolist(), got.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash, card_classes
+from spliced_the_spire.main.actors import DummyActor
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.effects import Strength, Vulnerable
+from spliced_the_spire.main.enumerations import IntentType
+from spliced_the_spire.main.abstractions import Room
+from spliced_the_spire.main.enemies import Cultist, JawWorm
+from spliced_the_spire.lutil import RandomStreams
+
+try:
+    import numpy as np
+    from spliced_the_spire.observation import ObservationEncoder, CARD_IDS, INTENTS
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'The encoder needs numpy')
+class TestObservation(unittest.TestCase):
+
+    def make_room(self):
+        rng = RandomStreams(1)
+        actor = DummyActor(Ironclad, cards=[RedStrike(), RedStrike(), Bash()], hand=[RedDefend(), Bash()],
+                           health=70, max_health=80, energy=3, rng=rng)
+        room = Room(actor, [JawWorm(rng=rng), Cultist(rng=rng)])
+        room.start_combat()
+        actor.increase_effect(Strength, 2)
+        room.enemies[1].increase_effect(Vulnerable, 1)
+        room.enemies[1].health = 0
+        return room
+
+    def test_encode(self):
+        encoder = ObservationEncoder(max_hand=10, max_enemies=3)
+        room = self.make_room()
+        buffer = encoder.new_buffer()
+        buffer[:] = 7
+
+        # Written in place, over whatever was there
+        self.assertIs(buffer, encoder.encode(room, buffer))
+        fields = encoder.fields
+
+        np.testing.assert_array_equal([70, 80, 3, 3], buffer[fields['actor']])
+        self.assertEqual(2, buffer[fields['actor_effects']][Strength.effect_id])
+        self.assertEqual([CARD_IDS[RedDefend] + 1, CARD_IDS[Bash] + 1, 0],
+                         buffer[fields['hand']][:3].tolist())
+        self.assertEqual(2, buffer[fields['draw']][CARD_IDS[card_classes['Strike_R']]])
+        self.assertEqual(1, buffer[fields['hand_counts']][CARD_IDS[Bash]])
+        self.assertEqual(0, buffer[fields['discard']].sum())
+
+        enemies = buffer[fields['enemies']].reshape(3, encoder.enemy_size)
+        jaw_worm, cultist, missing = enemies
+        self.assertEqual(1, jaw_worm[0])
+        # The Jaw Worm always opens with Chomp
+        self.assertEqual(1, jaw_worm[3 + INTENTS.index(IntentType.AGGRESSIVE)])
+        self.assertEqual(1, jaw_worm[3:3 + len(INTENTS)].sum())
+        self.assertEqual(0, cultist[0])
+        self.assertEqual(1, cultist[3 + len(INTENTS) + Vulnerable.effect_id])
+        self.assertFalse(missing.any())
+
+    def test_encode_batch(self):
+        encoder = ObservationEncoder()
+        rooms = [self.make_room(), self.make_room()]
+        batch = encoder.new_buffer(2)
+
+        self.assertIs(batch, encoder.encode_batch(rooms, batch))
+        np.testing.assert_array_equal(encoder.encode(rooms[0]), batch[0])
+        np.testing.assert_array_equal(batch[0], batch[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
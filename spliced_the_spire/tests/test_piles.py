@@ -0,0 +1,119 @@
+import pickle
+import unittest
+from copy import deepcopy
+from random import Random
+
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash, Anger, SecondWind
+from spliced_the_spire.main.actors import DummyActor
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.abstractions import CardPile
+from spliced_the_spire.main.enumerations import CardPiles, CardType
+
+
+def indexed(pile: CardPile) -> list:
+    # Everything the pile indexes, to compare against a pile rebuilt from scratch
+    return [sorted(map(id, pile._counts)), sorted(pile._counts.values()),
+            {key: sorted(map(id, cards)) for key, cards in pile._by_type.items() if cards},
+            {key: sorted(map(id, cards)) for key, cards in pile._by_name.items() if cards}]
+
+
+class TestCardPile(unittest.TestCase):
+
+    def assertIndexed(self, pile: CardPile):
+        self.assertEqual(indexed(CardPile(pile)), indexed(pile))
+
+    def test_list_methods_keep_indexes(self):
+        strike, defend, bash, anger = RedStrike(), RedDefend(), Bash(), Anger()
+        pile = CardPile([strike, defend])
+        self.assertIn(strike, pile)
+        self.assertNotIn(bash, pile)
+
+        pile.append(bash)
+        pile.insert(0, anger)
+        pile.extend([RedStrike(), RedStrike()])
+        pile += [strike]
+        self.assertIndexed(pile)
+        self.assertEqual(2, pile.count_of(strike))
+
+        pile.remove(strike)
+        self.assertIn(strike, pile)
+        pile.pop()
+        self.assertNotIn(strike, pile)
+        del pile[0]
+        self.assertNotIn(anger, pile)
+        pile[0] = anger
+        self.assertNotIn(defend, pile)
+        pile[1:3] = [defend]
+        self.assertIndexed(pile)
+
+        pile.shuffle(Random(1))
+        self.assertIndexed(pile)
+        pile.clear()
+        self.assertEqual([], indexed(pile)[0])
+
+    def test_repeating(self):
+        strike, defend = RedStrike(), RedDefend()
+        pile = CardPile([strike, defend])
+        pile *= 1
+        self.assertEqual([strike, defend], list(pile))
+        self.assertIndexed(pile)
+        pile *= 2
+        self.assertEqual(2, pile.count_of(strike))
+        self.assertIndexed(pile)
+        pile *= 0
+        self.assertEqual([], list(pile))
+        self.assertNotIn(strike, pile)
+        self.assertIndexed(pile)
+
+    def test_shuffle_matches_random_shuffle(self):
+        cards = [RedStrike() for _ in range(10)]
+        pile = CardPile(cards)
+        pile.shuffle(Random(5))
+        Random(5).shuffle(cards)
+        self.assertEqual(cards, list(pile))
+
+    def test_copies_rebuild_indexes(self):
+        pile = CardPile([RedStrike(), Bash()], CardPiles.DISCARD)
+        for copied in (deepcopy(pile), pickle.loads(pickle.dumps(pile))):
+            self.assertEqual(CardPiles.DISCARD, copied.pile)
+            self.assertEqual(2, len(copied))
+            self.assertIndexed(copied)
+
+    def test_upgrading_in_a_pile(self):
+        strike = RedStrike()
+        pile = CardPile([strike, RedStrike()])
+        strike.upgrade()
+        self.assertEqual([strike], pile.query(with_names=['Strike+']))
+        self.assertEqual(2, len(pile.query(with_names=['Strike'])))
+        self.assertEqual([strike], pile.query(with_names=['Strike'], upgraded=True))
+        pile.remove(strike)
+        self.assertIndexed(pile)
+
+
+class TestGetCards(unittest.TestCase):
+
+    def test_get_cards(self):
+        strike, defend, bash, wind = RedStrike(), RedDefend(), Bash(), SecondWind()
+        actor = DummyActor(Ironclad, cards=[RedStrike(), RedDefend()], hand=[strike, defend, bash, wind],
+                           health=80, max_health=80, energy=3)
+        actor.exhaust_card(defend)
+        bash.upgrade()
+
+        self.assertEqual([strike, bash], actor.get_cards(from_piles=CardPiles.HAND, with_types=CardType.ATTACK))
+        self.assertEqual([bash], actor.get_cards(with_names='Bash', upgraded=True))
+        self.assertEqual([defend], actor.get_cards(from_piles=CardPiles.EXHAUST))
+        self.assertEqual(2, len(actor.get_cards(with_names=['Defend'])))
+        self.assertEqual([strike], actor.get_cards(from_piles=CardPiles.HAND, with_types=CardType.ATTACK,
+                                                   exclude_cards=bash))
+        self.assertIs(strike, actor.get_card(from_piles=CardPiles.HAND))
+        self.assertEqual(6, len(actor.get_cards()))
+
+        # Second Wind exhausts the other attacks in hand through those indexes
+        actor.use_card(None, wind)
+        self.assertEqual([defend, strike, bash], list(actor._exhaust_pile))
+        self.assertEqual([], actor.get_cards(from_piles=CardPiles.HAND))
+        self.assertRaises(RuntimeError, actor.use_card, None, strike)
+
+
+if __name__ == '__main__':
+    unittest.main()
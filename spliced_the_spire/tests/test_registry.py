@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from spliced_the_spire.main.cards import RedStrike, card_classes
+from spliced_the_spire.main.enemies import enemies, Cultist, JawWorm, DummyEnemy
+from spliced_the_spire.main.relics import relic_classes, BurningBlood
+from spliced_the_spire.lutil import Registry
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_built_on_first_lookup(self):
+        listed = []
+
+        def classes():
+            listed.append(True)
+            return [Cultist, JawWorm]
+
+        registry = Registry(classes, key=lambda cls: cls.sts_name)
+        self.assertEqual([], listed)
+        self.assertIs(JawWorm, registry['Jaw Worm'])
+        self.assertEqual(['Cultist', 'Jaw Worm'], list(registry))
+        self.assertEqual(1, len(listed))
+        self.assertRaises(KeyError, registry.__getitem__, 'Nob')
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'enemies.json')
+            enemies.write_index(path)
+
+            # Loaded from the index, the classes are never listed
+            registry = Registry(lambda: self.fail('Listed the classes'), key=lambda cls: cls.sts_name)
+            registry.load_index(path)
+            self.assertEqual(list(enemies), list(registry))
+            self.assertIs(Cultist, registry['Cultist'])
+            self.assertEqual(dict(enemies), dict(registry))
+
+    def test_game_registries(self):
+        self.assertIs(Cultist, enemies['Cultist'])
+        self.assertIs(DummyEnemy, enemies['Dummy'])
+        self.assertIs(RedStrike, card_classes['Strike_R'])
+        self.assertIs(BurningBlood, relic_classes['Burning Blood'])
+
+
+if __name__ == '__main__':
+    unittest.main()
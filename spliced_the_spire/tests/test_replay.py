@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from spliced_the_spire.replay import (CombatSpec, Replay, ReplayMismatch, END_TURN, MAX_TARGETS, record_combat,
+                                      replay, read_replays, write_replays)
+from spliced_the_spire.main.actors import LeftToRightAI
+
+SPECS = [CombatSpec(seed=seed, deck=deck, enemies=enemies)
+         for seed in range(4)
+         for deck, enemies in (('5xStrike_R 4xDefend_R Bash', ('Jaw Worm',)),
+                               ('3xStrike_R 3xDefend_R Havoc Headbutt TrueGrit+ Warcry',
+                                ('Green Louse', 'Red Louse')))]
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_replay_matches_recording(self):
+        for spec in SPECS:
+            recorded, result = record_combat(LeftToRightAI, spec)
+            self.assertEqual(result.turns, recorded.decisions.count(END_TURN))
+            self.assertEqual(result, replay(recorded))
+
+    def test_hashes_catch_divergence(self):
+        recorded, _ = record_combat(LeftToRightAI, SPECS[0])
+        # Playing the same decisions from another seed draws other hands
+        moved = Replay(recorded.spec._replace(seed='elsewhere'), recorded.decisions, recorded.hashes)
+        with self.assertRaises(ReplayMismatch):
+            replay(moved)
+
+        # Hashes can be left out, or not checked
+        unhashed, result = record_combat(LeftToRightAI, SPECS[0], hashes=False)
+        self.assertIsNone(unhashed.hashes)
+        self.assertEqual(result, replay(unhashed))
+        self.assertEqual(result, replay(recorded, verify=False))
+
+    def test_decisions_must_match(self):
+        recorded, _ = record_combat(LeftToRightAI, SPECS[0])
+        truncated = recorded._replace(decisions=recorded.decisions[:-1])
+        extra = recorded._replace(decisions=recorded.decisions + (END_TURN,))
+        for changed in (truncated, extra):
+            with self.assertRaises(ReplayMismatch):
+                replay(changed)
+            with self.assertRaises(ReplayMismatch):
+                replay(changed, verify=False)
+
+        with self.assertRaises(ReplayMismatch):
+            replay(recorded._replace(hashes=recorded.hashes + (0,)))
+
+        # Cards from hand slots that aren't there, at enemies that aren't there
+        for decisions in ((9 * MAX_TARGETS,), (3,), (-5,)):
+            with self.assertRaises(ReplayMismatch):
+                replay(Replay(SPECS[0], decisions), verify=False)
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'combats.replays')
+            recorded = [record_combat(LeftToRightAI, spec)[0] for spec in SPECS]
+            write_replays(path, recorded[:3])
+            write_replays(path, recorded[3:])
+            self.assertEqual(recorded, list(read_replays(path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
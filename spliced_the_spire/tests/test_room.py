@@ -0,0 +1,60 @@
+import unittest
+from spliced_the_spire.main.cards import RedStrike, RedDefend, Bash
+from spliced_the_spire.main.actors import DummyActor
+from spliced_the_spire.main.classes import Ironclad
+from spliced_the_spire.main.effects import Block, Strength, Vulnerable
+from spliced_the_spire.main.abstractions import Room
+from spliced_the_spire.main.enemies import Cultist
+
+
+class TestRoom(unittest.TestCase):
+
+    def test_snapshot_restore(self):
+        strike = RedStrike()
+        actor = DummyActor(Ironclad, cards=[RedDefend(), Bash()], hand=[strike, RedDefend()],
+                           health=80, max_health=80, energy=3)
+        cultist = Cultist(max_health=50)
+        room = Room(actor, [cultist])
+        actor.increase_effect(Strength, 2)
+
+        state = room.snapshot()
+        shuffle_draw = room.rng.shuffle.random()
+        move = cultist.next_move(cultist.move_state, room.rng.ai)
+
+        # Change everything the snapshot should cover
+        actor.health = 10
+        actor.energy = 0
+        actor.discard_pile.append(actor.hand_pile.pop())
+        actor.increase_effect(Block, 5)
+        actor.set_effect(Strength, 0)
+        strike.upgrade()
+        cultist.health = 1
+        cultist.increase_effect(Vulnerable, 2)
+
+        room.restore(state)
+
+        self.assertEqual(80, actor.health)
+        self.assertEqual(3, actor.energy)
+        self.assertEqual(2, len(actor.hand_pile))
+        self.assertEqual(0, len(actor.discard_pile))
+        self.assertEqual(0, actor.get_effect_stacks(Block))
+        self.assertEqual(2, actor.get_effect_stacks(Strength))
+        self.assertFalse(strike.upgraded)
+        self.assertEqual('Strike', strike.name)
+        self.assertEqual(50, cultist.health)
+        self.assertFalse(cultist.has_effect(Vulnerable))
+        # The combat's random streams are rewound too
+        self.assertIs(room.rng, cultist.rng)
+        self.assertEqual(shuffle_draw, room.rng.shuffle.random())
+        self.assertEqual(move, cultist.next_move(cultist.move_state, room.rng.ai))
+
+        # Restored hooks should still be live, and a snapshot can be restored more than once
+        cultist.increase_effect(Vulnerable, 1)
+        room.restore(state)
+        self.assertEqual({}, cultist.get_effects_dict())
+        self.assertNotIn(Vulnerable, [type(hook.__self__) for hooks in cultist.implemented_hooks.values()
+                                      for hook in hooks])
+
+
+if __name__ == '__main__':
+    unittest.main()
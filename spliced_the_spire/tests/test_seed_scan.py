@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from spliced_the_spire.main.enumerations import RoomType
+from spliced_the_spire.main.map import generate_map
+from spliced_the_spire.seed_scan import AllOf, MostBefore, RoomOnFloors, read_seeds, scan_seeds
+
+PREDICATE = AllOf([MostBefore(RoomType.ELITE, RoomType.REST, 2), RoomOnFloors(RoomType.SHOP, 5, 7)])
+
+
+class TestSeedScan(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, 'seeds.txt')
+
+    def test_scan(self):
+        expected = [seed for seed in range(300) if PREDICATE(generate_map(seed))]
+        result = scan_seeds(PREDICATE, 300, self.output, workers=1, shard_size=64)
+        self.assertEqual(expected, read_seeds(self.output))
+        self.assertEqual((300, len(expected)), (result.scanned, result.matches))
+
+    def test_resume(self):
+        expected = [seed for seed in range(300) if PREDICATE(generate_map(seed))]
+        scan_seeds(PREDICATE, 128, self.output, workers=1, shard_size=64)
+        # A shard cut off before its progress line was written
+        with open(self.output, 'a') as file:
+            file.write('129\n13')
+        result = scan_seeds(PREDICATE, 300, self.output, workers=1, shard_size=64)
+        self.assertEqual(300 - 128, result.scanned)
+        self.assertEqual(expected, read_seeds(self.output))
+
+    def test_other_files_left_alone(self):
+        with open(self.output, 'w') as file:
+            file.write('my notes\n42\n')
+        with self.assertRaises(ValueError):
+            scan_seeds(PREDICATE, 100, self.output, workers=1)
+        with open(self.output) as file:
+            self.assertEqual('my notes\n42\n', file.read())
+
+    def test_other_scans_not_resumed(self):
+        scan_seeds(PREDICATE, 64, self.output, workers=1, shard_size=32)
+        with open(self.output) as file:
+            written = file.read()
+        for settings in (dict(act=2), dict(start=10)):
+            with self.assertRaises(ValueError):
+                scan_seeds(PREDICATE, 128, self.output, workers=1, **settings)
+        with open(self.output) as file:
+            self.assertEqual(written, file.read())
+
+    def test_workers(self):
+        scan_seeds(PREDICATE, 200, self.output, workers=1, shard_size=50)
+        expected = read_seeds(self.output)
+        os.remove(self.output)
+        scan_seeds(PREDICATE, 200, self.output, workers=2, shard_size=50)
+        self.assertEqual(expected, read_seeds(self.output))
+
+
+if __name__ == '__main__':
+    unittest.main()